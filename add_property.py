@@ -1,13 +1,20 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 import math
 
+import numpy as np
 import questionary
-import requests
 from dotenv import load_dotenv
 from rich.console import Console
 from display import display_property_details, display_unit_configs
+from http_client import backoff_seconds, http_get, request as http_request
+from geo import METERS_PER_MILE, PoiIndex, haversine_miles
+from location_cache import location_cache
+from poi_cache import poi_cache
+from rent_research import invalidate_comp_table_cache
+from response_cache import DAY_SECONDS, ResponseCache
 
 load_dotenv()
 
@@ -15,9 +22,42 @@ RENTCAST_HEADERS = {
     "accept": "application/json",
     "X-Api-Key": os.getenv("RENTCAST_KEY"),
 }
+RENTCAST_BASE_URL = "https://api.rentcast.io/v1"
+RENTCAST_CACHE_TTL_SECONDS = {
+    "avm/value": 30 * DAY_SECONDS,
+    "avm/rent/long-term": 14 * DAY_SECONDS,
+}
+
+rentcast_cache = ResponseCache("rentcast")
 
 console = Console()
 
+def rentcast_get(endpoint, params, limiter=None):
+    """
+    GET a RentCast endpoint through the persistent response cache.
+    Identical requests within the endpoint's TTL are served from disk instead of billed again.
+
+    limiter (a batch_runner.TokenBucket) is only acquired when the request actually goes
+    to RentCast, so cache hits don't use up the plan's rate limit.
+    """
+    def fetch():
+        if limiter is not None:
+            limiter.acquire()
+        response = http_get(f"{RENTCAST_BASE_URL}/{endpoint}", headers=RENTCAST_HEADERS, params=params)
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"error": response.text}
+        return response.status_code, data
+
+    return rentcast_cache.fetch(
+        endpoint,
+        params,
+        RENTCAST_CACHE_TTL_SECONDS.get(endpoint),
+        fetch,
+        cacheable=lambda status_code, data: status_code == 200 and "error" not in data,
+    )
+
 def get_rental_estimations_multifamily(property_details, unit_configs):
     total_beds = property_details["beds"]
     total_baths = property_details["baths"] * 0.5
@@ -30,10 +70,9 @@ def get_rental_estimations_multifamily(property_details, unit_configs):
         sqrft = property_details["square_ft"] * (beds_val + baths_val)
 
         try:
-            request = requests.get(
-                "https://api.rentcast.io/v1/avm/rent/long-term",
-                headers=RENTCAST_HEADERS,
-                params={
+            request = rentcast_get(
+                "avm/rent/long-term",
+                {
                     "address": property_details["full_address"],
                     "propertyType": "Multi-Family",
                     "bedrooms": unit["beds"],
@@ -63,10 +102,9 @@ def get_rental_estimations_multifamily(property_details, unit_configs):
 
 def get_rental_estimations_singlefamily(property_details):
     try:
-        request = requests.get(
-            "https://api.rentcast.io/v1/avm/rent/long-term",
-            headers=RENTCAST_HEADERS,
-            params={
+        request = rentcast_get(
+            "avm/rent/long-term",
+            {
                 "address": property_details["full_address"],
                 "propertyType": "Single Family",
                 "bedrooms": property_details["beds"],
@@ -132,26 +170,14 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     on the earth (specified in decimal degrees)
     Returns distance in miles
     """
-    from math import asin, cos, radians, sin, sqrt
-
-    # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-
-    # Radius of earth in miles
-    r = 3956
-
-    return c * r
+    return float(haversine_miles(lat1, lon1, lat2, lon2))
 
 def make_places_request_with_retry(url, params=None, headers=None, json_body=None, method='GET', max_retries=3):
     """
     Make Places API request with exponential backoff retry logic
     Supports both legacy (GET with params) and new (POST with JSON body) Places API
+    Goes through the shared pooled HTTP client; this loop owns the retries (transport
+    errors and API-level error bodies alike) using the client's backoff policy
 
     Args:
         url: API endpoint URL
@@ -167,10 +193,11 @@ def make_places_request_with_retry(url, params=None, headers=None, json_body=Non
     for attempt in range(max_retries):
         try:
             # Make request based on method
+            # Single transport attempt - retries are handled below so they aren't compounded
             if method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=json_body)
+                response = http_request('POST', url, headers=headers, json=json_body, max_retries=1)
             else:
-                response = requests.get(url, params=params)
+                response = http_request('GET', url, params=params, max_retries=1)
 
             data = response.json()
 
@@ -192,7 +219,7 @@ def make_places_request_with_retry(url, params=None, headers=None, json_body=Non
 
                 # Retry on transient errors
                 if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * 0.1
+                    wait_time = backoff_seconds(attempt)
                     console.print(f"    Retrying in {wait_time*1000:.0f}ms... (attempt {attempt + 1}/{max_retries})", style="green")
                     time.sleep(wait_time)
                     continue
@@ -219,7 +246,7 @@ def make_places_request_with_retry(url, params=None, headers=None, json_body=Non
 
                 # Transient errors - retry with exponential backoff
                 if status in ['UNKNOWN_ERROR', 'INVALID_REQUEST'] and attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) * 0.1  # 100ms, 200ms, 400ms
+                    wait_time = backoff_seconds(attempt)  # 100ms, 200ms, 400ms
                     console.print(f"    Retrying in {wait_time*1000:.0f}ms... (attempt {attempt + 1}/{max_retries})", style="green")
                     time.sleep(wait_time)
                     continue
@@ -233,7 +260,7 @@ def make_places_request_with_retry(url, params=None, headers=None, json_body=Non
 
         except Exception as e:
             if attempt < max_retries - 1:
-                wait_time = (2 ** attempt) * 0.1
+                wait_time = backoff_seconds(attempt)
                 console.print(f"    Request exception: {str(e)}. Retrying in {wait_time*1000:.0f}ms...", style="green")
                 time.sleep(wait_time)
             else:
@@ -243,8 +270,13 @@ def make_places_request_with_retry(url, params=None, headers=None, json_body=Non
     return {'status': 'ERROR', 'error_message': 'Max retries exceeded'}
 
 def get_geocode_data(address):
+    cached = location_cache.get_geocode(address)
+    if cached is not None:
+        console.print(f"Using cached geocode for: {address}", style="green")
+        return cached
+
     console.print(f"Getting geocode for: {address}", style="green")
-    response = requests.get(
+    response = http_get(
         "https://maps.googleapis.com/maps/api/geocode/json",
         params={
             "key": os.getenv("GOOGLE_KEY"),
@@ -265,16 +297,23 @@ def get_geocode_data(address):
 
     location = data["results"][0]["geometry"]["location"]
 
-    return {
+    geocode = {
         "lon": location["lng"],
         "lat": location["lat"],
         "county": county,
         "neighborhood": neighborhood,
     }
+    location_cache.set_geocode(address, geocode)
+    return geocode
 
 def get_walkscore_data(lng, lat, address):
+    cached = location_cache.get_walkscore(address)
+    if cached is not None:
+        console.print(f"Using cached walkscore data for: {address}", style="green")
+        return cached["walk_score"], cached["transit_score"], cached["bike_score"]
+
     console.print(f"Getting walkscore data for: {address}", style="green")
-    response = requests.get(
+    response = http_get(
         "https://api.walkscore.com/score",
         params={
             "format": "json",
@@ -298,205 +337,232 @@ def get_walkscore_data(lng, lat, address):
     except KeyError:
         bike = "NA"
 
+    location_cache.set_walkscore(address, data["walkscore"], transit, bike)
     return data["walkscore"], transit, bike
 
-def get_poi_proximity_data(lat, lon, radius_miles=5):
-    """
-    Get proximity to important points of interest using Google Places API (New)
-    Returns distances in miles to the nearest POI of each type within the radius
-    Uses field mask to minimize billing costs (only requests location data)
-
-    Args:
-        lat: Latitude coordinate
-        lon: Longitude coordinate
-        radius_miles: Search radius in miles (default 5 miles for Des Moines area)
-    """
-    console.print(f"Getting POI proximity data for coordinates: ({lat}, {lon})", style="green")
-
-    # Convert miles to meters for Google API
-    radius_meters = int(radius_miles * 1609.34)
+POI_TYPES = [
+    ('gas_station', 'gas station'),
+    ('school', 'school'),
+    ('university', 'university'),
+    ('grocery_store', 'grocery store'),
+    ('hospital', 'hospital'),
+    ('park', 'park'),
+    ('transit_station', 'transit station')
+]
+
+# Review thresholds to filter out minor/obscure locations when counting
+POI_REVIEW_THRESHOLDS = {
+    'gas_station': 20,
+    'school': 25,
+    'university': 75,
+    'grocery_store': 65,
+    'hospital': 100,
+    'park': 5,
+    'transit_station': 1
+}
 
-    poi_types = [
-        ('gas_station', 'gas station'),
-        ('school', 'school'),
-        ('university', 'university'),
-        ('grocery_store', 'grocery store'),
-        ('hospital', 'hospital'),
-        ('park', 'park'),
-        ('transit_station', 'transit station')
-    ]
+# Upper bound on concurrent Places requests per property (one per POI type)
+POI_MAX_CONCURRENT_REQUESTS = 7
+# searchNearby never returns more than this many places, so a full response may be truncated
+PLACES_MAX_RESULTS = 20
+# Most cell searches one property may trigger; cells past it are left for the next property nearby
+POI_MAX_SEARCHES_PER_FILL = int(os.getenv("POI_MAX_SEARCHES_PER_FILL", "150"))
 
-    results = {}
-
-    for poi_type, poi_name in poi_types:
-        try:
-            # Prepare request for new Places API
-            headers = {
-                "Content-Type": "application/json",
-                "X-Goog-Api-Key": os.getenv("GOOGLE_KEY"),
-                "X-Goog-FieldMask": "places.location"  # Only request location field to minimize cost
-            }
+def search_nearby_places(lat, lon, poi_type, radius_meters):
+    """
+    Run one Places API (New) searchNearby request for a POI type.
+    The field mask covers both the distance (location) and count (userRatingCount)
+    calculations, so a single request serves both.
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": os.getenv("GOOGLE_KEY"),
+        "X-Goog-FieldMask": "places.location,places.userRatingCount"  # Only the fields we use, to minimize cost
+    }
 
-            json_body = {
-                "includedTypes": [poi_type],
-                "locationRestriction": {
-                    "circle": {
-                        "center": {
-                            "latitude": lat,
-                            "longitude": lon
-                        },
-                        "radius": radius_meters
-                    }
-                }
+    json_body = {
+        "includedTypes": [poi_type],
+        "maxResultCount": PLACES_MAX_RESULTS,
+        "locationRestriction": {
+            "circle": {
+                "center": {
+                    "latitude": lat,
+                    "longitude": lon
+                },
+                "radius": radius_meters
             }
+        }
+    }
 
-            # Use retry helper for robust API calls with new API endpoint
-            data = make_places_request_with_retry(
-                "https://places.googleapis.com/v1/places:searchNearby",
-                headers=headers,
-                json_body=json_body,
-                method='POST'
-            )
-
-            # New API returns 'places' array instead of 'results'
-            places = data.get('places', [])
-
-            # Handle no results (not an error in new API)
-            if not places:
-                console.print(f"  No {poi_name} found within {radius_miles} miles", style="green")
-                results[f'{poi_type}_distance_miles'] = None
-                continue
+    # Use retry helper for robust API calls with new API endpoint
+    data = make_places_request_with_retry(
+        "https://places.googleapis.com/v1/places:searchNearby",
+        headers=headers,
+        json_body=json_body,
+        method='POST'
+    )
 
-            # Find closest result by calculating distances
-            closest_distance = float('inf')
+    # An error body (bad key, quota, retries exhausted) must not pass for "no places here",
+    # or the empty result would be cached for the cell
+    if 'error' in data:
+        error = data['error']
+        raise RuntimeError(f"Places searchNearby failed ({error.get('code', 'UNKNOWN')}): {error.get('message', 'No error message provided')}")
+    if data.get('status') == 'ERROR':
+        raise RuntimeError(f"Places searchNearby failed: {data.get('error_message', 'No error message provided')}")
+
+    # New API returns 'places' array instead of 'results' (and omits it when nothing matched)
+    return data.get('places', [])
+
+def get_nearest_poi_distance(distances, poi_name, radius_miles):
+    """Distance in miles to the closest place within the radius, or None if nothing was found"""
+    in_radius = distances[distances <= radius_miles]
+    if in_radius.size == 0:
+        console.print(f"  No {poi_name} found within {radius_miles} miles", style="green")
+        return None
 
-            for place in places:
-                # New API structure: place['location']['latitude'] instead of place['geometry']['location']['lat']
-                place_location = place.get('location', {})
-                poi_lat = place_location.get('latitude')
-                poi_lon = place_location.get('longitude')
+    closest_distance = float(in_radius.min())
+    console.print(f"  Found nearest {poi_name}: {closest_distance:.2f} miles", style="green")
+    return round(closest_distance, 2)
 
-                if poi_lat is not None and poi_lon is not None:
-                    distance = haversine_distance(lat, lon, poi_lat, poi_lon)
-                    if distance < closest_distance:
-                        closest_distance = distance
+def count_established_pois(distances, rating_counts, poi_type, poi_name, radius_miles):
+    """Count places within the radius with enough reviews to be an established/major location"""
+    in_radius = distances <= radius_miles
+    total_results = int(in_radius.sum())
+    if total_results == 0:
+        console.print(f"  Found 0 {poi_name}s within {radius_miles} miles", style="green")
+        return 0
 
-            if closest_distance != float('inf'):
-                results[f'{poi_type}_distance_miles'] = round(closest_distance, 2)
-                console.print(f"  Found nearest {poi_name}: {closest_distance:.2f} miles", style="green")
-            else:
-                results[f'{poi_type}_distance_miles'] = None
+    min_reviews = POI_REVIEW_THRESHOLDS.get(poi_type, 0)
+    count = int((in_radius & (rating_counts >= min_reviews)).sum())
 
-        except Exception as e:
-            console.print(f"Error fetching {poi_name} data: {str(e)}", style="bold red")
-            results[f'{poi_type}_distance_miles'] = None
-
-    return results
-
-def get_poi_count_data(lat, lon, radius_miles=5):
+    # Log filtering stats
+    if count < total_results:
+        console.print(f"  Found {count} {poi_name}(s) (filtered from {total_results} with ≥{min_reviews} reviews)", style="green")
+    else:
+        console.print(f"  Found {count} {poi_name}(s)", style="green")
+    return count
+
+def fetch_poi_cell(cell, poi_type):
+    """Search Places for every POI of a type inside a cell and store them in the POI cell cache"""
+    lat, lon, radius_miles = poi_cache.search_circle(cell)
+    places = search_nearby_places(lat, lon, poi_type, int(radius_miles * METERS_PER_MILE))
+    if len(places) >= PLACES_MAX_RESULTS:
+        console.print(f"  {poi_type} search for cell {cell} came back full - its count may be incomplete", style="yellow")
+    return poi_cache.set_places(cell, poi_type, places)
+
+def get_poi_data(lat, lon, radius_miles=5, max_workers=POI_MAX_CONCURRENT_REQUESTS):
     """
-    Count number of POIs within a radius using Google Places API (New)
-    Returns counts of each POI type within the specified radius
-    Filters by review count to focus on established/major locations
-    Uses field mask to minimize billing costs (only requests userRatingCount)
+    Get proximity to and counts of important points of interest using Google Places API (New)
+
+    POIs come from the geohash cell cache (see poi_cache.py): every cell within the
+    radius contributes its places. Only cells that haven't been searched yet for a POI
+    type are sent to searchNearby - nearest first, at most POI_MAX_SEARCHES_PER_FILL of
+    them, concurrently on a bounded thread pool - and nearest distance and review-filtered
+    count are then computed locally with vectorized haversine over the cells' places.
 
     Args:
         lat: Latitude coordinate
         lon: Longitude coordinate
         radius_miles: Search radius in miles (default 5 miles for Des Moines area)
+        max_workers: Maximum number of concurrent Places requests
+
+    Returns:
+        Dict with {poi_type}_distance_miles and {poi_type}_count_{radius}mi for every POI type
     """
-    console.print(f"Counting POIs within {radius_miles} miles for coordinates: ({lat}, {lon})", style="green")
-
-    # Convert miles to meters for Google API
-    radius_meters = int(radius_miles * 1609.34)
-
-    poi_types = [
-        ('gas_station', 'gas station'),
-        ('school', 'school'),
-        ('university', 'university'),
-        ('grocery_store', 'grocery store'),
-        ('hospital', 'hospital'),
-        ('park', 'park'),
-        ('transit_station', 'transit station')
-    ]
-
-    # Review thresholds to filter out minor/obscure locations
-    review_thresholds = {
-        'gas_station': 20,
-        'school': 25,
-        'university': 75,
-        'grocery_store': 65,
-        'hospital': 100,
-        'park': 5,
-        'transit_station': 1
-    }
+    console.print(f"Getting POI proximity and count data for coordinates: ({lat}, {lon})", style="green")
+
+    cells = poi_cache.cells_within(lat, lon, radius_miles)
+    cell_places = {}
+    errors = {}
+    uncovered = []
+    for cell in cells:
+        for poi_type, _ in POI_TYPES:
+            if poi_type in errors:
+                continue
+            try:
+                places = poi_cache.get_places(cell, poi_type)
+            except Exception as e:
+                errors[poi_type] = e
+                continue
+            if places is None:
+                uncovered.append((cell, poi_type))
+            else:
+                cell_places[(cell, poi_type)] = places
+
+    if uncovered:
+        to_search = uncovered[:POI_MAX_SEARCHES_PER_FILL]
+        console.print(f"  Searching Places for {len(to_search)} uncovered cell/POI type pair(s) across {len(cells)} cells", style="green")
+        if len(uncovered) > len(to_search):
+            console.print(f"  Left {len(uncovered) - len(to_search)} farther cell searches for later (limit {POI_MAX_SEARCHES_PER_FILL}) - counts may be low until they're filled", style="yellow")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                (cell, poi_type): executor.submit(fetch_poi_cell, cell, poi_type)
+                for cell, poi_type in to_search
+            }
+        for (cell, poi_type), future in futures.items():
+            try:
+                cell_places[(cell, poi_type)] = future.result()
+            except Exception as e:
+                errors.setdefault(poi_type, e)
+    else:
+        console.print(f"  All POI types served from cell cache ({len(cells)} cells)", style="green")
 
     results = {}
 
-    for poi_type, poi_name in poi_types:
+    # Summarize in a fixed order so the log reads the same as the sequential version
+    for poi_type, poi_name in POI_TYPES:
+        distance_key = f'{poi_type}_distance_miles'
+        count_key = f'{poi_type}_count_{int(radius_miles)}mi'
         try:
-            # Prepare request for new Places API
-            headers = {
-                "Content-Type": "application/json",
-                "X-Goog-Api-Key": os.getenv("GOOGLE_KEY"),
-                "X-Goog-FieldMask": "places.userRatingCount"  # Only request rating count to minimize cost
-            }
+            if poi_type in errors:
+                raise errors[poi_type]
+            found = [cell_places[(cell, poi_type)] for cell in cells if (cell, poi_type) in cell_places]
+            poi_lats, poi_lons, rating_counts = (np.concatenate(arrays) for arrays in zip(*found)) if found else (np.empty(0),) * 3
+            distances = haversine_miles(lat, lon, poi_lats, poi_lons)
+            results[distance_key] = get_nearest_poi_distance(distances, poi_name, radius_miles)
+            results[count_key] = count_established_pois(distances, rating_counts, poi_type, poi_name, radius_miles)
+        except Exception as e:
+            console.print(f"Error fetching {poi_name} data: {str(e)}", style="bold red")
+            results[distance_key] = None
+            results[count_key] = 0
 
-            json_body = {
-                "includedTypes": [poi_type],
-                "locationRestriction": {
-                    "circle": {
-                        "center": {
-                            "latitude": lat,
-                            "longitude": lon
-                        },
-                        "radius": radius_meters
-                    }
-                }
-            }
+    return results
 
-            # Use retry helper for robust API calls with new API endpoint
-            data = make_places_request_with_retry(
-                "https://places.googleapis.com/v1/places:searchNearby",
-                headers=headers,
-                json_body=json_body,
-                method='POST'
-            )
+def compute_portfolio_poi_data(lats, lons, radius_miles=5):
+    """
+    Recompute POI distances and counts for many properties at once from the POI cell
+    cache, with no Places calls. Cells don't overlap, so all stored places of a type form
+    one set; one KD-tree per POI type answers nearest-distance and count-within-radius for
+    the whole portfolio in a single batch query.
 
-            # New API returns 'places' array instead of 'results'
-            places = data.get('places', [])
-            count = 0
-
-            if places:
-                total_results = len(places)
-                min_reviews = review_thresholds.get(poi_type, 0)
-
-                # Filter by review count (new API uses 'userRatingCount' instead of 'user_ratings_total')
-                filtered_results = [
-                    place for place in places
-                    if place.get('userRatingCount', 0) >= min_reviews
-                ]
-                count = len(filtered_results)
-
-                # Log filtering stats
-                if total_results > 0:
-                    if count < total_results:
-                        console.print(f"  Found {count} {poi_name}(s) (filtered from {total_results} with ≥{min_reviews} reviews)", style="green")
-                    else:
-                        console.print(f"  Found {count} {poi_name}(s)", style="green")
-                else:
-                    console.print(f"  Found {count} {poi_name}(s)", style="green")
-            else:
-                console.print(f"  Found 0 {poi_name}s within {radius_miles} miles", style="green")
-            # Error messages already handled by retry helper
+    Args:
+        lats: Array of property latitudes
+        lons: Array of property longitudes
+        radius_miles: Radius used for distances and counts (default 5 miles)
 
-            results[f'{poi_type}_count_{int(radius_miles)}mi'] = count
+    Returns:
+        Tuple of (dict of {column: array} in get_poi_data's format, boolean array of which
+        properties have every cell within the radius cached - results for the others are incomplete)
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    poi_types = [poi_type for poi_type, _ in POI_TYPES]
+    covered_cells = poi_cache.covered_cells(poi_types)
+    covered = np.array(
+        [all(cell in covered_cells for cell in poi_cache.cells_within(lat, lon, radius_miles)) for lat, lon in zip(lats, lons)],
+        dtype=bool,
+    )
 
-        except Exception as e:
-            console.print(f"Error counting {poi_name}s: {str(e)}", style="bold red")
-            results[f'{poi_type}_count_{int(radius_miles)}mi'] = 0
+    results = {}
+    for poi_type in poi_types:
+        poi_lats, poi_lons, rating_counts = poi_cache.get_all_places(poi_type)
+        established = rating_counts >= POI_REVIEW_THRESHOLDS.get(poi_type, 0)
+        distances = PoiIndex(poi_lats, poi_lons).nearest_miles(lats, lons, max_miles=radius_miles)
+        counts = PoiIndex(poi_lats[established], poi_lons[established]).count_within(lats, lons, radius_miles)
+        results[f'{poi_type}_distance_miles'] = np.where(covered, np.round(distances, 2), np.nan)
+        results[f'{poi_type}_count_{int(radius_miles)}mi'] = np.where(covered, counts, 0)
 
-    return results
+    return results, covered
 
 def collect_property_details():
     full_address = questionary.text("Full address").ask()
@@ -539,16 +605,18 @@ def add_property_to_supabase(property_details, supabase) -> bool:
         lon = geocode["lon"]
         lat = geocode["lat"]
         console.print(f"Found long: {lon} and lat: {lat}", style="green bold")
-        walk, transit, bike = get_walkscore_data(
-            lon, lat, property_details["full_address"]
-        )
+        # Walk Score and the Places lookups only depend on the coordinates, so run them together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            walkscore_future = executor.submit(
+                get_walkscore_data, lon, lat, property_details["full_address"]
+            )
+            poi_future = executor.submit(get_poi_data, lat, lon, radius_miles=5)
+            walk, transit, bike = walkscore_future.result()
+            poi_data = poi_future.result()
         console.print(
             f"Found walk score: {walk}, transit: {transit}, bike: {bike}",
             style="green bold",
         )
-        poi_distance_data = get_poi_proximity_data(lat, lon, radius_miles=5)
-        poi_count_data = get_poi_count_data(lat, lon, radius_miles=5)
-        poi_data = {**poi_distance_data, **poi_count_data}
         console.print("Found POI proximity and count data", style="green bold")
     except Exception as e:
         console.print(e, style="bold red")
@@ -627,207 +695,115 @@ def create_placeholder_unit_configs_singlefamily(address1, beds):
         })
     return unit_configs
 
-def save_comps_to_db(comps, subject_rent_id, supabase):
-    for comp in comps:
-        comp_row = {
-            "id": comp.get("id"),
-            "address": comp.get("formattedAddress"),
-            "county": comp.get("county"),
-            "latitude": comp.get("latitude"),
-            "longitude": comp.get("longitude"),
-            "property_type": comp.get("propertyType"),
-            "beds": comp.get("bedrooms"),
-            "baths": comp.get("bathrooms"),
-            "square_feet": comp.get("squareFootage"),
-            "lot_size": comp.get("lotSize"),
-            "built_in": comp.get("yearBuilt"),
-            "rent_price": comp.get("price"),
-            "status": comp.get("status"),
-            "days_old": comp.get("daysOld"),
-        }
-
-        try:
-            # Check if this comparable already exists
-            existing = (
-                supabase.table("comparable_rents")
-                .select("id")
-                .eq("id", comp_row["id"])
-                .execute()
-            )
-
-            if existing.data:
-                console.print(
-                    f"Comparable {comp_row['id']} already exists, creating new relationship...", style="green"
-                )
-            else:
-                query = supabase.table("comparable_rents").insert(comp_row)
-                response = query.execute()
-
-                if hasattr(response, "data"):
-                    console.print(f"Response data: {response.data} (save_comps_to_db)", style="green")
-                else:
-                    console.print("Response has no 'data' attribute (save_comps_to_db)", style="green")
-
-            existing_join = (
-                supabase.table("rent_comp_to_rent_estimate")
-                .select("id, distance, correlation")
-                .eq("estimate_id", subject_rent_id)
-                .eq("comp_id", comp.get("id"))
-                .execute()
-            )
-
-            if existing_join.data:
-                # Check if distance/correlation are missing and update if needed
-                existing_record = existing_join.data[0]
-                needs_update = (
-                    existing_record.get("distance") is None or 
-                    existing_record.get("correlation") is None
-                )
-                
-                if needs_update:
-                    console.print(
-                        f"Updating distance/correlation for existing relationship: {comp_row['id']} <-> {subject_rent_id}", style="green"
-                    )
-                    update_data = {
-                        "distance": comp.get("distance"),
-                        "correlation": comp.get("correlation")
-                    }
-
-                    update_query = (
-                        supabase.table("rent_comp_to_rent_estimate")
-                        .update(update_data)
-                        .eq("id", existing_record["id"])
-                    )
-                    update_response = update_query.execute()
-
-                    if hasattr(update_response, "data"):
-                        console.print(f"Updated relationship data: {update_response.data}", style="green")
-                    else:
-                        console.print("Update response has no 'data' attribute", style="green")
-                else:
-                    console.print(
-                        f"{comp_row['id']} and rent estimate {subject_rent_id} are already joined with complete data, skipping..", style="green"
-                    )
-                continue
-
-            join_row = {
-                "comp_id": comp.get("id"), 
-                "estimate_id": subject_rent_id,
-                "distance": comp.get("distance"),
-                "correlation": comp.get("correlation")
-            }
+def comp_to_row(comp):
+    return {
+        "id": comp.get("id"),
+        "address": comp.get("formattedAddress"),
+        "county": comp.get("county"),
+        "latitude": comp.get("latitude"),
+        "longitude": comp.get("longitude"),
+        "property_type": comp.get("propertyType"),
+        "beds": comp.get("bedrooms"),
+        "baths": comp.get("bathrooms"),
+        "square_feet": comp.get("squareFootage"),
+        "lot_size": comp.get("lotSize"),
+        "built_in": comp.get("yearBuilt"),
+        "rent_price": comp.get("price"),
+        "status": comp.get("status"),
+        "days_old": comp.get("daysOld"),
+    }
 
-            query2 = supabase.table("rent_comp_to_rent_estimate").insert(join_row)
-            response2 = query2.execute()
+def save_comps_batch(comps, join_table, subject_column, subject_value, supabase):
+    """
+    Persist a RentCast comparables list and link it to its subject in a fixed number
+    of round-trips, however many comps there are:
+      1. upsert every comp into comparable_rents (existing comps are left untouched)
+      2. fetch the subject's existing join rows for these comps with one in_ query
+      3. insert all missing join rows in one call
+      4. upsert the join rows that are missing distance/correlation in one call
 
-            if hasattr(response2, "data"):
-                console.print(f"Response2 data: {response2.data} (save_comps_to_db)", style="green")
-            else:
-                console.print("Response2 has no 'data' attribute (save_comps_to_db)", style="green")
-        except Exception as e:
-            console.print(f"Exception: {e} (save_comps_to_db)", style="bold red")
-            console.print(f"Exception type: {type(e)} (save_comps_to_db)", style="bold red")
+    Args:
+        comps: Comparables from a RentCast response
+        join_table: rent_comp_to_rent_estimate, rent_comp_to_property or sale_comp_to_property
+        subject_column: Join column for the subject (estimate_id or address1)
+        subject_value: The subject's id/address1
 
-def save_property_comps_to_db(comps, address1, supabase):
-    for comp in comps:
-        comp_row = {
-            "id": comp.get("id"),
-            "address": comp.get("formattedAddress"),
-            "county": comp.get("county"),
-            "latitude": comp.get("latitude"),
-            "longitude": comp.get("longitude"),
-            "property_type": comp.get("propertyType"),
-            "beds": comp.get("bedrooms"),
-            "baths": comp.get("bathrooms"),
-            "square_feet": comp.get("squareFootage"),
-            "lot_size": comp.get("lotSize"),
-            "built_in": comp.get("yearBuilt"),
-            "rent_price": comp.get("price"),
-            "status": comp.get("status"),
-            "days_old": comp.get("daysOld"),
+    Returns:
+        Dict with counts of new_links and updated_links
+    """
+    # RentCast can repeat a comp; a batch upsert can't touch the same row twice
+    comps_by_id = {}
+    for comp in comps or []:
+        if comp.get("id") is not None:
+            comps_by_id.setdefault(comp["id"], comp)
+    if not comps_by_id:
+        return {"new_links": 0, "updated_links": 0}
+
+    comp_ids = list(comps_by_id.keys())
+
+    supabase.table("comparable_rents").upsert(
+        [comp_to_row(comp) for comp in comps_by_id.values()],
+        on_conflict="id",
+        ignore_duplicates=True,
+    ).execute()
+
+    existing_joins = (
+        supabase.table(join_table)
+        .select("id, comp_id, distance, correlation")
+        .eq(subject_column, subject_value)
+        .in_("comp_id", comp_ids)
+        .execute()
+    )
+    joins_by_comp = {row["comp_id"]: row for row in (existing_joins.data or [])}
+
+    new_joins = []
+    updated_joins = []
+    for comp_id, comp in comps_by_id.items():
+        join_row = {
+            "comp_id": comp_id,
+            subject_column: subject_value,
+            "distance": comp.get("distance"),
+            "correlation": comp.get("correlation"),
         }
+        existing = joins_by_comp.get(comp_id)
+        if existing is None:
+            new_joins.append(join_row)
+        elif existing.get("distance") is None or existing.get("correlation") is None:
+            updated_joins.append({"id": existing["id"], **join_row})
 
-        try:
-            # Check if this comparable already exists
-            existing = (
-                supabase.table("comparable_rents")
-                .select("id")
-                .eq("id", comp_row["id"])
-                .execute()
-            )
+    if new_joins:
+        supabase.table(join_table).insert(new_joins).execute()
+    if updated_joins:
+        supabase.table(join_table).upsert(updated_joins, on_conflict="id").execute()
 
-            if existing.data:
-                console.print(
-                    f"Comparable {comp_row['id']} already exists, creating new relationship...", style="green"
-                )
-            else:
-                query = supabase.table("comparable_rents").insert(comp_row)
-                response = query.execute()
-
-                if hasattr(response, "data"):
-                    console.print(f"Response data: {response.data} (save_property_comps_to_db)", style="green")
-                else:
-                    console.print("Response has no 'data' attribute (save_property_comps_to_db)", style="green")
-
-            existing_join = (
-                supabase.table("rent_comp_to_property")
-                .select("id, distance, correlation")
-                .eq("address1", address1)
-                .eq("comp_id", comp.get("id"))
-                .execute()
-            )
+    # Comp tables embedded in rent research prompts are cached per address
+    invalidate_comp_table_cache(subject_value if subject_column == "address1" else None)
 
-            if existing_join.data:
-                # Check if distance/correlation are missing and update if needed
-                existing_record = existing_join.data[0]
-                needs_update = (
-                    existing_record.get("distance") is None or
-                    existing_record.get("correlation") is None
-                )
-
-                if needs_update:
-                    console.print(
-                        f"Updating distance/correlation for existing relationship: {comp_row['id']} <-> {address1}", style="green"
-                    )
-                    update_data = {
-                        "distance": comp.get("distance"),
-                        "correlation": comp.get("correlation")
-                    }
-
-                    update_query = (
-                        supabase.table("rent_comp_to_property")
-                        .update(update_data)
-                        .eq("id", existing_record["id"])
-                    )
-                    update_response = update_query.execute()
-
-                    if hasattr(update_response, "data"):
-                        console.print(f"Updated relationship data: {update_response.data}", style="green")
-                    else:
-                        console.print("Update response has no 'data' attribute", style="green")
-                else:
-                    console.print(
-                        f"{comp_row['id']} and property {address1} are already joined with complete data, skipping..", style="green"
-                    )
-                continue
+    return {"new_links": len(new_joins), "updated_links": len(updated_joins)}
 
-            join_row = {
-                "comp_id": comp.get("id"),
-                "address1": address1,
-                "distance": comp.get("distance"),
-                "correlation": comp.get("correlation")
-            }
-
-            query2 = supabase.table("rent_comp_to_property").insert(join_row)
-            response2 = query2.execute()
+def save_comps_to_db(comps, subject_rent_id, supabase):
+    try:
+        result = save_comps_batch(comps, "rent_comp_to_rent_estimate", "estimate_id", subject_rent_id, supabase)
+        console.print(
+            f"Saved {len(comps or [])} comparables for rent estimate {subject_rent_id}: "
+            f"{result['new_links']} new relationships, {result['updated_links']} updated (save_comps_to_db)",
+            style="green",
+        )
+    except Exception as e:
+        console.print(f"Exception: {e} (save_comps_to_db)", style="bold red")
+        console.print(f"Exception type: {type(e)} (save_comps_to_db)", style="bold red")
 
-            if hasattr(response2, "data"):
-                console.print(f"Response2 data: {response2.data} (save_property_comps_to_db)", style="green")
-            else:
-                console.print("Response2 has no 'data' attribute (save_property_comps_to_db)", style="green")
-        except Exception as e:
-            console.print(f"Exception: {e} (save_property_comps_to_db)", style="bold red")
-            console.print(f"Exception type: {type(e)} (save_property_comps_to_db)", style="bold red")
+def save_property_comps_to_db(comps, address1, supabase):
+    try:
+        result = save_comps_batch(comps, "rent_comp_to_property", "address1", address1, supabase)
+        console.print(
+            f"Saved {len(comps or [])} comparables for {address1}: "
+            f"{result['new_links']} new relationships, {result['updated_links']} updated (save_property_comps_to_db)",
+            style="green",
+        )
+    except Exception as e:
+        console.print(f"Exception: {e} (save_property_comps_to_db)", style="bold red")
+        console.print(f"Exception type: {type(e)} (save_property_comps_to_db)", style="bold red")
 
 def add_rent_to_supabase(rent_comps, comparables, supabase) -> bool:
     new_ids = []
@@ -1,23 +1,58 @@
 import os
 import time
 import pandas as pd
-from threading import Lock
+from threading import Lock, Thread
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from supabase import create_client, Client
-from run import reload_dataframe, get_phase1_research_list
-from inspections import InspectionsClient
 from helpers import convert_numpy_types
+from dataframe_helpers import get_closing_costs_breakdown
+from property_store import PropertyStore
+from snapshot import SNAPSHOT_DIR, SnapshotStore, request_refresh
+from change_listener import create_change_listener
 
 load_dotenv()
 
-supabase: Client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
-inspections_client = InspectionsClient(supabase)
-df = None
-rents = None
-loan = 2
+class AppContext:
+    """
+    Process-wide API state, initialized lazily.
+
+    Nothing here touches the network at import time: lifespan starts load() on a
+    background thread so uvicorn binds the port right away, `/` answers liveness
+    immediately and `/ready` reports when property data can actually be served.
+    """
+
+    def __init__(self):
+        self._supabase = None
+        # When PROPDEALS_SNAPSHOT_DIR is set, workers serve from the shared snapshot written by
+        # refresher.py instead of loading from Supabase themselves
+        self.snapshot_store = SnapshotStore(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+        self.df = None
+        self.rents = None
+        self.store = None
+        self.session_loan = None
+        self.ready = False
+        self.load_error = None
+        self.started_at = time.time()
+        self.loaded_at = None
+        self.change_listener = None
+
+    @property
+    def supabase(self) -> Client:
+        if self._supabase is None:
+            self._supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        return self._supabase
+
+    def mark_loaded(self):
+        self.ready = self.store is not None or self.df is not None
+        self.load_error = None if self.ready else "No property data available"
+        if self.ready and self.loaded_at is None:
+            self.loaded_at = time.time()
+
+ctx = AppContext()
 
 # Phase1 tour list cache
 phase1_cache = {
@@ -27,48 +62,65 @@ phase1_cache = {
 }
 CACHE_TTL_SECONDS = 300  # 5 minutes
 
-def load_loan_details():
-    try:
-        fha_loan_get_response = supabase.table('loans').select("*").eq("id", 2).limit(1).single().execute()
-        loan_data = fha_loan_get_response.data
-        print("✅ Loaded loan details from database")
-        return {
-            'interest_rate': float(loan_data['interest_rate']),
-            'apr_rate': float(loan_data['apr_rate']),
-            'down_payment_rate': float(loan_data['down_payment_rate']),
-            'years': int(loan_data['years']),
-            'mip_upfront_rate': float(loan_data['mip_upfront_rate']),
-            'mip_annual_rate': float(loan_data['mip_annual_rate'])
-        }
-    except Exception as e:
-        print(f"⚠️ Failed to load loan details from database: {str(e)}")
-        print("🔧 Using default loan settings")
-
-loan_details = load_loan_details()
-interest_rate = loan_details['interest_rate']
-apr_rate = loan_details['apr_rate']
-down_payment_rate = loan_details['down_payment_rate']
-loan_length_years = loan_details['years']
-mip_upfront_rate = loan_details['mip_upfront_rate']
-mip_annual_rate = loan_details['mip_annual_rate']
-
 def reload_dataframe_logic():
-    global df, rents
-    
+    if ctx.snapshot_store is not None:
+        ctx.snapshot_store.refresh()
+        if ctx.snapshot_store.loaded:
+            ctx.store = ctx.snapshot_store
+            ctx.session_loan = ctx.snapshot_store.loan
+        ctx.mark_loaded()
+        return
+
     try:
+        from run import reload_dataframe
         reload_dataframe()
-        from run import df as run_df, rents as run_rents
-        df = run_df.copy()
-        rents = run_rents.copy() if run_rents is not None else None
-        
+        from run import df as run_df, rents as run_rents, LOAN as run_loan
+        ctx.df = run_df.copy()
+        ctx.rents = run_rents.copy() if run_rents is not None else None
+        ctx.store = PropertyStore(ctx.df, ctx.rents)
+        ctx.session_loan = run_loan
+
     except Exception as e:
         print(f"⚠️ Failed to use run.py reload logic: {str(e)}")
         print("🔧 Using basic property data loading")
 
         # Fallback: just load properties without full calculations
-        properties_get_response = supabase.table('properties').select('*').limit(10000).execute()
-        df = pd.DataFrame(properties_get_response.data)
-        rents = None
+        properties_get_response = ctx.supabase.table('properties').select('*').limit(10000).execute()
+        ctx.df = pd.DataFrame(properties_get_response.data)
+        ctx.rents = None
+        ctx.store = None
+
+    ctx.mark_loaded()
+
+def initialize_app_context():
+    """Load property data and start the change listener. Runs on a background thread."""
+    print("📊 Loading property data...")
+    try:
+        with phase1_cache['lock']:
+            reload_dataframe_logic()
+        count = len(ctx.store) if ctx.store is not None else (len(ctx.df) if ctx.df is not None else 0)
+        print(f"✅ Loaded {count} properties in {time.time() - ctx.started_at:.1f}s")
+    except Exception as e:
+        ctx.load_error = str(e)
+        print(f"⚠️ Failed to load property data during startup: {str(e)}")
+        print("🚀 API will keep running without data - data will be loaded on first request")
+
+    if ctx.snapshot_store is None:
+        ctx.change_listener = create_change_listener(ctx.supabase, apply_property_changes)
+        if ctx.change_listener is not None:
+            ctx.change_listener.start()
+
+def refresh_snapshot_if_due():
+    """Snapshot mode: pick up a newly published snapshot without waiting for a tour-list cache miss"""
+    if ctx.snapshot_store is None or not ctx.snapshot_store.refresh_if_due():
+        return
+    with phase1_cache['lock']:
+        ctx.store = ctx.snapshot_store
+        ctx.session_loan = ctx.snapshot_store.loan
+        ctx.mark_loaded()
+        # The cached tour list was built from the previous version
+        phase1_cache['data'] = None
+        phase1_cache['timestamp'] = 0
 
 def get_cached_phase1_tour_list():
     """Get cached phase1 tour list if fresh, otherwise recalculate"""
@@ -84,8 +136,14 @@ def get_cached_phase1_tour_list():
 
         # Cache miss or stale - recalculate
         reload_dataframe_logic()
-        tour_list, _ = get_phase1_research_list()
-        converted = convert_numpy_types(tour_list.to_dict('records'))
+        if ctx.snapshot_store is not None:
+            if not ctx.snapshot_store.loaded:
+                raise RuntimeError("No snapshot has been published yet")
+            converted = convert_numpy_types(ctx.snapshot_store.get_tour_list())
+        else:
+            from run import get_phase1_research_list
+            tour_list, _ = get_phase1_research_list()
+            converted = convert_numpy_types(tour_list.to_dict('records'))
         result = {"properties": converted}
 
         # Update cache
@@ -94,24 +152,59 @@ def get_cached_phase1_tour_list():
 
         return result
 
+def patch_tour_list(entries, addresses, updated_entries, address_order):
+    """
+    Replace tour list entries for the changed addresses, then re-sort the list the way
+    get_phase1_research_list orders it: by qualification type, then by position in the
+    dataframe (address_order), so a patched list matches a full recompute
+    """
+    from run import tour_list_sort_key
+
+    patched = [entry for entry in entries if entry["address1"] not in addresses]
+    patched.extend(updated_entries)
+    sort_key = tour_list_sort_key(address_order)
+    patched.sort(key=lambda entry: sort_key(entry.get("qualification_type"), entry["address1"]))
+    return patched
+
+def apply_property_changes(addresses):
+    """Change listener callback: recompute only the changed addresses and patch the tour list cache in place"""
+    global phase1_cache
+
+    with phase1_cache['lock']:
+        if addresses is None or ctx.df is None:
+            reload_dataframe_logic()
+            phase1_cache['data'] = None
+            phase1_cache['timestamp'] = 0
+            return
+
+        import run
+        run.reload_properties(addresses)
+        ctx.df = run.df.copy()
+        ctx.rents = run.rents.copy() if run.rents is not None else None
+        ctx.store = PropertyStore(ctx.df, ctx.rents)
+
+        if phase1_cache['data'] is not None:
+            changed_df = run.df[run.df["address1"].isin(addresses)]
+            changed_tour_list, _ = run.get_phase1_research_list(properties_df=changed_df)
+            updated_entries = convert_numpy_types(changed_tour_list.to_dict('records'))
+            phase1_cache['data'] = {
+                "properties": patch_tour_list(
+                    phase1_cache['data']['properties'], addresses, updated_entries, run.df["address1"].tolist()
+                )
+            }
+            phase1_cache['timestamp'] = time.time()
+
+        print(f"🔄 Applied changes for {len(addresses)} properties")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global df, rents
     print("🔄 Starting PropDeals API...")
-    
-    try:
-        print("📊 Loading property data...")
-        properties_get_response = supabase.table('properties').select('*').limit(10000).execute()
-        df = pd.DataFrame(properties_get_response.data)
-        reload_dataframe_logic()
-        print(f"✅ Loaded {len(df) if df is not None else 0} properties")
-    except Exception as e:
-        print(f"⚠️ Failed to load property data during startup: {str(e)}")
-        print("🚀 API will start without data - data will be loaded on first request")
-        df = None
-        rents = None
-    
+    Thread(target=initialize_app_context, name="app-context-loader", daemon=True).start()
+
     yield
+
+    if ctx.change_listener is not None:
+        ctx.change_listener.stop()
     print("🛑 Shutting down PropDeals API")
 
 app = FastAPI(
@@ -131,21 +224,37 @@ app.add_middleware(
 
 @app.get("/")
 async def root():
-    global df, rents
-    
+    """Liveness - the process is up and serving requests, whether or not data has loaded"""
     data_status = {
-        "properties_loaded": df is not None and not df.empty,
-        "property_count": len(df) if df is not None else 0,
-        "rents_loaded": rents is not None and not rents.empty if rents is not None else False
+        "properties_loaded": (ctx.store is not None and len(ctx.store) > 0) or (ctx.df is not None and not ctx.df.empty),
+        "property_count": len(ctx.store) if ctx.store is not None else (len(ctx.df) if ctx.df is not None else 0),
+        "rents_loaded": ctx.rents is not None and not ctx.rents.empty if ctx.rents is not None else False
     }
-    
+
     return {
-        "message": "PropDeals API is running", 
+        "message": "PropDeals API is running",
         "version": "1.0.0",
         "status": "healthy",
         "data": data_status
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness - 200 once property data can be served, 503 while still loading"""
+    if not ctx.ready and ctx.snapshot_store is not None:
+        # Snapshot mode: pick up a snapshot the refresher published after startup
+        reload_dataframe_logic()
+
+    status = {
+        "ready": ctx.ready,
+        "uptime_seconds": round(time.time() - ctx.started_at, 1),
+        "load_seconds": round(ctx.loaded_at - ctx.started_at, 1) if ctx.loaded_at else None,
+        "error": ctx.load_error,
+    }
+    if not ctx.ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
 @app.get("/properties/phase1/tour-list")
 async def get_phase1_qualifiers_route():
     try:
@@ -154,6 +263,35 @@ async def get_phase1_qualifiers_route():
         print(e)
         raise HTTPException(status_code=500, detail=f"Error filtering properties: {str(e)}")
 
+@app.get("/properties/{address1}")
+async def get_property_route(address1: str):
+    """Return metrics, rent units, closing costs and neighborhood for one property"""
+    refresh_snapshot_if_due()
+    store = ctx.store
+    if store is None:
+        raise HTTPException(status_code=503, detail="Property data is not loaded yet")
+
+    row = store.get_row(address1)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Property not found: {address1}")
+
+    try:
+        result = {
+            "address1": address1,
+            "metrics": row.to_dict(),
+            "rent_units": store.get_rents(address1).to_dict("records"),
+            "closing_costs": get_closing_costs_breakdown(row, ctx.session_loan),
+            "neighborhood": {
+                "name": row.get("neighborhood"),
+                "letter_grade": row.get("neighborhood_letter_grade"),
+                "niche_com_letter_grade": row.get("niche_com_letter_grade"),
+            },
+        }
+        return convert_numpy_types(result)
+    except Exception as e:
+        print(e)
+        raise HTTPException(status_code=500, detail=f"Error loading property: {str(e)}")
+
 @app.post("/cache/invalidate")
 async def invalidate_cache():
     """Invalidate all caches - call this after manual property updates"""
@@ -163,8 +301,11 @@ async def invalidate_cache():
         phase1_cache['data'] = None
         phase1_cache['timestamp'] = 0
 
+    if ctx.snapshot_store is not None:
+        request_refresh(SNAPSHOT_DIR)
+
     return {"message": "Cache invalidated successfully"}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,302 @@
+"""
+Cost and latency ledger for every paid external call.
+
+Each Tavily, OpenAI, RentCast, Google and Walk Score call - and each cache hit that
+stood in for one - is appended as one JSON line to PROPDEALS_CACHE_DIR/api_ledger.jsonl:
+
+    {"at", "script", "provider", "endpoint", "model", "units", "input_tokens",
+     "output_tokens", "cost", "saved_cost", "latency_ms", "cache_hit", "outcome"}
+
+HTTP APIs are recorded by http_client and cache hits by the caches themselves; OpenAI
+and Tavily calls are wrapped with track(). The file is only ever appended to, so runs
+from several scripts (and threads) can share it.
+
+Report (p50/p95 latency, spend by provider and script, cache savings):
+
+    python api_ledger.py [--days 7] [--script market_research]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from response_cache import CACHE_DIR
+
+LEDGER_PATH = os.getenv("PROPDEALS_API_LEDGER", os.path.join(CACHE_DIR, "api_ledger.jsonl"))
+LEDGER_ENABLED = os.getenv("PROPDEALS_API_LEDGER_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# USD per 1M (input, output) tokens, matched on the longest model-name prefix
+OPENAI_TOKEN_PRICES = {
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5": (1.25, 10.00),
+}
+
+# USD per billed call; an endpoint missing here falls back to the provider's "*" entry
+CALL_COSTS = {
+    ("tavily", "search"): 0.008,
+    ("google", "places:searchNearby"): 0.032,
+    ("google", "geocode"): 0.005,
+    ("google", "*"): 0.0,
+    ("rentcast", "*"): float(os.getenv("RENTCAST_COST_PER_CALL", "0.07")),  # Plan overage rate
+    ("walkscore", "*"): 0.0,  # Free tier
+}
+
+HOST_PROVIDERS = {
+    "api.rentcast.io": "rentcast",
+    "maps.googleapis.com": "google",
+    "places.googleapis.com": "google",
+    "solar.googleapis.com": "google",
+    "api.walkscore.com": "walkscore",
+}
+
+_write_lock = threading.Lock()
+_script = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "interactive"
+
+
+def call_cost(provider: str, endpoint: str) -> float:
+    return CALL_COSTS.get((provider, endpoint), CALL_COSTS.get((provider, "*"), 0.0))
+
+
+def openai_cost(model: str, input_tokens: int, output_tokens: int, multiplier: float = 1.0) -> float:
+    prefix = max((name for name in OPENAI_TOKEN_PRICES if (model or "").startswith(name)), key=len, default=None)
+    if prefix is None:
+        return 0.0
+    input_price, output_price = OPENAI_TOKEN_PRICES[prefix]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000 * multiplier
+
+
+def endpoint_for_path(path: str) -> str:
+    """'/v1/avm/value' -> 'avm/value', '/maps/api/geocode/json' -> 'geocode'"""
+    for prefix in ("/v1/", "/maps/api/"):
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    path = path.strip("/")
+    if path.endswith("/json"):
+        path = path[: -len("/json")]
+    return path or "/"
+
+
+@contextmanager
+def ledger_script(name: str):
+    """Attribute calls made inside the block to a script (default: the program name)"""
+    global _script
+    previous, _script = _script, name
+    try:
+        yield
+    finally:
+        _script = previous
+
+
+def record(
+    provider: str,
+    endpoint: str,
+    latency_seconds: float = 0.0,
+    cost: float = 0.0,
+    saved_cost: float = 0.0,
+    units: int = 1,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cache_hit: bool = False,
+    outcome: str = "ok",
+    model: Optional[str] = None,
+):
+    """Append one call to the ledger. Never raises - losing a line beats failing the call."""
+    if not LEDGER_ENABLED:
+        return
+    entry = {
+        "at": time.time(),
+        "script": _script,
+        "provider": provider,
+        "endpoint": endpoint,
+        "model": model,
+        "units": units,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost": round(cost, 6),
+        "saved_cost": round(saved_cost, 6),
+        "latency_ms": round(latency_seconds * 1000, 1),
+        "cache_hit": cache_hit,
+        "outcome": outcome,
+    }
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
+            with open(LEDGER_PATH, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def record_cache_hit(provider: str, endpoint: str, latency_seconds: float = 0.0, units: int = 1):
+    """A cached response served in place of a billed call"""
+    record(
+        provider,
+        endpoint,
+        latency_seconds=latency_seconds,
+        saved_cost=call_cost(provider, endpoint) * units,
+        units=units,
+        cache_hit=True,
+    )
+
+
+@contextmanager
+def track(provider: str, endpoint: str, model: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Time a call and record it on exit. The block fills in what it learns:
+
+        with track("openai", "chat.completions", model) as call:
+            response = client.chat.completions.create(...)
+            call["input_tokens"] = response.usage.prompt_tokens
+
+    cost defaults to the token price (OpenAI) or call_cost(); an exception is recorded
+    as the outcome and re-raised.
+    """
+    call: Dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException as e:
+        call.setdefault("outcome", type(e).__name__)
+        raise
+    finally:
+        outcome = call.pop("outcome", "ok")
+        if "cost" not in call:
+            if provider == "openai":
+                call["cost"] = openai_cost(model, call.get("input_tokens", 0), call.get("output_tokens", 0))
+            else:
+                call["cost"] = call_cost(provider, endpoint) * call.get("units", 1) if outcome == "ok" else 0.0
+        record(provider, endpoint, latency_seconds=time.perf_counter() - started, outcome=outcome, model=model, **call)
+
+
+def load_entries(path: str = LEDGER_PATH, since: Optional[float] = None, script: Optional[str] = None) -> List[Dict[str, Any]]:
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by a crash
+            if since is not None and entry["at"] < since:
+                continue
+            if script is not None and entry["script"] != script:
+                continue
+            entries.append(entry)
+    return entries
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summarize(entries: List[Dict[str, Any]], key) -> Dict[Any, Dict[str, Any]]:
+    """Per-group calls, cache hits, errors, p50/p95 live latency, spend and savings"""
+    groups: Dict[Any, Dict[str, Any]] = {}
+    for entry in entries:
+        group = groups.setdefault(key(entry), {
+            "calls": 0, "cache_hits": 0, "errors": 0, "cost": 0.0, "saved_cost": 0.0,
+            "input_tokens": 0, "output_tokens": 0, "latencies": [],
+        })
+        group["calls"] += 1
+        group["cost"] += entry["cost"]
+        group["saved_cost"] += entry["saved_cost"]
+        group["input_tokens"] += entry["input_tokens"]
+        group["output_tokens"] += entry["output_tokens"]
+        if entry["cache_hit"]:
+            group["cache_hits"] += 1
+        else:
+            group["latencies"].append(entry["latency_ms"])
+        if entry["outcome"] != "ok":
+            group["errors"] += 1
+
+    for group in groups.values():
+        latencies = group.pop("latencies")
+        group["p50_ms"] = _percentile(latencies, 0.50)
+        group["p95_ms"] = _percentile(latencies, 0.95)
+    return groups
+
+
+def display_report(console: Console, entries: List[Dict[str, Any]]):
+    if not entries:
+        console.print(f"[yellow]No API calls recorded in {LEDGER_PATH}[/yellow]")
+        return
+
+    by_endpoint = Table(title="External API Calls", show_header=True, header_style="bold magenta")
+    by_endpoint.add_column("Provider", style="cyan")
+    by_endpoint.add_column("Endpoint")
+    by_endpoint.add_column("Calls", justify="right")
+    by_endpoint.add_column("Cache Hits", justify="right")
+    by_endpoint.add_column("Errors", justify="right")
+    by_endpoint.add_column("p50", justify="right")
+    by_endpoint.add_column("p95", justify="right")
+    by_endpoint.add_column("Tokens (in/out)", justify="right")
+    by_endpoint.add_column("Spend", justify="right", style="green")
+    by_endpoint.add_column("Saved", justify="right", style="yellow")
+
+    for (provider, endpoint), stats in sorted(summarize(entries, lambda e: (e["provider"], e["endpoint"])).items()):
+        tokens = (
+            f"{stats['input_tokens']:,}/{stats['output_tokens']:,}"
+            if stats["input_tokens"] or stats["output_tokens"] else "-"
+        )
+        by_endpoint.add_row(
+            provider,
+            endpoint,
+            str(stats["calls"]),
+            f"{stats['cache_hits']} ({stats['cache_hits'] / stats['calls']:.0%})",
+            str(stats["errors"]),
+            f"{stats['p50_ms']:.0f}ms",
+            f"{stats['p95_ms']:.0f}ms",
+            tokens,
+            f"${stats['cost']:.4f}",
+            f"${stats['saved_cost']:.4f}",
+        )
+    console.print(by_endpoint)
+
+    by_script = Table(title="Spend by Script", show_header=True, header_style="bold magenta")
+    by_script.add_column("Script", style="cyan")
+    by_script.add_column("Calls", justify="right")
+    by_script.add_column("Cache Hits", justify="right")
+    by_script.add_column("Spend", justify="right", style="green")
+    by_script.add_column("Saved", justify="right", style="yellow")
+
+    script_stats = summarize(entries, lambda e: e["script"])
+    for script, stats in sorted(script_stats.items(), key=lambda item: -item[1]["cost"]):
+        by_script.add_row(
+            script,
+            str(stats["calls"]),
+            str(stats["cache_hits"]),
+            f"${stats['cost']:.4f}",
+            f"${stats['saved_cost']:.4f}",
+        )
+    console.print(by_script)
+
+    total_cost = sum(stats["cost"] for stats in script_stats.values())
+    total_saved = sum(stats["saved_cost"] for stats in script_stats.values())
+    console.print(
+        f"[bold]Total spend: [green]${total_cost:.4f}[/green] | "
+        f"Saved by caches: [yellow]${total_saved:.4f}[/yellow] | "
+        f"{len(entries):,} calls since {time.strftime('%Y-%m-%d %H:%M', time.localtime(entries[0]['at']))}[/bold]"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report external API spend, latency and cache savings")
+    parser.add_argument("--days", type=float, help="Only include calls from the last N days")
+    parser.add_argument("--script", help="Only include calls made by this script")
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 24 * 60 * 60 if args.days else None
+    display_report(Console(), load_entries(since=since, script=args.script))
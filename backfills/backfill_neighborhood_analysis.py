@@ -23,6 +23,7 @@ import pandas as pd
 
 from run import load_assumptions, load_loan, reload_dataframe, get_combined_phase1_qualifiers
 from neighborhoods import NeighborhoodsClient
+from openai_batch import BATCH_MODE_ENABLED
 
 load_dotenv()
 console = Console()
@@ -230,7 +231,10 @@ def backfill_neighborhood_analyses() -> Dict:
 
     # Batch extract letter grades for all reports
     if all_report_ids:
-        extraction_results = neighborhoods_client.extract_neighborhood_grades_batch(all_report_ids)
+        # OPENAI_BATCH_MODE=true submits every extraction as one half-price Batch API job
+        extraction_results = neighborhoods_client.extract_neighborhood_grades_batch(
+            all_report_ids, use_batch_api=BATCH_MODE_ENABLED
+        )
     else:
         extraction_results = {
             'total_processed': 0,
@@ -0,0 +1,75 @@
+import os
+import time
+from dotenv import load_dotenv
+from supabase import create_client, Client
+from rich.console import Console
+from rich.panel import Panel
+from add_property import compute_portfolio_poi_data
+
+# Load environment variables
+load_dotenv()
+
+# Initialize Supabase client
+console = Console()
+supabase: Client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+console.print("[bold cyan]Starting POI Recompute from Cell Cache[/bold cyan]\n")
+console.print("[dim]Recomputes *_distance_miles and *_count_5mi for every property from cached POIs - no Places API calls[/dim]\n")
+
+# Get all properties from Supabase
+console.print("[yellow]Fetching all properties from database...[/yellow]")
+properties_response = supabase.table('properties').select('address1, lat, lon').order('address1').execute()
+properties = [p for p in (properties_response.data or []) if p.get('lat') and p.get('lon')]
+
+total = len(properties)
+console.print(f"[green]Found {total} properties with coordinates[/green]\n")
+
+started = time.perf_counter()
+poi_data, covered = compute_portfolio_poi_data(
+    [p['lat'] for p in properties],
+    [p['lon'] for p in properties],
+    radius_miles=5,
+)
+compute_ms = (time.perf_counter() - started) * 1000
+console.print(f"[green]Computed POI data for {total} properties in {compute_ms:.1f}ms[/green]\n")
+
+# Track statistics
+updated = 0
+skipped = 0
+errors = 0
+
+for i, property in enumerate(properties):
+    address1 = property['address1']
+
+    if not covered[i]:
+        # Some cells within the radius never searched - run backfill_poi_proximity.py to fill it in
+        skipped += 1
+        continue
+
+    update = {}
+    for column, values in poi_data.items():
+        value = values[i].item()
+        update[column] = None if value != value else value  # NaN -> None
+
+    try:
+        result = supabase.table("properties").update(update).eq("address1", address1).execute()
+        if result.data:
+            updated += 1
+        else:
+            errors += 1
+            console.print(f"[red]  ❌ {address1}: No data returned from database[/red]")
+    except Exception as e:
+        errors += 1
+        console.print(f"[red]  ❌ {address1}: {str(e)}[/red]")
+
+# Display summary
+console.print("\n")
+console.print(Panel(f"""
+[bold cyan]Recompute Complete![/bold cyan]
+
+Total Properties: {total}
+Successfully Updated: [green]{updated}[/green]
+Skipped (cells not cached): [yellow]{skipped}[/yellow]
+Errors: [red]{errors}[/red]
+Compute Time: {compute_ms:.1f}ms
+""", title="POI Recompute Summary", border_style="cyan"))
@@ -3,7 +3,10 @@ from dotenv import load_dotenv
 from supabase import create_client, Client
 from rich.console import Console
 from rich.panel import Panel
-from add_property import get_poi_proximity_data, get_poi_count_data
+from add_property import get_poi_data
+from api_ledger import call_cost
+from http_client import display_latency_stats
+from poi_cache import poi_cache
 
 # Load environment variables
 load_dotenv()
@@ -42,14 +45,8 @@ for i, property in enumerate(properties, 1):
     console.print(f"[cyan]{i}/{total} - Processing: {address1}[/cyan]")
 
     try:
-        # Get POI proximity data for the property (distance to nearest)
-        poi_distance_data = get_poi_proximity_data(lat, lon, radius_miles=5)
-
-        # Get POI count data for the property (count within 5 miles)
-        poi_count_data = get_poi_count_data(lat, lon, radius_miles=5)
-
-        # Merge both datasets
-        poi_data = {**poi_distance_data, **poi_count_data}
+        # Get distance to nearest POI and count within 5 miles (one request per POI type)
+        poi_data = get_poi_data(lat, lon, radius_miles=5)
 
         # Update POI distance and count fields
         result = (
@@ -62,8 +59,8 @@ for i, property in enumerate(properties, 1):
         if result.data:
             updated += 1
             # Display summary
-            found_distances = sum(1 for v in poi_distance_data.values() if v is not None)
-            total_count = sum(poi_count_data.values())
+            found_distances = sum(1 for k, v in poi_data.items() if k.endswith("_distance_miles") and v is not None)
+            total_count = sum(v for k, v in poi_data.items() if k.endswith("_5mi"))
             console.print(f"[green]  ✅ Updated {found_distances} distances, {total_count} total POIs counted[/green]")
         else:
             errors += 1
@@ -87,6 +84,7 @@ Success Rate: {(updated/total*100) if total > 0 else 0:.1f}%
 - Distance to nearest POI (7 types)
 - Count of POIs within 5 miles (7 types)
 
-[dim]Note: ~14 API calls per property were made to Google Places API
-Estimated cost: ${(updated * 14 * 0.032 / 1000):.4f}[/dim]
+[dim]POI cell cache: {poi_cache.hits} hits, {poi_cache.misses} misses, {poi_cache.searches} Google Places API calls
+Estimated cost: ${poi_cache.searches * call_cost("google", "places:searchNearby"):.4f}[/dim]
 """, title="POI Proximity & Count Backfill Summary", border_style="cyan"))
+display_latency_stats(console)
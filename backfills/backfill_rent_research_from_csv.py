@@ -21,6 +21,7 @@ from supabase import create_client, Client
 
 # Import existing modules
 from rent_research import RentResearcher
+from openai_batch import BATCH_MODE_ENABLED
 from run import display_rent_estimates_comparison
 from helpers import format_currency
 
@@ -291,11 +292,11 @@ def process_property(address1: str, stats: BackfillStats, property_index: int, t
 
     if update_per_room:
         # Update database
-        update_success = researcher._update_rent_estimates_in_db(
+        update_result = researcher._update_rent_estimates_in_db(
             address1, unit_configs, estimates
         )
 
-        if not update_success:
+        if not update_result["success"]:
             raise Exception(f"Failed to update rent_estimates table for {address1}")
 
         stats.per_room_updated += 1
@@ -362,6 +363,92 @@ def process_property(address1: str, stats: BackfillStats, property_index: int, t
     stats.processed += 1
 
 
+def run_batch_backfill(addresses: List[str], stats: BackfillStats):
+    """
+    Batch API variant of the backfill: all reports go out as one OpenAI batch job, then
+    all estimate extractions as a second one, and every extracted estimate is written
+    after a single confirmation instead of one prompt per property.
+    """
+    researcher = RentResearcher(supabase, console)
+
+    console.print("\n[bold yellow]Step 1: Rent research reports (OpenAI Batch API)[/bold yellow]")
+    report_ids = researcher.generate_rent_research_batch(addresses)
+
+    all_report_ids = []
+    for address1, reports in report_ids.items():
+        if reports.get("rental_comparison"):
+            stats.per_room_reports_generated += 1
+            all_report_ids.append(reports["rental_comparison"])
+        if reports.get("property_wide_rental"):
+            stats.property_wide_reports_generated += 1
+            all_report_ids.append(reports["property_wide_rental"])
+        # A failed analysis comes back as {research_type: None}
+        if not any(reports.values()):
+            console.print(f"[red]✗ {address1}: no research report generated[/red]")
+            continue
+        for research_type, report_id in reports.items():
+            if report_id is None:
+                research = "Property-wide" if research_type == "property_wide_rental" else "Per-room"
+                console.print(f"[red]✗ {address1} ({research}): research report generation failed[/red]")
+    stats.processed = len([address1 for address1, reports in report_ids.items() if any(reports.values())])
+
+    console.print("\n[bold yellow]Step 2: Estimate extraction (OpenAI Batch API)[/bold yellow]")
+    results = researcher.generate_rent_estimates_batch(all_report_ids)
+
+    table = Table(title="Extracted Rent Estimates", show_header=True, header_style="bold green")
+    table.add_column("Property", style="cyan", width=30)
+    table.add_column("Research", width=14)
+    table.add_column("Estimates", justify="right", width=12)
+    table.add_column("API Cost", justify="right", width=10)
+
+    extracted = []
+    for report_id, result in results.items():
+        research = "Property-wide" if result.get("research_type") == "property_wide_rental" else "Per-room"
+        if not result["success"]:
+            console.print(f"[red]✗ {result.get('property_id', report_id)} ({research}): {result['error']}[/red]")
+            continue
+
+        if research == "Property-wide":
+            stats.property_wide_extracted += 1
+            summary = format_currency(result["estimates"]["rent_estimate"])
+        else:
+            stats.per_room_extracted += 1
+            unit_total = sum(value for key, value in result["estimates"].items() if key.endswith("_rent_estimate"))
+            summary = format_currency(unit_total)
+        table.add_row(result["property_id"], research, summary, f"${result['cost']:.4f}")
+        extracted.append(result)
+
+    console.print(table)
+    if not extracted:
+        researcher.complete_rent_estimates_batch()
+        return
+
+    update_database = questionary.confirm(
+        f"Write all {len(extracted)} extracted estimates to the database?",
+        default=False
+    ).ask()
+    if not update_database:
+        console.print("[yellow]⊘ User declined database updates[/yellow]")
+        return
+
+    for result in extracted:
+        if result["research_type"] == "property_wide_rental":
+            rounded = {
+                key: int(round(result["estimates"][key]))
+                for key in ("rent_estimate", "rent_estimate_high", "rent_estimate_low")
+            }
+            if update_property_wide_estimates(result["property_id"], rounded):
+                stats.property_wide_updated += 1
+        else:
+            update_result = researcher._update_rent_estimates_in_db(
+                result["property_id"], result["unit_configs"], result["estimates"]
+            )
+            if update_result["success"]:
+                stats.per_room_updated += 1
+    # Estimates are stored - the next run extracts afresh instead of resuming this batch
+    researcher.complete_rent_estimates_batch()
+
+
 def main():
     """Main backfill process"""
     console.print(Panel(
@@ -425,14 +512,22 @@ def main():
         console.print("[yellow]Backfill process cancelled.[/yellow]")
         return
 
+    use_batch_api = questionary.confirm(
+        "Use the OpenAI Batch API? (half price, one confirmation at the end, results can take up to 24h)",
+        default=BATCH_MODE_ENABLED
+    ).ask()
+
     # Initialize stats
     stats = BackfillStats()
     stats.total_addresses = len(addresses)
 
     # Process each address
     try:
-        for i, address1 in enumerate(addresses, 1):
-            process_property(address1, stats, i, len(addresses))
+        if use_batch_api:
+            run_batch_backfill(addresses, stats)
+        else:
+            for i, address1 in enumerate(addresses, 1):
+                process_property(address1, stats, i, len(addresses))
 
     except Exception as e:
         console.print(f"\n[bold red]❌ Error occurred: {str(e)}[/bold red]")
@@ -21,6 +21,7 @@ from InquirerPy import inquirer
 
 # Import existing modules
 from rent_research import RentResearcher
+from openai_batch import BATCH_MODE_ENABLED
 from run import reload_dataframe, format_currency, display_rent_estimates_comparison
 
 # Load environment variables
@@ -102,6 +103,72 @@ def check_existing_reports(property_id: str) -> int:
         console.print(f"[red]Error checking reports for {property_id}: {str(e)}[/red]")
         return 0
 
+def run_batch_extraction(properties: List[Dict[str, Any]], stats: BackfillStats):
+    """
+    Extract estimates from every property's latest completed per-unit report in one
+    OpenAI Batch API job, then write them all after a single confirmation.
+    """
+    researcher = RentResearcher(supabase, console)
+    property_ids = [property_data['address1'] for property_data in properties]
+
+    # Latest completed rental_comparison report per property, newest first
+    latest_reports = {}
+    for i in range(0, len(property_ids), 200):
+        response = supabase.table('research_reports')\
+            .select('id, property_id')\
+            .in_('property_id', property_ids[i:i + 200])\
+            .eq('research_type', 'rental_comparison')\
+            .eq('status', 'completed')\
+            .order('created_at', desc=True)\
+            .execute()
+        for report in response.data or []:
+            latest_reports.setdefault(report['property_id'], report['id'])
+
+    stats.skipped += len(property_ids) - len(latest_reports)
+    if not latest_reports:
+        console.print("[yellow]No completed research reports to extract estimates from.[/yellow]")
+        return
+
+    console.print(f"[cyan]Extracting estimates from {len(latest_reports)} reports with the OpenAI Batch API...[/cyan]")
+    results = researcher.generate_rent_estimates_batch(list(latest_reports.values()))
+
+    extracted = {}
+    total_cost = 0.0
+    for property_id, report_id in latest_reports.items():
+        stats.processed += 1
+        result = results[report_id]
+        if result["success"]:
+            stats.estimates_extracted += 1
+            total_cost += result["cost"]
+            extracted[property_id] = result
+        else:
+            stats.add_error(property_id, f"Estimate extraction failed: {result.get('error', 'Unknown error')}")
+
+    console.print(f"[green]✓ Extracted estimates for {len(extracted)} properties (${total_cost:.4f})[/green]")
+    if not extracted:
+        researcher.complete_rent_estimates_batch()
+        return
+
+    update_db = questionary.confirm(
+        f"Update the database with estimates for all {len(extracted)} properties?",
+        default=False
+    ).ask()
+    if not update_db:
+        console.print("[yellow]Database not updated.[/yellow]")
+        return
+
+    for property_id, result in extracted.items():
+        update_result = researcher._update_rent_estimates_in_db(
+            property_id, result["unit_configs"], result["estimates"]
+        )
+        if update_result["success"]:
+            stats.database_updates += 1
+        else:
+            stats.add_error(property_id, "Database update failed")
+    # Estimates are stored - the next run extracts afresh instead of resuming this batch
+    researcher.complete_rent_estimates_batch()
+    reload_dataframe()
+
 def main():
     """Main interactive backfill process"""
     console.print(Panel(
@@ -140,7 +207,19 @@ def main():
     if not proceed:
         console.print("[yellow]Backfill process cancelled.[/yellow]")
         return
-    
+
+    batch_choice = "Batch: extract estimates from each property's latest report (OpenAI Batch API, half price)"
+    mode = questionary.select(
+        "How would you like to run the backfill?",
+        choices=["Interactive: one property at a time", batch_choice],
+        default=batch_choice if BATCH_MODE_ENABLED else None
+    ).ask()
+
+    if mode == batch_choice:
+        run_batch_extraction(properties, stats)
+        display_final_summary(stats)
+        return
+
     # Main processing loop
     skip_all = False
     
@@ -229,11 +308,11 @@ def main():
                             
                             if update_db:
                                 # Perform database update
-                                update_success = researcher._update_rent_estimates_in_db(
+                                update_result = researcher._update_rent_estimates_in_db(
                                     property_id, unit_configs, estimates
                                 )
                                 
-                                if update_success:
+                                if update_result["success"]:
                                     stats.database_updates += 1
                                     console.print("[green]✅ Database updated successfully![/green]")
                                     reload_dataframe()
@@ -333,11 +412,11 @@ def main():
                                 
                                 if update_db:
                                     # Perform database update
-                                    update_success = researcher._update_rent_estimates_in_db(
+                                    update_result = researcher._update_rent_estimates_in_db(
                                         property_id, unit_configs, estimates
                                     )
                                     
-                                    if update_success:
+                                    if update_result["success"]:
                                         stats.database_updates += 1
                                         console.print("[green]✅ Database updated successfully![/green]")
                                         reload_dataframe()
@@ -353,8 +432,10 @@ def main():
                 stats.add_error(property_id, f"Error extracting estimates: {str(e)}")
         
         stats.processed += 1
-    
-    # Final summary
+
+    display_final_summary(stats)
+
+def display_final_summary(stats: BackfillStats):
     console.print("\n" + "="*80 + "\n")
     console.print(Panel(stats.summary(), title="Backfill Complete", border_style="green"))
     
@@ -0,0 +1,167 @@
+"""
+Concurrent batch runner for long scripts that call paid APIs once per property.
+
+Provides a thread-safe token bucket to stay under an API's rate limit, an append-only
+journal of completed items so an interrupted run resumes without re-spending calls,
+and run_batch(), which fans work out over a thread pool behind a live Rich progress
+bar with throughput and ETA.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    ProgressColumn,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+    TimeRemainingColumn,
+)
+from rich.text import Text
+
+from response_cache import CACHE_DIR
+
+JOURNAL_DIR = os.path.join(CACHE_DIR, "journals")
+
+
+class TokenBucket:
+    """Blocking token bucket: acquire() waits until a request may be sent"""
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        self.rate = rate_per_second
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_second)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RunJournal:
+    """
+    Append-only JSONL checkpoint of finished items, one line per item:
+    {"key": ..., "status": ..., "data": ..., "at": ...}. The last line for a key wins.
+    """
+
+    def __init__(self, name: str, journal_dir: str = JOURNAL_DIR):
+        os.makedirs(journal_dir, exist_ok=True)
+        self.path = os.path.join(journal_dir, f"{name}.jsonl")
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from an interrupted write
+                entries[entry["key"]] = entry
+        return entries
+
+    def is_done(self, key: str) -> bool:
+        return key in self.entries
+
+    def record(self, key: str, status: str, data: Any = None):
+        entry = {"key": key, "status": status, "data": data, "at": time.time()}
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+            self.entries[key] = entry
+
+    def clear(self):
+        """Forget the run once it has finished cleanly"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.entries = {}
+
+
+class ThroughputColumn(ProgressColumn):
+    """Completed items per minute"""
+
+    def render(self, task) -> Text:
+        if not task.elapsed or not task.completed:
+            return Text("-- /min", style="progress.data.speed")
+        return Text(f"{task.completed / task.elapsed * 60:.1f}/min", style="progress.data.speed")
+
+
+def run_batch(
+    items: Iterable[Any],
+    worker_fn: Callable[[Any, Progress], Any],
+    console: Console,
+    description: str,
+    max_workers: int = 4,
+    key_fn: Optional[Callable[[Any], str]] = None,
+    journal: Optional[RunJournal] = None,
+) -> List[Any]:
+    """
+    Run worker_fn over items on a thread pool with a live progress bar.
+
+    Items whose key_fn(item) is already in the journal are skipped. worker_fn receives
+    the item and the Progress (print via progress.console so output lands above the bar)
+    and is responsible for recording to the journal. An exception from worker_fn is
+    returned in place of its result rather than aborting the batch.
+
+    Returns:
+        Results in the order the items were given (skipped items omitted)
+    """
+    items = list(items)
+    if journal is not None and key_fn is not None:
+        pending = [item for item in items if not journal.is_done(key_fn(item))]
+        resumed = len(items) - len(pending)
+        if resumed:
+            console.print(f"[cyan]↻ Resuming: {resumed} already completed in {journal.path}[/cyan]")
+    else:
+        pending = items
+
+    results = [None] * len(pending)
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        ThroughputColumn(),
+        TimeElapsedColumn(),
+        TextColumn("ETA"),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task(description, total=len(pending))
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {executor.submit(worker_fn, item, progress): i for i, item in enumerate(pending)}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = e
+                progress.advance(task)
+        except KeyboardInterrupt:
+            # Let in-flight items finish (and journal themselves) but start nothing new
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+    return results
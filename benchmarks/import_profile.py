@@ -0,0 +1,116 @@
+"""
+Startup import profile for the CLI and API entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for each entry
+point and summarizes the result: total import time, the slowest top-level packages
+(cumulative) and whether any of the heavy, lazily-loaded dependencies were pulled in
+at startup. Importing run/api must not touch the network, so this measures pure
+import cost.
+
+Usage:
+    python benchmarks/import_profile.py                  # profile run and api
+    python benchmarks/import_profile.py run --top 30     # one module, more rows
+    python benchmarks/import_profile.py --output bench_output.txt
+
+Import times are noisy, so each module is imported --repeat times (5 by default) and
+the median run is reported. import_profile_baseline.txt is the report from before the
+heavy SDK imports were deferred and import_profile_after.txt the report from after;
+re-run with --output to compare a later change against them.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["run", "api"]
+
+# Dependencies that should only load on the menu path / request that needs them
+DEFERRED_PACKAGES = ["playwright", "openai", "tavily", "fpdf"]
+
+
+def profile_import(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        List of (cumulative_us, self_us, package_name) for every imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Keep the name's indentation - it encodes nesting depth
+        entries.append((int(cumulative_us), int(self_us), name[1:].rstrip()))
+    return entries
+
+
+def total_import_us(entries) -> int:
+    # Top-level imports are the ones with no indentation in importtime's tree
+    return sum(cum for cum, _, name in entries if not name.startswith(" "))
+
+
+def profile_import_median(module: str, repeat: int):
+    """The profile_import run with the median total import time out of `repeat` runs"""
+    runs = sorted((profile_import(module) for _ in range(max(1, repeat))), key=total_import_us)
+    return runs[len(runs) // 2]
+
+
+def summarize(module: str, entries, top: int) -> str:
+    total_us = total_import_us(entries)
+
+    by_package = defaultdict(int)
+    for _, self_us, name in entries:
+        by_package[name.strip().split(".")[0]] += self_us
+
+    loaded = {name.strip().split(".")[0] for _, _, name in entries}
+    deferred_loaded = [pkg for pkg in DEFERRED_PACKAGES if pkg in loaded]
+
+    lines = [
+        f"== import {module}",
+        f"total: {total_us / 1000:.1f} ms across {len(entries)} modules",
+        f"deferred packages loaded at startup: {', '.join(deferred_loaded) if deferred_loaded else 'none'}",
+        "",
+        f"{'package':<32}{'self ms (summed)':>18}",
+    ]
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{package:<32}{self_us / 1000:>18.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of propdeals entry points")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=20, help="Number of packages to list")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per module; the median run is reported")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    reports = []
+    for module in args.modules:
+        try:
+            reports.append(summarize(module, profile_import_median(module, args.repeat), args.top))
+        except RuntimeError as e:
+            reports.append(f"== import {module}\n{e}")
+
+    report = "\n\n".join(reports)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Row-change listener for keeping the property caches fresh.
+
+Subscribes to Postgres changes on the tables that feed the enriched properties
+dataframe (via the Supabase realtime protocol), works out which addresses each change
+touches, and hands them to a callback in small debounced batches. The callback is
+expected to recompute only those addresses (run.reload_properties) and patch any
+caches in place.
+
+A callback receives None instead of a set of addresses when a change can't be mapped
+back to specific properties (e.g. a DELETE whose old_record only carries the primary
+key), meaning "reload everything".
+
+Set PROPDEALS_CHANGE_FEED to pick the implementation:
+    supabase (default) - Supabase realtime subscription
+    local              - in-process LocalChangeFeed, for tests and local development
+    off                - no listener
+"""
+import asyncio
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WATCHED_TABLES = ("properties", "rent_estimates", "property_neighborhood", "neighborhoods")
+CHANGE_FEED = os.getenv("PROPDEALS_CHANGE_FEED", "supabase").lower()
+
+
+@dataclass
+class ChangeEvent:
+    table: str
+    event_type: str  # INSERT, UPDATE or DELETE
+    record: dict = field(default_factory=dict)
+    old_record: dict = field(default_factory=dict)
+
+
+def resolve_affected_addresses(event: ChangeEvent, supabase_client) -> Optional[Set[str]]:
+    """
+    Map a row change to the property addresses whose computed values depend on it.
+    Returns None when the change can't be attributed to specific addresses.
+    """
+    record = event.record or {}
+    old_record = event.old_record or {}
+
+    if event.table in ("properties", "rent_estimates", "property_neighborhood"):
+        addresses = {r.get("address1") for r in (record, old_record) if r.get("address1")}
+        return addresses or None
+
+    if event.table == "neighborhoods":
+        neighborhood_id = record.get("id") or old_record.get("id")
+        if neighborhood_id is None:
+            return None
+        response = (
+            supabase_client.table("property_neighborhood")
+            .select("address1")
+            .eq("neighborhood_id", neighborhood_id)
+            .execute()
+        )
+        return {row["address1"] for row in response.data or []}
+
+    return set()
+
+
+class ChangeDispatcher:
+    """
+    Collects addresses from change events and calls on_change with one batch per
+    debounce window, so a burst of writes (e.g. a rent estimate update touching
+    every unit) triggers a single recompute.
+    """
+
+    def __init__(self, supabase_client, on_change: Callable[[Optional[Set[str]]], None], debounce_seconds: float = 1.0):
+        self.supabase = supabase_client
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self._pending = set()
+        self._reload_all = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def handle_event(self, event: ChangeEvent):
+        try:
+            addresses = resolve_affected_addresses(event, self.supabase)
+        except Exception as e:
+            print(f"⚠️ Could not resolve addresses for {event.table} change: {str(e)}")
+            addresses = None
+
+        if addresses is not None and not addresses:
+            return
+
+        with self._lock:
+            if addresses is None:
+                self._reload_all = True
+            else:
+                self._pending.update(addresses)
+
+            if self.debounce_seconds > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.debounce_seconds, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._timer = None
+            if not self._pending and not self._reload_all:
+                return
+            batch = None if self._reload_all else set(self._pending)
+            self._pending.clear()
+            self._reload_all = False
+
+        # Run the recompute outside the lock so new events keep queueing meanwhile
+        try:
+            self.on_change(batch)
+        except Exception as e:
+            print(f"⚠️ Failed to apply property changes: {str(e)}")
+
+    def start(self):
+        pass
+
+    def stop(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class LocalChangeFeed(ChangeDispatcher):
+    """In-process stand-in for the realtime subscription. Call publish() to simulate a row change."""
+
+    def __init__(self, supabase_client, on_change, debounce_seconds: float = 0):
+        super().__init__(supabase_client, on_change, debounce_seconds)
+
+    def publish(self, table: str, event_type: str, record: dict = None, old_record: dict = None):
+        if table not in WATCHED_TABLES:
+            return
+        self.handle_event(ChangeEvent(table=table, event_type=event_type, record=record or {}, old_record=old_record or {}))
+
+
+class SupabaseChangeListener(ChangeDispatcher):
+    """Supabase realtime (Postgres changes) subscription running on a background thread"""
+
+    def __init__(self, supabase_client, on_change, debounce_seconds: float = 1.0):
+        super().__init__(supabase_client, on_change, debounce_seconds)
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="supabase-change-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            asyncio.run(self._listen())
+        except Exception as e:
+            print(f"⚠️ Supabase change listener stopped: {str(e)}")
+
+    async def _listen(self):
+        from supabase import acreate_client
+
+        client = await acreate_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+        channel = client.channel("propdeals-property-changes")
+        for table in WATCHED_TABLES:
+            channel.on_postgres_changes("*", schema="public", table=table, callback=self._on_payload)
+        await channel.subscribe()
+        print(f"👂 Listening for changes on {', '.join(WATCHED_TABLES)}")
+        await client.realtime.listen()
+
+    def _on_payload(self, payload):
+        data = payload.get("data", payload)
+        self.handle_event(
+            ChangeEvent(
+                table=data.get("table"),
+                event_type=data.get("type") or data.get("eventType"),
+                record=data.get("record") or data.get("new") or {},
+                old_record=data.get("old_record") or data.get("old") or {},
+            )
+        )
+
+
+def create_change_listener(supabase_client, on_change, feed: str = CHANGE_FEED):
+    """Build the listener selected by PROPDEALS_CHANGE_FEED, or None when it's turned off"""
+    if feed == "off":
+        return None
+    if feed == "local":
+        return LocalChangeFeed(supabase_client, on_change)
+    return SupabaseChangeListener(supabase_client, on_change)
@@ -0,0 +1,205 @@
+"""
+Context packing for reasoning-model prompts.
+
+Tavily returns the same page for several queries and its markdown is mostly
+navigation, link lists and footer boilerplate. pack_search_results() dedupes results
+by URL, strips the boilerplate, keeps the passages that look like market data
+(topic keywords, dollar figures, percentages) and fits them to a token budget, so the
+prompt carries more signal per input token than the old "first 1000 characters of
+25 results" block.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+CHARS_PER_TOKEN = 4  # Rough English average for OpenAI tokenizers
+
+RENT_KEYWORDS = (
+    "rent", "rental", "lease", "bedroom", "bed", "bath", "sq ft", "sqft", "square feet",
+    "per month", "/mo", "monthly", "average", "median", "vacancy", "occupancy",
+    "unit", "duplex", "triplex", "fourplex", "apartment", "house", "room", "utilities",
+    "pet", "parking", "laundry", "market", "trend", "increase", "decrease", "year-over-year",
+)
+
+NEIGHBORHOOD_KEYWORDS = (
+    "neighborhood", "crime", "safety", "safe", "school", "walk", "transit", "park",
+    "median", "income", "household", "population", "owner-occupied", "renter", "home value",
+    "appreciation", "development", "employer", "jobs", "commute", "restaurant", "grocery",
+    "amenities", "family", "students", "vacancy", "rent", "trend", "rating",
+)
+
+_BOILERPLATE_PATTERNS = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|subscribe|newsletter|sign (in|up)|log ?in|"
+    r"all rights reserved|copyright|©|skip to (main )?content|advertis|share on|follow us|"
+    r"download (the|our) app|back to top|related (articles|posts)|you may also like",
+    re.IGNORECASE,
+)
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_BARE_URL = re.compile(r"https?://\S+")
+_CONTENT_LABEL = "\n**Content**: "
+_PASSAGE_SEPARATOR = "\n"
+_BLOCK_SEPARATOR = "\n\n"
+_NUMBER = re.compile(r"\$\s?\d[\d,]*(\.\d+)?k?|\d+(\.\d+)?\s?%|\b\d[\d,]{2,}\b")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def strip_boilerplate(markdown: str) -> str:
+    """Drop images, link targets, navigation rows and legal/footer lines from page markdown"""
+    text = _MARKDOWN_IMAGE.sub("", markdown or "")
+    text = _MARKDOWN_LINK.sub(r"\1", text)
+    text = _BARE_URL.sub("", text)
+
+    lines = []
+    for line in text.splitlines():
+        line = line.strip().strip("*#>|-_ ").strip()
+        words = line.split()
+        # Menus and breadcrumbs are short runs of capitalized words with no punctuation or numbers
+        if len(words) < 4 and not _NUMBER.search(line):
+            continue
+        if _BOILERPLATE_PATTERNS.search(line):
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _split_passages(text: str, max_chars: int = 600) -> List[str]:
+    """Group consecutive lines into passages of roughly max_chars"""
+    passages, current = [], ""
+    for line in text.splitlines():
+        if current and len(current) + len(line) + 1 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        passages.append(current)
+    return passages
+
+
+def score_passage(passage: str, keywords: Iterable[str]) -> float:
+    """Keyword hits plus number density, normalized per 100 characters"""
+    lowered = passage.lower()
+    keyword_hits = sum(lowered.count(keyword) for keyword in keywords)
+    number_hits = len(_NUMBER.findall(passage))
+    return (keyword_hits + 2 * number_hits) * 100 / max(len(passage), 100)
+
+
+def dedupe_by_url(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One entry per URL (the highest-scored), remembering every query that returned it"""
+    by_url: Dict[str, Dict[str, Any]] = {}
+    for result in search_results:
+        url = result.get("url", "")
+        existing = by_url.get(url)
+        if existing is None:
+            by_url[url] = {**result, "queries": [result.get("query", "")]}
+            continue
+        if result.get("query") not in existing["queries"]:
+            existing["queries"].append(result.get("query", ""))
+        if result.get("score", 0) > existing.get("score", 0):
+            existing.update({k: v for k, v in result.items() if k != "query"})
+    return list(by_url.values())
+
+
+def format_search_data(search_results: List[Dict[str, Any]], limit: int = 25) -> str:
+    """The unpacked prompt block, kept as the baseline for before/after measurement"""
+    return "\n\n".join(
+        [
+            f"**Query**: {result['query']}\n**Source**: {result['title']} ({result['url']})\n**Content**: {result['content'][:1000]}..."
+            for result in search_results[:limit]
+        ]
+    )
+
+
+def pack_search_results(
+    search_results: List[Dict[str, Any]],
+    keywords: Iterable[str],
+    token_budget: int,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Build the web research block of a prompt within token_budget.
+
+    Passages from every source are ranked together by score_passage (ties go to the
+    higher Tavily score); each source always contributes its snippet first so no source
+    disappears entirely while there is room. The budget is also capped at the size of the
+    unpacked baseline block, so packing never makes a prompt larger than it used to be.
+
+    Returns:
+        Tuple of (search data markdown, stats with sources, passages, raw_tokens,
+        baseline_tokens and packed_tokens)
+    """
+    keywords = tuple(keywords)
+    baseline_tokens = estimate_tokens(format_search_data(search_results))
+    token_budget = min(token_budget, baseline_tokens)
+    sources = dedupe_by_url(search_results)
+    raw_tokens = sum(
+        estimate_tokens(result.get("raw_content") or result.get("content", "")) for result in sources
+    )
+
+    candidates = []  # (priority, score, source index, passage)
+    for index, result in enumerate(sources):
+        snippet = " ".join((result.get("content") or "").split())
+        if snippet:
+            candidates.append((0, -result.get("score", 0), index, snippet))
+        for passage in _split_passages(strip_boilerplate(result.get("raw_content") or "")):
+            if passage in snippet:
+                continue
+            relevance = score_passage(passage, keywords)
+            if relevance > 0:
+                candidates.append((1, -relevance - result.get("score", 0), index, passage))
+    candidates.sort(key=lambda candidate: candidate[:2])
+
+    # Budget in characters of the finished block, counting headers, labels and joins exactly,
+    # so estimate_tokens(search_data) can't come out over token_budget
+    char_budget = token_budget * CHARS_PER_TOKEN
+    selected: Dict[int, List[str]] = {}
+    used_chars = 0
+    for _, _, index, passage in candidates:
+        if index in selected:
+            added = len(_PASSAGE_SEPARATOR) + len(passage)
+        else:
+            added = len(_source_header(sources[index])) + len(_CONTENT_LABEL) + len(passage)
+            if selected:
+                added += len(_BLOCK_SEPARATOR)
+        if used_chars + added > char_budget:
+            continue
+        selected.setdefault(index, []).append(passage)
+        used_chars += added
+
+    blocks = [
+        _source_header(sources[index]) + _CONTENT_LABEL + _PASSAGE_SEPARATOR.join(selected[index])
+        for index in sorted(selected)
+    ]
+    search_data = _BLOCK_SEPARATOR.join(blocks)
+
+    stats = {
+        "sources": len(selected),
+        "passages": sum(len(passages) for passages in selected.values()),
+        "raw_tokens": raw_tokens,
+        "baseline_tokens": baseline_tokens,
+        "packed_tokens": estimate_tokens(search_data),
+    }
+    return search_data, stats
+
+
+def add_prompt_token_stats(stats: Dict[str, int], prompt: str) -> Dict[str, int]:
+    """
+    Add whole-prompt sizes to pack_search_results stats: prompt_tokens for the prompt as
+    sent and baseline_prompt_tokens for the same prompt with the unpacked search block
+    """
+    stats["prompt_tokens"] = estimate_tokens(prompt)
+    stats["baseline_prompt_tokens"] = stats["prompt_tokens"] - stats["packed_tokens"] + stats["baseline_tokens"]
+    return stats
+
+
+def describe_packing(stats: Dict[str, int]) -> str:
+    return (
+        f"📦 Packed {stats['sources']} sources ({stats['passages']} passages): "
+        f"prompt ~{stats['baseline_prompt_tokens']:,} → ~{stats['prompt_tokens']:,} tokens "
+        f"(search block ~{stats['baseline_tokens']:,} → ~{stats['packed_tokens']:,}, from ~{stats['raw_tokens']:,} raw)"
+    )
+
+
+def _source_header(result: Dict[str, Any]) -> str:
+    return f"**Query**: {'; '.join(result['queries'])}\n**Source**: {result.get('title', '')} ({result.get('url', '')})"
@@ -12,6 +12,69 @@ from helpers import (
     calculate_emergency_fund,
 )
 
+# Maps each category to its line items and display labels
+# Lender is conditional — if actual fees were passed in, we only have the total
+CLOSING_COST_CATEGORIES = {
+    "lender": {
+        "label": "Lender Costs",
+        "items": [
+            ("loan_origination_fee", "Loan Origination Fee"),
+            ("processing_fee", "Processing Fee"),
+            ("underwriting_fee", "Underwriting Fee"),
+            ("credit_reporting_fee", "Credit Reporting Fee"),
+        ],
+    },
+    "title": {
+        "label": "Title & Third-Party Costs",
+        "items": [
+            ("appraisal_fee", "Appraisal Fee"),
+            ("abstract_update_fee", "Abstract Update Fee"),
+            ("title_examination_fee", "Title Examination Fee"),
+            ("title_guaranty_certificate", "IA Title Guaranty Certificate"),
+            ("owners_title_insurance", "Owner's Title Insurance"),
+            ("settlement_fee", "Settlement/Closing Fee"),
+            ("tax_service_fee", "Tax Service Fee"),
+            ("flood_certification_fee", "Flood Certification Fee"),
+        ],
+    },
+    "government": {
+        "label": "Government & Recording Fees",
+        "items": [
+            ("deed_recording_fee", "Deed Recording Fee"),
+            ("mortgage_recording_fee", "Mortgage Recording Fee"),
+        ],
+    },
+    "prepaid": {
+        "label": "Prepaids",
+        "items": [
+            ("prepaid_home_insurance", "Homeowner's Insurance Premium (12mo)"),
+            ("property_tax_proration", "Property Tax Proration (4mo)"),
+            ("prepaid_interest", "Prepaid Interest (20 days)"),
+        ],
+    },
+    "escrow": {
+        "label": "Initial Escrow Reserves",
+        "items": [
+            ("insurance_reserve", "Insurance Reserve (3mo)"),
+            ("tax_reserve", "Tax Reserve (3mo)"),
+            ("aggregate_adjustment", "Aggregate Adjustment"),
+        ],
+    },
+    "optional": {
+        "label": "Optional / Buyer-Elected Costs",
+        "items": [
+            ("home_inspection_fee", "Home Inspection"),
+            ("property_survey_fee", "Property Survey"),
+            ("pest_inspection_fee", "Pest Inspection"),
+            ("structural_engineer_fee", "Structural Engineer Inspection"),
+            ("sewer_inspection_fee", "Sewer Inspection"),
+            ("keller_williams_fee", "Keller Williams Transaction Fee"),
+            ("courier_fees", "Courier Fees"),
+            ("notary_fees", "Notary Fees"),
+        ],
+    },
+}
+
 def safe_concat_columns(df, new_columns_dict):
     """
     Add new columns to dataframe, replacing any existing columns with same names.
@@ -84,6 +147,29 @@ def apply_closing_costs_calculations(df, loan):
     df["closing_costs_prcnt"] = df["closing_costs"] / df["purchase_price"]
     return df
 
+def get_closing_costs_breakdown(row, loan):
+    """
+    Build a JSON-friendly closing cost breakdown for a single enriched property row,
+    grouped the same way as display_closing_costs_table.
+    """
+    categories = []
+    for cost_type, config in CLOSING_COST_CATEGORIES.items():
+        if cost_type == "lender" and loan.get("lender_fees") != 0:
+            items = [{"key": "lender_fees", "label": "Actual Lender Fees (from LE)", "amount": row["total_lender_costs"]}]
+        else:
+            items = [{"key": col, "label": label, "amount": row.get(col, 0)} for col, label in config["items"]]
+        categories.append({
+            "category": cost_type,
+            "label": config["label"],
+            "items": items,
+            "total": row[f"total_{cost_type}_costs"],
+        })
+    return {
+        "categories": categories,
+        "closing_costs": row["closing_costs"],
+        "closing_costs_prcnt": row["closing_costs_prcnt"],
+    }
+
 def apply_calculations_on_dataframe(df, loan, assumptions):
     cols = ["walk_score", "transit_score", "bike_score"]
     df[cols] = df[cols].apply(pd.to_numeric, errors="coerce")
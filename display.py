@@ -3,6 +3,7 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.console import Group
 import pandas as pd
+from dataframe_helpers import CLOSING_COST_CATEGORIES
 from helpers import (
     calculate_additional_room_rent,
     calculate_quintile_colors_for_metrics,
@@ -1896,69 +1897,6 @@ def display_single_deal(console, deal, loan, assumption):
 
 def display_closing_costs_table(console, row, loan):
 
-    # Maps each category to its line items and display labels
-    # Lender is conditional — if actual fees were passed in, we only have the total
-    categories = {
-        "lender": {
-            "label": "Lender Costs",
-            "items": [
-                ("loan_origination_fee", "Loan Origination Fee"),
-                ("processing_fee", "Processing Fee"),
-                ("underwriting_fee", "Underwriting Fee"),
-                ("credit_reporting_fee", "Credit Reporting Fee"),
-            ],
-        },
-        "title": {
-            "label": "Title & Third-Party Costs",
-            "items": [
-                ("appraisal_fee", "Appraisal Fee"),
-                ("abstract_update_fee", "Abstract Update Fee"),
-                ("title_examination_fee", "Title Examination Fee"),
-                ("title_guaranty_certificate", "IA Title Guaranty Certificate"),
-                ("owners_title_insurance", "Owner's Title Insurance"),
-                ("settlement_fee", "Settlement/Closing Fee"),
-                ("tax_service_fee", "Tax Service Fee"),
-                ("flood_certification_fee", "Flood Certification Fee"),
-            ],
-        },
-        "government": {
-            "label": "Government & Recording Fees",
-            "items": [
-                ("deed_recording_fee", "Deed Recording Fee"),
-                ("mortgage_recording_fee", "Mortgage Recording Fee"),
-            ],
-        },
-        "prepaid": {
-            "label": "Prepaids",
-            "items": [
-                ("prepaid_home_insurance", "Homeowner's Insurance Premium (12mo)"),
-                ("property_tax_proration", "Property Tax Proration (4mo)"),
-                ("prepaid_interest", "Prepaid Interest (20 days)"),
-            ],
-        },
-        "escrow": {
-            "label": "Initial Escrow Reserves",
-            "items": [
-                ("insurance_reserve", "Insurance Reserve (3mo)"),
-                ("tax_reserve", "Tax Reserve (3mo)"),
-                ("aggregate_adjustment", "Aggregate Adjustment"),
-            ],
-        },
-        "optional": {
-            "label": "Optional / Buyer-Elected Costs",
-            "items": [
-                ("home_inspection_fee", "Home Inspection"),
-                ("property_survey_fee", "Property Survey"),
-                ("pest_inspection_fee", "Pest Inspection"),
-                ("structural_engineer_fee", "Structural Engineer Inspection"),
-                ("sewer_inspection_fee", "Sewer Inspection"),
-                ("keller_williams_fee", "Keller Williams Transaction Fee"),
-                ("courier_fees", "Courier Fees"),
-                ("notary_fees", "Notary Fees"),
-            ],
-        },
-    }
-
     table = Table(
         title="Closing Cost Breakdown",
         show_header=True,
@@ -1968,7 +1906,7 @@ def display_closing_costs_table(console, row, loan):
     table.add_column("Line Item", style="dim", min_width=38)
     table.add_column("Cost", justify="right", min_width=12)
 
-    for cost_type, config in categories.items():
+    for cost_type, config in CLOSING_COST_CATEGORIES.items():
         # Section header row
         table.add_row(f"[bold]{config['label']}[/bold]", "", style="on grey19")
 
@@ -0,0 +1,185 @@
+"""
+Geospatial helpers: geohash tiles and vectorized great-circle distances.
+"""
+import numpy as np
+
+EARTH_RADIUS_MILES = 3956  # Same radius add_property.haversine_distance has always used
+METERS_PER_MILE = 1609.34
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_INDEX = {char: i for i, char in enumerate(_GEOHASH_ALPHABET)}
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 5) -> str:
+    """Encode a coordinate as a geohash of the given length"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        value, value_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits = bits << 1
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str):
+    """Bounding box of a geohash tile as (min_lat, min_lon, max_lat, max_lon)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        bits = _GEOHASH_INDEX[char]
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def geohash_center(geohash: str):
+    """Center of a geohash tile as (lat, lon)"""
+    min_lat, min_lon, max_lat, max_lon = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def geohash_cells_within(lat: float, lon: float, radius_miles: float, precision: int = 5):
+    """
+    Geohash cells that come within radius_miles of a point, nearest first.
+
+    Returns:
+        List of (geohash, distance in miles from the point to the closest part of the cell)
+    """
+    cell = geohash_encode(lat, lon, precision)
+    cell_min_lat, cell_min_lon, cell_max_lat, cell_max_lon = geohash_bounds(cell)
+    lat_step, lon_step = cell_max_lat - cell_min_lat, cell_max_lon - cell_min_lon
+    min_lat, min_lon, max_lat, max_lon = expand_bounds_miles(lat, lon, lat, lon, radius_miles)
+
+    # Walk the grid from the point's own cell outwards to the edges of the search box
+    lat_offsets = range(-int(np.ceil((cell_min_lat - min_lat) / lat_step)), int(np.ceil((max_lat - cell_max_lat) / lat_step)) + 1)
+    lon_offsets = range(-int(np.ceil((cell_min_lon - min_lon) / lon_step)), int(np.ceil((max_lon - cell_max_lon) / lon_step)) + 1)
+    cells = []
+    for lat_offset in lat_offsets:
+        center_lat = (cell_min_lat + cell_max_lat) / 2 + lat_offset * lat_step
+        if not -90 < center_lat < 90:
+            continue
+        for lon_offset in lon_offsets:
+            center_lon = ((cell_min_lon + cell_max_lon) / 2 + lon_offset * lon_step + 180) % 360 - 180
+            neighbor = geohash_encode(center_lat, center_lon, precision)
+            distance = distance_to_bounds_miles(lat, lon, *geohash_bounds(neighbor))
+            if distance <= radius_miles:
+                cells.append((neighbor, distance))
+    return sorted(cells, key=lambda entry: entry[1])
+
+
+def distance_to_bounds_miles(lat: float, lon: float, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> float:
+    """Distance from a point to the closest point of a bounding box (0 inside it)"""
+    closest_lat = min(max(lat, min_lat), max_lat)
+    closest_lon = min(max(lon, min_lon), max_lon)
+    return float(haversine_miles(lat, lon, closest_lat, closest_lon))
+
+
+def bounds_half_diagonal_miles(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> float:
+    """Distance from a bounding box's center to its farthest corner"""
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    corners_lat = np.array([min_lat, min_lat, max_lat, max_lat])
+    corners_lon = np.array([min_lon, max_lon, min_lon, max_lon])
+    return float(haversine_miles(center_lat, center_lon, corners_lat, corners_lon).max())
+
+
+def expand_bounds_miles(min_lat: float, min_lon: float, max_lat: float, max_lon: float, miles: float):
+    """
+    Grow a bounding box by `miles` on every side, so it contains every point within
+    `miles` of a point inside the original box
+    """
+    lat_delta = np.degrees(miles / EARTH_RADIUS_MILES)
+    # A mile spans the most longitude at the box's poleward edge
+    poleward_lat = min(89.0, max(abs(min_lat - lat_delta), abs(max_lat + lat_delta)))
+    lon_delta = lat_delta / np.cos(np.radians(poleward_lat))
+    return min_lat - lat_delta, min_lon - lon_delta, max_lat + lat_delta, max_lon + lon_delta
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in miles between points given in decimal degrees.
+    Accepts scalars or NumPy arrays and broadcasts like any ufunc.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0))) * EARTH_RADIUS_MILES
+
+
+def to_unit_xyz(lats, lons):
+    """Project coordinates onto the unit sphere as an (n, 3) array"""
+    lats = np.radians(np.asarray(lats, dtype=float))
+    lons = np.radians(np.asarray(lons, dtype=float))
+    return np.column_stack((np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)))
+
+
+def miles_to_chord(miles):
+    """Straight-line distance through the unit sphere for a great-circle distance"""
+    return 2 * np.sin(np.asarray(miles, dtype=float) / (2 * EARTH_RADIUS_MILES))
+
+
+def chord_to_miles(chord):
+    return 2 * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2, 0.0, 1.0)) * EARTH_RADIUS_MILES
+
+
+class PoiIndex:
+    """
+    KD-tree over POIs in 3-D unit-sphere coordinates.
+
+    Chord length is monotonic in great-circle distance, so Euclidean nearest-neighbour
+    and ball queries on the sphere give exact haversine answers without any
+    lat/lon distortion. Queries take arrays of points, so a whole portfolio is
+    answered in one call.
+    """
+
+    def __init__(self, lats, lons):
+        from scipy.spatial import cKDTree  # Deferred - scipy is only needed for batch recomputes
+
+        self.size = len(lats)
+        self._tree = cKDTree(to_unit_xyz(lats, lons)) if self.size else None
+
+    def nearest_miles(self, lats, lons, max_miles=None):
+        """
+        Distance in miles to the nearest POI for every point.
+        Points with no POI (within max_miles, if given) get NaN.
+        """
+        if self._tree is None:
+            return np.full(len(lats), np.nan)
+        upper_bound = float(miles_to_chord(max_miles)) if max_miles is not None else np.inf
+        chords, _ = self._tree.query(to_unit_xyz(lats, lons), k=1, distance_upper_bound=upper_bound)
+        distances = chord_to_miles(np.where(np.isinf(chords), 0.0, chords))
+        return np.where(np.isinf(chords), np.nan, distances)
+
+    def count_within(self, lats, lons, radius_miles):
+        """Number of POIs within radius_miles of every point"""
+        if self._tree is None:
+            return np.zeros(len(lats), dtype=int)
+        return self._tree.query_ball_point(
+            to_unit_xyz(lats, lons), r=float(miles_to_chord(radius_miles)), return_length=True
+        ).astype(int)
@@ -5,6 +5,7 @@ from loans import LoansProvider
 from property_assessment import RiskAssessmentClient
 from property_summary import PropertySummaryClient
 from neighborhoods import NeighborhoodsClient
+from report_repository import ReportRepository
 from rich.markdown import Markdown
 from display import display_rent_estimates_comparison
 
@@ -308,15 +309,22 @@ def handle_view_research_reports(property_id: str, supabase, console):
             else:
                 console.print("[red]Error loading report.[/red]")
 
+def _display_stored_report(report_id: str, reports: ReportRepository, console):
+    """Show a stored report's markdown in the pager (bodies are cached, so re-opening is free)"""
+    try:
+        body = reports.get_body(report_id)
+        if body is not None:
+            with console.pager():
+                console.print(Markdown(body))
+    except Exception as e:
+        console.print(f"[red]Error displaying report: {str(e)}[/red]")
+
 def handle_risk_assessment(property_id: str, supabase, console):
     """Handle viewing and generating risk assessment reports"""
+    reports = ReportRepository(supabase)
     # Check for existing risk assessment reports
     try:
-        response = supabase.table("research_reports").select("*").eq(
-            "property_id", property_id
-        ).eq("research_type", "property_risk_report").order("created_at", desc=True).execute()
-
-        existing_reports = response.data if response.data else []
+        existing_reports = reports.list_for_property(property_id, "property_risk_report")
     except Exception as e:
         console.print(f"[red]Error fetching risk assessment reports: {str(e)}[/red]")
         return
@@ -332,20 +340,7 @@ def handle_risk_assessment(property_id: str, supabase, console):
 
             if report_id:
                 # Fetch and display the generated report
-                try:
-                    report_response = supabase.table("research_reports").select("*").eq(
-                        "id", report_id
-                    ).single().execute()
-
-                    if report_response.data:
-                        from rich.markdown import Markdown
-
-                        md = Markdown(report_response.data['report_content'])
-
-                        with console.pager():
-                            console.print(md)
-                except Exception as e:
-                    console.print(f"[red]Error displaying report: {str(e)}[/red]")
+                _display_stored_report(report_id, reports, console)
         return
 
     # If reports exist, ask if they want to view or generate new
@@ -366,20 +361,7 @@ def handle_risk_assessment(property_id: str, supabase, console):
 
         if report_id:
             # Fetch and display the generated report
-            try:
-                report_response = supabase.table("research_reports").select("*").eq(
-                    "id", report_id
-                ).single().execute()
-
-                if report_response.data:
-                    from rich.markdown import Markdown
-
-                    md = Markdown(report_response.data['report_content'])
-
-                    with console.pager():
-                        console.print(md)
-            except Exception as e:
-                console.print(f"[red]Error displaying report: {str(e)}[/red]")
+            _display_stored_report(report_id, reports, console)
     elif action == "View existing report":
         # Show list of existing reports
         while True:
@@ -408,39 +390,23 @@ def handle_risk_assessment(property_id: str, supabase, console):
                     break
 
             if selected_id:
-                try:
-                    report_response = supabase.table("research_reports").select("*").eq(
-                        "id", selected_id
-                    ).single().execute()
+                _display_stored_report(selected_id, reports, console)
 
-                    if report_response.data:
-                        from rich.markdown import Markdown
-
-                        md = Markdown(report_response.data['report_content'])
-
-                        with console.pager():
-                            console.print(md)
-                except Exception as e:
-                    console.print(f"[red]Error displaying report: {str(e)}[/red]")
-
-def handle_property_summary(property_id: str, supabase, console, df):
+def handle_property_summary(property_id: str, supabase, console, store):
     """Handle viewing and generating property narrative summary reports"""
-    # Get enriched property data from dataframe (with calculated financials)
-    property_row = df[df['address1'] == property_id]
-    if property_row.empty:
+    reports = ReportRepository(supabase)
+    # Get enriched property data from the address-indexed store (with calculated financials)
+    property_row = store.get_row(property_id)
+    if property_row is None:
         console.print(f"[red]Property not found in dataframe: {property_id}[/red]")
         return
 
     # Convert row to dict for passing to client
-    property_data = property_row.iloc[0].to_dict()
+    property_data = property_row.to_dict()
 
     # Check for existing property summary reports
     try:
-        response = supabase.table("research_reports").select("*").eq(
-            "property_id", property_id
-        ).eq("research_type", "property_narrative_summary").order("created_at", desc=True).execute()
-
-        existing_reports = response.data if response.data else []
+        existing_reports = reports.list_for_property(property_id, "property_narrative_summary")
     except Exception as e:
         console.print(f"[red]Error fetching property summary reports: {str(e)}[/red]")
         return
@@ -456,18 +422,7 @@ def handle_property_summary(property_id: str, supabase, console, df):
 
             if report_id:
                 # Fetch and display the generated report
-                try:
-                    report_response = supabase.table("research_reports").select("*").eq(
-                        "id", report_id
-                    ).single().execute()
-
-                    if report_response.data:
-                        md = Markdown(report_response.data['report_content'])
-
-                        with console.pager():
-                            console.print(md)
-                except Exception as e:
-                    console.print(f"[red]Error displaying report: {str(e)}[/red]")
+                _display_stored_report(report_id, reports, console)
         return
 
     # If reports exist, ask if they want to view or generate new
@@ -488,18 +443,7 @@ def handle_property_summary(property_id: str, supabase, console, df):
 
         if report_id:
             # Fetch and display the generated report
-            try:
-                report_response = supabase.table("research_reports").select("*").eq(
-                    "id", report_id
-                ).single().execute()
-
-                if report_response.data:
-                    md = Markdown(report_response.data['report_content'])
-
-                    with console.pager():
-                        console.print(md)
-            except Exception as e:
-                console.print(f"[red]Error displaying report: {str(e)}[/red]")
+            _display_stored_report(report_id, reports, console)
     elif action == "View existing summary":
         # Show list of existing reports
         while True:
@@ -528,18 +472,7 @@ def handle_property_summary(property_id: str, supabase, console, df):
                     break
 
             if selected_id:
-                try:
-                    report_response = supabase.table("research_reports").select("*").eq(
-                        "id", selected_id
-                    ).single().execute()
-
-                    if report_response.data:
-                        md = Markdown(report_response.data['report_content'])
-
-                        with console.pager():
-                            console.print(md)
-                except Exception as e:
-                    console.print(f"[red]Error displaying report: {str(e)}[/red]")
+                _display_stored_report(selected_id, reports, console)
 
 def handle_generate_rent_estimates(property_id: str, supabase, console, report_id: str = None):
     """Handle generating rent estimates from an existing research report"""
@@ -614,11 +547,11 @@ def handle_generate_rent_estimates(property_id: str, supabase, console, report_i
             ).ask()
 
             if update_database:
-                update_success = researcher._update_rent_estimates_in_db(
+                update_result = researcher._update_rent_estimates_in_db(
                     property_id, unit_configs, estimates
                 )
 
-                if update_success:
+                if update_result["success"]:
                     console.print("\n[bold green]✅ Database updated successfully![/bold green]")
                 else:
                     console.print("\n[bold red]❌ Database update failed. See details above.[/bold red]")
@@ -665,11 +598,11 @@ def handle_rent_research_after_add(property_id: str, supabase, console, ask_user
                 update_database = True
 
             if update_database:
-                update_success = researcher._update_rent_estimates_in_db(
+                update_result = researcher._update_rent_estimates_in_db(
                     property_id, unit_configs, estimates
                 )
 
-                if update_success:
+                if update_result["success"]:
                     console.print("\n[bold green]✅ Database updated successfully![/bold green]")
                 else:
                     console.print("\n[bold red]❌ Database update failed. See details above.[/bold red]")
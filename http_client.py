@@ -0,0 +1,179 @@
+"""
+Shared HTTP client for the external APIs (RentCast, Google Geocode/Places, Walk Score).
+
+Every call used to go through bare requests.get/post, which opens a fresh TCP+TLS
+connection each time and waits forever if a host stalls. This module keeps one
+keep-alive requests.Session per host with a connection pool sized for the concurrent
+POI lookups, applies a default (connect, read) timeout, and retries transient failures
+with the same exponential backoff make_places_request_with_retry has always used.
+
+It also records per-host latency so bulk scripts can report where time went, and
+writes every call to a paid API host to the api_ledger.
+"""
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from rich.table import Table
+
+from api_ledger import HOST_PROVIDERS, call_cost, endpoint_for_path, record
+
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 0.1  # 100ms, 200ms, 400ms
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+POOL_MAXSIZE = 10
+LATENCY_SAMPLE_SIZE = 500
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff shared by every retry loop that talks to an external API"""
+    return (2 ** attempt) * RETRY_BASE_DELAY_SECONDS
+
+
+class HostLatencyStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLE_SIZE)
+
+    def record(self, seconds: float, failed: bool):
+        self.requests += 1
+        self.errors += 1 if failed else 0
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": (self.total_seconds / self.requests * 1000) if self.requests else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max_seconds * 1000,
+        }
+
+
+_latency = {}
+_latency_lock = threading.Lock()
+
+
+def _record_latency(host: str, seconds: float, failed: bool):
+    with _latency_lock:
+        _latency.setdefault(host, HostLatencyStats()).record(seconds, failed)
+
+
+def get_session(host: str) -> requests.Session:
+    """Return the pooled keep-alive session for a host, creating it on first use"""
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def request(method: str, url: str, max_retries: int = DEFAULT_MAX_RETRIES, timeout=DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Send a request over the host's pooled session.
+
+    Connection errors, timeouts and 429/5xx responses are retried up to max_retries
+    attempts with backoff_seconds() between them. The last response is returned as-is
+    (callers still check status/JSON); the last exception is raised if every attempt failed.
+    """
+    parsed = urlparse(url)
+    host = parsed.netloc
+    session = get_session(host)
+    provider = HOST_PROVIDERS.get(host)
+    call_started = time.perf_counter()
+
+    def ledger(outcome: str):
+        if provider:
+            endpoint = endpoint_for_path(parsed.path)
+            record(
+                provider,
+                endpoint,
+                latency_seconds=time.perf_counter() - call_started,
+                cost=call_cost(provider, endpoint) if outcome == "ok" else 0.0,
+                outcome=outcome,
+            )
+
+    for attempt in range(max_retries):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _record_latency(host, time.perf_counter() - started, failed=True)
+            if attempt < max_retries - 1:
+                time.sleep(backoff_seconds(attempt))
+                continue
+            ledger("connection_error")
+            raise
+
+        failed = response.status_code in RETRY_STATUS_CODES
+        _record_latency(host, time.perf_counter() - started, failed=failed)
+        if failed and attempt < max_retries - 1:
+            time.sleep(backoff_seconds(attempt))
+            continue
+        ledger("ok" if response.status_code < 400 else f"http_{response.status_code}")
+        return response
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def get_latency_stats():
+    """Per-host latency summary: {host: {requests, errors, avg_ms, p50_ms, p95_ms, max_ms}}"""
+    with _latency_lock:
+        return {host: stats.to_dict() for host, stats in _latency.items()}
+
+
+def display_latency_stats(console):
+    stats = get_latency_stats()
+    if not stats:
+        return
+
+    table = Table(title="External API Latency", show_header=True, header_style="bold magenta")
+    table.add_column("Host", style="cyan")
+    table.add_column("Requests", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Avg", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Max", justify="right")
+
+    for host, host_stats in sorted(stats.items()):
+        table.add_row(
+            host,
+            str(host_stats["requests"]),
+            str(host_stats["errors"]),
+            f"{host_stats['avg_ms']:.0f}ms",
+            f"{host_stats['p50_ms']:.0f}ms",
+            f"{host_stats['p95_ms']:.0f}ms",
+            f"{host_stats['max_ms']:.0f}ms",
+        )
+
+    console.print(table)
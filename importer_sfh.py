@@ -15,6 +15,7 @@ from rich.panel import Panel
 
 from handlers import handle_scrape_neighborhood_from_findneighborhoods, handle_rent_research_after_add
 from neighborhood_scraper import NeighborhoodScraper
+from location_cache import location_cache
 from add_property import (
     add_property_to_supabase,
     get_rental_estimations_singlefamily,
@@ -265,6 +266,10 @@ def import_properties(csv_filepath: str) -> Dict[str, Any]:
         df = load_csv(csv_filepath)
         stats["total"] = len(df)
 
+        # Bulk lookup of geocode/Walk Score for every address up front - known addresses cost no API calls
+        known_locations = location_cache.preload(df["Full Address"].tolist())
+        console.print(f"[dim]{known_locations}/{stats['total']} addresses already geocoded (cached)[/dim]")
+
         console.print(f"\n[bold cyan]Starting import of {stats['total']} properties...[/bold cyan]\n")
 
         # Process each property
@@ -462,6 +467,7 @@ def display_import_summary(stats: Dict[str, Any]):
     table.add_row("Properties with placeholders", f"[cyan]{stats['properties_with_placeholders']}[/cyan]")
     table.add_row("", "")
     table.add_row("Phase 1 Qualifiers", f"[bold green]{stats['phase1_qualified']}[/bold green]")
+    table.add_row("Geocode/Walk Score cache hits", f"[cyan]{location_cache.hits}[/cyan] (misses: {location_cache.misses})")
 
     if stats["total_api_cost"] > 0:
         table.add_row("Total API cost (research)", f"${stats['total_api_cost']:.2f}")
@@ -0,0 +1,235 @@
+"""
+Persistent cache of geocode and Walk Score lookups, keyed by a normalized address.
+
+Geocoding and Walk Score never change for a given address, but the same house is
+looked up again on every re-add, backfill and CSV re-import - and "123 Main Street Apt 2"
+vs "123 main st #2" used to be two separate paid calls. Entries are stored in the
+shared response cache database (see response_cache.py) and honour PROPDEALS_CACHE_MODE:
+in offline/replay mode a miss raises CacheMissError instead of calling out.
+
+The importer calls preload() once with every address in the CSV so that known
+addresses are served from memory for the rest of the run.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from api_ledger import record_cache_hit
+from response_cache import CACHE_DB_PATH, CACHE_MODE, CacheMissError
+
+STREET_SUFFIXES = {
+    "street": "st", "str": "st",
+    "avenue": "ave", "av": "ave",
+    "road": "rd",
+    "drive": "dr",
+    "lane": "ln",
+    "court": "ct",
+    "boulevard": "blvd",
+    "place": "pl",
+    "circle": "cir",
+    "terrace": "ter",
+    "parkway": "pkwy",
+    "highway": "hwy",
+    "trail": "trl",
+    "square": "sq",
+}
+DIRECTIONALS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+UNIT_DESIGNATORS = {"apartment", "apt", "unit", "suite", "ste", "#"}
+COUNTRY_SUFFIXES = {"usa", "us", "united states", "united states of america"}
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical form of an address for cache keys.
+
+    Lowercases, drops punctuation, abbreviates street suffixes and directionals,
+    rewrites unit designators (Apt/Unit/Suite/#) as "unit <id>", trims ZIP+4 and a
+    trailing country. "123 North Main Street, Apt. 2, Des Moines, IA 50309-1234, USA"
+    becomes "123 n main st unit 2, des moines, ia 50309".
+    """
+    if not address:
+        return ""
+
+    text = address.lower().replace("#", " # ").replace(".", "")
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    parts = [part for part in parts if part and part not in COUNTRY_SUFFIXES]
+
+    street_tokens = []
+    rest = []
+    for index, part in enumerate(parts):
+        tokens = part.split()
+        normalized = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in UNIT_DESIGNATORS:
+                # Skip chained designators ("apt #4") and keep only the unit id
+                while i + 1 < len(tokens) and tokens[i + 1] in UNIT_DESIGNATORS:
+                    i += 1
+                if i + 1 < len(tokens):
+                    normalized.extend(["unit", tokens[i + 1]])
+                    i += 2
+                    continue
+            elif index == 0:
+                token = STREET_SUFFIXES.get(token, DIRECTIONALS.get(token, token))
+            else:
+                token = re.sub(r"^(\d{5})-\d{4}$", r"\1", token)
+            normalized.append(token)
+            i += 1
+
+        if index == 0 or (normalized and normalized[0] == "unit"):
+            # A unit written as its own comma-separated part belongs to the street line
+            street_tokens.extend(normalized)
+        elif normalized:
+            rest.append(" ".join(normalized))
+
+    return ", ".join([" ".join(street_tokens)] + rest)
+
+
+class LocationCache:
+    GEOCODE_FIELDS = ["lat", "lon", "county", "neighborhood"]
+    WALKSCORE_FIELDS = ["walk_score", "transit_score", "bike_score"]
+
+    def __init__(self, db_path: str = CACHE_DB_PATH, mode: str = CACHE_MODE):
+        self.db_path = db_path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS locations (
+                    address_key TEXT PRIMARY KEY,
+                    full_address TEXT,
+                    lat REAL,
+                    lon REAL,
+                    county TEXT,
+                    neighborhood TEXT,
+                    walk_score,
+                    transit_score,
+                    bike_score,
+                    geocoded_at REAL,
+                    walkscore_at REAL
+                )
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _row_to_record(self, row):
+        address_key, full_address, lat, lon, county, neighborhood, walk, transit, bike, geocoded_at, walkscore_at = row
+        record = {"address_key": address_key, "full_address": full_address}
+        if geocoded_at is not None:
+            record.update({"lat": lat, "lon": lon, "county": county, "neighborhood": neighborhood})
+        if walkscore_at is not None:
+            record.update({"walk_score": walk, "transit_score": transit, "bike_score": bike})
+        return record
+
+    def preload(self, addresses) -> int:
+        """
+        Bulk lookup: load every known address in one query and keep them in memory.
+
+        Returns:
+            Number of addresses that are already cached
+        """
+        keys = list({normalize_address(address) for address in addresses if address})
+        if not keys or self.mode == "off":
+            return 0
+
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            try:
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT * FROM locations WHERE address_key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for row in rows:
+                        found[row[0]] = self._row_to_record(row)
+            finally:
+                conn.close()
+            self._memory.update(found)
+        return len(found)
+
+    def get(self, address: str):
+        """Return the cached record for an address ({} if unknown)"""
+        if self.mode == "off":
+            return {}
+        key = normalize_address(address)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT * FROM locations WHERE address_key = ?", (key,)).fetchone()
+            finally:
+                conn.close()
+            record = self._row_to_record(row) if row else {}
+            if record:
+                self._memory[key] = record
+            return record
+
+    def _lookup(self, address: str, fields, kind: str, provider: str, endpoint: str):
+        record = self.get(address)
+        if all(field in record for field in fields):
+            self.hits += 1
+            record_cache_hit(provider, endpoint)
+            return {field: record[field] for field in fields}
+        self.misses += 1
+        if self.mode in ("offline", "replay"):
+            raise CacheMissError(f"No cached {kind} for {address}")
+        return None
+
+    def get_geocode(self, address: str):
+        """Cached {lat, lon, county, neighborhood} or None"""
+        return self._lookup(address, self.GEOCODE_FIELDS, "geocode", "google", "geocode")
+
+    def get_walkscore(self, address: str):
+        """Cached {walk_score, transit_score, bike_score} or None"""
+        return self._lookup(address, self.WALKSCORE_FIELDS, "walk score", "walkscore", "score")
+
+    def _upsert(self, address: str, values: dict, timestamp_column: str):
+        if self.mode == "off":
+            return
+        key = normalize_address(address)
+        columns = list(values.keys())
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    f"INSERT INTO locations (address_key, full_address, {', '.join(columns)}, {timestamp_column}) "
+                    f"VALUES (?, ?, {', '.join('?' * len(columns))}, ?) "
+                    f"ON CONFLICT(address_key) DO UPDATE SET "
+                    + ", ".join(f"{column} = excluded.{column}" for column in columns + [timestamp_column]),
+                    [key, address] + [values[column] for column in columns] + [time.time()],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._memory.setdefault(key, {"address_key": key, "full_address": address}).update(values)
+
+    def set_geocode(self, address: str, geocode: dict):
+        self._upsert(address, {field: geocode[field] for field in self.GEOCODE_FIELDS}, "geocoded_at")
+
+    def set_walkscore(self, address: str, walk, transit, bike):
+        self._upsert(address, {"walk_score": walk, "transit_score": transit, "bike_score": bike}, "walkscore_at")
+
+
+location_cache = LocationCache()
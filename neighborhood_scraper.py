@@ -5,11 +5,15 @@ This module provides web scraping functionality to extract neighborhood names
 from the Des Moines city website using Playwright for headless browser automation.
 """
 
-from typing import Optional
-from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeout
+from typing import TYPE_CHECKING, Optional
 from rich.console import Console
 from supabase import Client
 
+if TYPE_CHECKING:
+    # Playwright is imported lazily in the scraping methods - it's slow to import and
+    # most sessions never scrape
+    from playwright.sync_api import Page
+
 
 # Custom Exceptions
 class NeighborhoodScraperError(Exception):
@@ -128,6 +132,8 @@ class NeighborhoodScraper:
             ScrapingTimeoutError: If operation times out
             ScrapingError: For other failures
         """
+        from playwright.sync_api import sync_playwright
+
         with sync_playwright() as p:
             # Launch browser in headless mode
             browser = p.chromium.launch(
@@ -157,7 +163,7 @@ class NeighborhoodScraper:
                 # Always cleanup browser resources
                 browser.close()
 
-    def _perform_scraping(self, page: Page, address: str) -> str:
+    def _perform_scraping(self, page: "Page", address: str) -> str:
         """
         Execute the scraping workflow on the neighborhood finder page.
 
@@ -182,6 +188,8 @@ class NeighborhoodScraper:
             ScrapingTimeoutError: If timeout occurs
             ScrapingError: For other failures
         """
+        from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
         try:
             # Step 1: Navigate to the neighborhood finder
             self.console.print(f"[cyan]Navigating to {self.target_url}...[/cyan]")
@@ -4,9 +4,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-import openai
 import pandas as pd
-import requests
 from pydantic import BaseModel
 from rich.console import Console
 from rich.panel import Panel
@@ -14,8 +12,16 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.prompt import Confirm, Prompt
 from rich.table import Table
 from supabase import Client
-from tavily import TavilyClient
 from helpers import normalize_neighborhood_name
+from http_client import http_get
+from api_ledger import call_cost, openai_cost
+from context_packing import NEIGHBORHOOD_KEYWORDS, add_prompt_token_stats, describe_packing, pack_search_results
+from openai_batch import BATCH_PRICE_MULTIPLIER, BatchJob, chat_request
+from openai_structured import get_structured_client
+from reasoning_stream import stream_completion
+from report_repository import ReportRepository
+from report_memo import find_memoized_report, hash_columns, prompt_hash, reuse_memoized_report
+from web_search import perform_searches
 
 @dataclass
 class NeighborhoodResearchConfig:
@@ -24,9 +30,8 @@ class NeighborhoodResearchConfig:
     instant_model: str = "gpt-5-nano"
     effort: str = "high"
     max_tokens: int = 120000
-    search_cost_per_query: float = 0.008  # Tavily cost
-    reasoning_cost_per_input_token: float = 1.25 / 1000000
-    reasoning_cost_per_output_token: float = 10 / 1000000
+    search_cost_per_query: float = call_cost("tavily", "search")
+    context_token_budget: int = 6000  # Web research tokens per reasoning prompt (the old 25 x 1000-char block was ~6-7k)
     searches_per_neighborhood: int = 6
 
 
@@ -41,18 +46,32 @@ class NeighborhoodsClient():
         self.supabase = supabase_client
         self.console = console
         self.config = NeighborhoodResearchConfig()
+        self.reports = ReportRepository(supabase_client)
 
-        # Initialize OpenAI client for reasoning
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
+        # OpenAI (reasoning) and Tavily (search) clients are built on first use - this
+        # client is also constructed just to load neighborhood data, which needs neither
+        self._openai_api_key = os.getenv("OPENAI_API_KEY")
+        if not self._openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
-        self.openai_client = openai.OpenAI(api_key=openai_api_key)
-
-        # Initialize Tavily client for search
-        tavily_api_key = os.getenv("TAVILY_API_KEY")
-        if not tavily_api_key:
+        self._tavily_api_key = os.getenv("TAVILY_API_KEY")
+        if not self._tavily_api_key:
             raise ValueError("TAVILY_API_KEY environment variable not set")
-        self.tavily_client = TavilyClient(api_key=tavily_api_key)
+        self._openai_client = None
+        self._tavily_client = None
+
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            import openai
+            self._openai_client = openai.OpenAI(api_key=self._openai_api_key)
+        return self._openai_client
+
+    @property
+    def tavily_client(self):
+        if self._tavily_client is None:
+            from tavily import TavilyClient
+            self._tavily_client = TavilyClient(api_key=self._tavily_api_key)
+        return self._tavily_client
 
     def is_neighborhood_assessment_complete(self, address1: str) -> bool:
         return False
@@ -144,7 +163,7 @@ class NeighborhoodsClient():
         try:
             # Get geocode data
             self.console.print(f"[cyan]Getting geocode data for: {full_address}[/cyan]")
-            response = requests.get(
+            response = http_get(
                 "https://maps.googleapis.com/maps/api/geocode/json",
                 params={
                     "key": os.getenv("GOOGLE_KEY"),
@@ -458,23 +477,25 @@ class NeighborhoodsClient():
         # For now, return False for all addresses
         return {address: False for address in address1_list}
 
-    def get_neighborhoods_dataframe(self, supabase):
+    def get_neighborhoods_dataframe(self, supabase, addresses=None):
         """
         Fetch neighborhoods for all properties from the property_neighborhood many-to-many table.
 
         Args:
             supabase: Supabase client instance
+            addresses: Optional list of address1 values to limit the lookup to
 
         Returns:
             pandas DataFrame with columns: address1, neighborhood
             Properties without neighborhoods will not be in the dataframe (handled by left merge)
         """
         try:
-            response = (
-                supabase.table("property_neighborhood")
-                .select("address1, neighborhoods(name, letter_grade, niche_com_letter_grade)")
-                .execute()
+            query = supabase.table("property_neighborhood").select(
+                "address1, neighborhoods(name, letter_grade, niche_com_letter_grade)"
             )
+            if addresses is not None:
+                query = query.in_("address1", list(addresses))
+            response = query.execute()
 
             if not response.data:
                 return pd.DataFrame(
@@ -551,16 +572,21 @@ class NeighborhoodsClient():
             return None
 
     def _calculate_cost(
-        self, num_searches: int, input_tokens: int, output_tokens: int
+        self,
+        num_searches: int,
+        input_tokens: int,
+        output_tokens: int,
+        model: Optional[str] = None,
+        multiplier: float = 1.0,
     ) -> Decimal:
-        """Calculate the total cost of searches + reasoning"""
+        """
+        Calculate the total cost of searches + reasoning. Tokens are priced for the model
+        that was actually called (default: reasoning_model) with api_ledger's price table,
+        so stored api_cost values agree with the ledger.
+        """
         search_cost = num_searches * self.config.search_cost_per_query
-        reasoning_input_cost = input_tokens * self.config.reasoning_cost_per_input_token
-        reasoning_output_cost = (
-            output_tokens * self.config.reasoning_cost_per_output_token
-        )
-        total_cost = search_cost + reasoning_input_cost + reasoning_output_cost
-        return Decimal(str(total_cost)).quantize(Decimal("0.0001"))
+        reasoning_cost = openai_cost(model or self.config.reasoning_model, input_tokens, output_tokens, multiplier)
+        return Decimal(str(search_cost + reasoning_cost)).quantize(Decimal("0.0001"))
 
     def _generate_neighborhood_search_queries(
         self, neighborhood: str, city: str
@@ -577,159 +603,76 @@ class NeighborhoodsClient():
         return NEIGHBORHOOD_SEARCH_QUERIES
 
     def _perform_searches(self, queries: List[str]) -> List[Dict[str, Any]]:
-        """Perform Tavily searches for all queries"""
-        search_results = []
-        total_queries = len(queries)
-        successful_searches = 0
-
-        self.console.print(
-            f"\n[bold cyan]🔍 Starting Tavily search for {total_queries} queries...[/bold cyan]\n"
-        )
-
-        for i, query in enumerate(queries, 1):
-            # Pre-search logging
-            self.console.print(
-                f'[cyan]🔍 [{i}/{total_queries}] Searching:[/cyan] [white]"{query}"[/white]'
-            )
-
-            try:
-                response = self.tavily_client.search(
-                    query=query,
-                    search_depth="advanced",
-                    max_results=5,
-                    include_raw_content="markdown",
-                )
-
-                if response and "results" in response:
-                    results_count = len(response["results"])
-                    sources_count = len(
-                        set(result.get("url", "") for result in response["results"])
-                    )
-
-                    for result in response["results"]:
-                        search_results.append(
-                            {
-                                "query": query,
-                                "title": result.get("title", ""),
-                                "url": result.get("url", ""),
-                                "content": result.get("content", ""),
-                                "raw_content": result.get("raw_content", ""),
-                                "score": result.get("score", 0),
-                            }
-                        )
-
-                    # Post-search success logging
-                    self.console.print(
-                        f"[green]   ✅ Found {results_count} results from {sources_count} sources[/green]\n"
-                    )
-                    successful_searches += 1
-                else:
-                    # Post-search no results logging
-                    self.console.print("[yellow]   ❌ No results found[/yellow]\n")
-
-            except Exception as e:
-                # Enhanced error logging
-                self.console.print(f"[red]   ❌ Search failed: {str(e)}[/red]\n")
-                continue
-
-        # Overall search statistics summary
-        total_results = len(search_results)
-        failed_searches = total_queries - successful_searches
+        """Perform Tavily searches for all queries (concurrently, logged in query order, cached)"""
+        search_results, self.last_search_stats = perform_searches(self.tavily_client, queries, self.console)
+        return search_results
 
-        self.console.print("[bold green]📊 Search Summary:[/bold green]")
-        self.console.print(
-            f"[green]   • Successful searches: {successful_searches}/{total_queries}[/green]"
+    def _pack_search_data(self, search_results: List[Dict[str, Any]]) -> str:
+        """Dedupe and compress search results to the prompt's token budget"""
+        search_data, self.last_context_stats = pack_search_results(
+            search_results, NEIGHBORHOOD_KEYWORDS, self.config.context_token_budget
         )
-        if failed_searches > 0:
-            self.console.print(
-                f"[yellow]   • Failed searches: {failed_searches}[/yellow]"
-            )
-        self.console.print(
-            f"[cyan]   • Total results collected: {total_results} data points[/cyan]\n"
+        return search_data
+
+    def _log_prompt_tokens(self, prompt: str):
+        """Record and log the whole prompt's size against the unpacked baseline"""
+        add_prompt_token_stats(self.last_context_stats, prompt)
+        self.console.print(f"[cyan]{describe_packing(self.last_context_stats)}[/cyan]")
+
+    def _analyze_with_reasoning_model(self, prompt: str, checkpoint_name: str = "neighborhood") -> Dict[str, Any]:
+        """Stream the analysis from OpenAI's reasoning model (see reasoning_stream)"""
+        return stream_completion(
+            self.openai_client,
+            self.console,
+            self.config.reasoning_model,
+            prompt,
+            self.config.max_tokens,
+            checkpoint_name=checkpoint_name,
+            reasoning_effort=self.config.effort,
         )
 
-        return search_results
-
-    def _analyze_with_reasoning_model(self, prompt: str) -> Dict[str, Any]:
-        """Analyze data using OpenAI's reasoning model"""
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config.reasoning_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_completion_tokens=self.config.max_tokens,
-                reasoning_effort=self.config.effort,
-            )
+    def _grade_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        grade_data = result["parsed"]
+        return {
+            "grade": grade_data.letter_grade if grade_data else None,
+            "confidence_score": grade_data.confidence_score if grade_data else None,
+            "input_tokens": result["input_tokens"],
+            "output_tokens": result["output_tokens"],
+            "success": result["success"],
+            "error": result["error"],
+        }
 
-            content = response.choices[0].message.content
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
+    def _extract_letter_grade_with_reasoning_model(self, prompt: str) -> Dict[str, Any]:
+        """Extract letter grade using structured outputs with Pydantic (rate limited, with retries)"""
+        return self._grade_result(
+            get_structured_client().parse(self.config.instant_model, prompt, NeighborhoodLetterGrade)
+        )
 
-            return {
-                "content": content,
-                "input_tokens": input_tokens,
-                "output_tokens": output_tokens,
-                "success": True,
-            }
+    def _extract_letter_grades_with_reasoning_model(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """_extract_letter_grade_with_reasoning_model for many prompts at once, run concurrently"""
+        results = get_structured_client().parse_many(self.config.instant_model, prompts, NeighborhoodLetterGrade)
+        return [self._grade_result(result) for result in results]
 
-        except Exception as e:
-            return {
-                "content": None,
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "success": False,
-                "error": str(e),
-            }
+    def _create_grade_extraction_prompt(self, report_content: str) -> str:
+        return f"""Analyze the following neighborhood research report and extract the letter grade.
 
-    def _extract_letter_grade_with_reasoning_model(self, prompt: str) -> Dict[str, Any]:
-        """Extract letter grade using structured outputs with Pydantic"""
-        try:
-            response = self.openai_client.beta.chat.completions.parse(
-                model=self.config.instant_model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format=NeighborhoodLetterGrade,
-                max_completion_tokens=4000,
-            )
+# Research Report:
+{report_content}
 
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
+# Extraction Instructions:
+The report contains an "Overall Grade" in the format: **Overall Grade:** [A/B/C/D/F]
 
-            # Check for refusal
-            if response.choices[0].message.refusal:
-                return {
-                    "grade": None,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "success": False,
-                    "error": f"Model refused to extract grade: {response.choices[0].message.refusal}",
-                }
+Extract:
+1. **letter_grade**: Single letter (A, B, C, D, or F) representing the neighborhood grade
+2. **confidence_score**: Your confidence in this extraction (0.0 to 1.0)
 
-            # Get the parsed result
-            grade_data = response.choices[0].message.parsed
-            if grade_data:
-                return {
-                    "grade": grade_data.letter_grade,
-                    "confidence_score": grade_data.confidence_score,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "success": True,
-                }
-            else:
-                return {
-                    "grade": None,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "success": False,
-                    "error": "Failed to parse structured response",
-                }
+Base your confidence on:
+- Clarity of the grade in the report
+- Whether the grade is explicitly stated vs implied
+- Consistency throughout the report
 
-        except Exception as e:
-            return {
-                "grade": None,
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "success": False,
-                "error": f"API call failed: {str(e)}",
-            }
+Provide only the letter grade (A, B, C, D, or F) without any additional text.
+"""
 
     def _sanitize_content(self, content: str) -> str:
         """Sanitize content to remove problematic characters for PostgreSQL storage"""
@@ -765,6 +708,7 @@ class NeighborhoodsClient():
         prompt_used: str,
         cost: Decimal,
         status: str = "completed",
+        report_hash: Optional[str] = None,
     ) -> Optional[str]:
         """Store the neighborhood research report in the database"""
         try:
@@ -789,6 +733,7 @@ class NeighborhoodsClient():
                         "api_cost": float(cost),
                         "research_type": f"{neighborhood_name}_neighborhood_report",
                         "created_at": datetime.now(timezone.utc).isoformat(),
+                        **hash_columns(self.supabase, report_hash),
                     }
                 )
                 .execute()
@@ -995,12 +940,7 @@ class NeighborhoodsClient():
             )
 
             # Compile search data for prompt
-            search_data = "\n\n".join(
-                [
-                    f"**Query**: {result['query']}\n**Source**: {result['title']} ({result['url']})\n**Content**: {result['content'][:1000]}..."
-                    for result in search_results[:25]
-                ]
-            )
+            search_data = self._pack_search_data(search_results)
 
             # Create analysis prompt using the template
             analysis_prompt = f"""
@@ -1105,8 +1045,27 @@ All fields and sections must be rendered exactly as in the template and in the s
 - For bullet lists (Risk Factors, Catalysts), provide 2-4 bullets, each a single concise line.
 - Persist until all sections and required fields are addressed as fully as the input allows, within the length limit.
 """.strip()
+            self._log_prompt_tokens(analysis_prompt)
+
+            # An identical prompt was already answered - reuse that report instead of paying again
+            report_hash = prompt_hash(
+                self._sanitize_content(analysis_prompt),
+                self.config.reasoning_model,
+                max_tokens=self.config.max_tokens,
+                effort=self.config.effort,
+            )
+            existing = find_memoized_report(
+                self.supabase, report_hash, f"{neighborhood_name}_neighborhood_report", self.console
+            )
+            if reuse_memoized_report(existing, self.console):
+                return (existing["id"], True)
 
-            result = self._analyze_with_reasoning_model(analysis_prompt)
+            # The stream renders its own live view, which can't share the console with the spinner
+            progress.stop()
+            result = self._analyze_with_reasoning_model(
+                analysis_prompt, f"{neighborhood_name}_neighborhood_report"
+            )
+            progress.start()
 
             if not result["success"]:
                 progress.update(task, description="[red]Analysis failed!")
@@ -1123,7 +1082,7 @@ All fields and sections must be rendered exactly as in the template and in the s
                 return (None, False)
 
             # Calculate total cost
-            num_searches = len(queries)
+            num_searches = self.last_search_stats["paid_searches"]  # Cache hits are free
             cost = self._calculate_cost(
                 num_searches, result["input_tokens"], result["output_tokens"]
             )
@@ -1132,7 +1091,7 @@ All fields and sections must be rendered exactly as in the template and in the s
 
             # Store successful report
             report_id = self._store_report(
-                address1, neighborhood_name, result["content"], analysis_prompt, cost
+                address1, neighborhood_name, result["content"], analysis_prompt, cost, report_hash=report_hash
             )
 
             progress.update(task, description="[green]Research completed successfully!")
@@ -1146,10 +1105,17 @@ All fields and sections must be rendered exactly as in the template and in the s
                     f"[green]Neighborhood research completed successfully![/green]\n\n"
                     f"**Neighborhood**: {neighborhood_name}\n"
                     f"**Location**: {city}, {state}\n"
-                    f"**Market Data Sources**: {len(search_results)} data points from {num_searches} searches\n"
+                    f"**Market Data Sources**: {len(search_results)} data points from {len(queries)} searches\n"
                     f"**Reasoning Tokens**: {result['input_tokens']:,} input, {result['output_tokens']:,} output\n"
-                    f"**Search Cost**: ${search_cost:.4f} ({num_searches} × $0.008)\n"
+                    f"**Search Cost**: ${search_cost:.4f} ({num_searches} × ${self.config.search_cost_per_query})\n"
+                    f"**Search Cache**: {self.last_search_stats['cache_hits']}/{len(queries)} hits "
+                    f"({self.last_search_stats['hit_rate']:.0%}), ${self.last_search_stats['saved_cost']:.4f} saved\n"
+                    f"**Prompt Size**: ~{self.last_context_stats['baseline_prompt_tokens']:,} → ~{self.last_context_stats['prompt_tokens']:,} tokens "
+                    f"(search context ~{self.last_context_stats['baseline_tokens']:,} → ~{self.last_context_stats['packed_tokens']:,}, "
+                    f"{self.last_context_stats['sources']} sources)\n"
                     f"**{self.config.reasoning_model} Reasoning Cost**: ${reasoning_cost:.4f}\n"
+                    f"**Streaming**: first token after {result['ttft_seconds'] or 0:.1f}s, "
+                    f"{result['tokens_per_second'] or 0:.0f} tokens/s\n"
                     f"**Total API Cost**: ${cost:.4f}\n"
                     f"**Report ID**: {report_id}",
                     title="Neighborhood Research Summary",
@@ -1192,7 +1158,11 @@ All fields and sections must be rendered exactly as in the template and in the s
             )
 
     def extract_neighborhood_grade(
-        self, report_id: str, show_progress: bool = True
+        self,
+        report_id: str,
+        show_progress: bool = True,
+        report: Optional[Dict[str, Any]] = None,
+        extraction_result: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Extract letter grade from a neighborhood research report and update the neighborhoods table.
@@ -1200,24 +1170,19 @@ All fields and sections must be rendered exactly as in the template and in the s
         Args:
             report_id: ID of the research report to extract grade from
             show_progress: Whether to show progress spinner (disable when called from batch operations)
+            report: The report (summary columns plus report_content) if already fetched
+            extraction_result: The _extract_letter_grade_with_reasoning_model result if already extracted
 
         Returns:
             Dict with letter_grade, confidence_score, cost, and tokens_used if successful, None if failed
         """
         # Fetch the report
         try:
-            result = (
-                self.supabase.table("research_reports")
-                .select("*")
-                .eq("id", report_id)
-                .single()
-                .execute()
-            )
-            if not result.data:
+            report_data = report or self.reports.get_report(report_id)
+            if not report_data:
                 self.console.print(f"[red]Report not found: {report_id}[/red]")
                 return None
 
-            report_data = result.data
             report_content = report_data["report_content"]
             research_type = report_data.get("research_type", "")
             status = report_data.get("status", "")
@@ -1248,33 +1213,16 @@ All fields and sections must be rendered exactly as in the template and in the s
             f"[dim]    Report verified: neighborhood='{neighborhood_name}', status='{status}'[/dim]"
         )
 
-        # Create extraction prompt
-        extraction_prompt = f"""Analyze the following neighborhood research report and extract the letter grade.
-
-# Research Report:
-{report_content}
-
-# Extraction Instructions:
-The report contains an "Overall Grade" in the format: **Overall Grade:** [A/B/C/D/F]
-
-Extract:
-1. **letter_grade**: Single letter (A, B, C, D, or F) representing the neighborhood grade
-2. **confidence_score**: Your confidence in this extraction (0.0 to 1.0)
-
-Base your confidence on:
-- Clarity of the grade in the report
-- Whether the grade is explicitly stated vs implied
-- Consistency throughout the report
+        if extraction_result is None:
+            # Create extraction prompt
+            extraction_prompt = self._create_grade_extraction_prompt(report_content)
 
-Provide only the letter grade (A, B, C, D, or F) without any additional text.
-"""
-
-        # Call GPT-5 with structured outputs
-        if show_progress:
-            self.console.print("[cyan]Analyzing report with GPT-5...[/cyan]")
-        extraction_result = self._extract_letter_grade_with_reasoning_model(
-            extraction_prompt
-        )
+            # Call GPT-5 with structured outputs
+            if show_progress:
+                self.console.print("[cyan]Analyzing report with GPT-5...[/cyan]")
+            extraction_result = self._extract_letter_grade_with_reasoning_model(
+                extraction_prompt
+            )
 
         if not extraction_result["success"]:
             self.console.print(
@@ -1295,6 +1243,7 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
             0,
             extraction_result["input_tokens"],
             extraction_result["output_tokens"],
+            model=self.config.instant_model,
         )
 
         if show_progress:
@@ -1387,13 +1336,16 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
         }
 
     def extract_neighborhood_grades_batch(
-        self, report_ids: Optional[List[str]] = None
+        self, report_ids: Optional[List[str]] = None, use_batch_api: bool = False, batch_client=None
     ) -> Dict[str, Any]:
         """
         Extract letter grades for multiple neighborhood reports in batch.
 
         Args:
             report_ids: Optional list of report IDs to process. If None, processes all completed neighborhood reports.
+            use_batch_api: Submit every extraction as one OpenAI Batch API job (half price,
+                results in minutes to hours) instead of calling the model report by report
+            batch_client: Client for the files/batches endpoints (defaults to OpenAI)
 
         Returns:
             Dict with summary of processed reports, successes, failures, and total cost
@@ -1401,32 +1353,23 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
         # Fetch reports to process
         try:
             if report_ids:
-                # Fetch specific reports
-                reports = []
-                for report_id in report_ids:
-                    result = (
-                        self.supabase.table("research_reports")
-                        .select("*")
-                        .eq("id", report_id)
-                        .single()
-                        .execute()
-                    )
-                    if result.data:
-                        reports.append(result.data)
+                reports = self.reports.get_summaries(list(report_ids))
             else:
-                # Fetch all completed neighborhood reports
-                result = (
-                    self.supabase.table("research_reports")
-                    .select("*")
-                    .eq("status", "completed")
-                    .execute()
+                reports = self.reports.list_neighborhood_reports()
+
+            # Every body is about to be sent to the model - fetch them together
+            bodies = self.reports.get_bodies([report["id"] for report in reports])
+            for report in reports:
+                report["report_content"] = bodies.get(report["id"], "")
+
+            # Only completed neighborhood reports with a body are worth a model call
+            skipped = [report for report in reports if not self._is_gradable_report(report)]
+            reports = [report for report in reports if self._is_gradable_report(report)]
+            if skipped:
+                self.console.print(
+                    f"[yellow]⚠️  Skipping {len(skipped)} report(s) that are not completed neighborhood reports "
+                    f"or have no content: {', '.join(str(report['id']) for report in skipped)}[/yellow]"
                 )
-                # Filter for neighborhood reports
-                reports = [
-                    r
-                    for r in result.data
-                    if r.get("research_type", "").endswith("_neighborhood_report")
-                ]
 
             if not reports:
                 self.console.print(
@@ -1450,16 +1393,38 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
                 "results": [],
             }
 
+        skipped_results = [
+            {
+                "neighborhood": report.get("research_type", "").replace("_neighborhood_report", ""),
+                "grade": None,
+                "confidence": None,
+                "success": False,
+                "error": "Not a completed neighborhood report with content",
+            }
+            for report in skipped
+        ]
+        total_reports = len(reports) + len(skipped)
+
+        if use_batch_api:
+            results, total_cost = self._extract_grades_with_batch_api(reports, batch_client)
+            return self._display_grade_extraction_results(total_reports, results + skipped_results, total_cost)
+
         # Process each report with progress bar
         successes = 0
         failures = 0
         total_cost = 0.0
-        results = []
+        results = list(skipped_results)
 
         self.console.print(
             f"\n[bold cyan]Processing {len(reports)} neighborhood reports...[/bold cyan]\n"
         )
 
+        # Extractions run concurrently within the OpenAI rate limits; saving stays in order below
+        with self.console.status(f"[cyan]Extracting {len(reports)} grades with {self.config.instant_model}..."):
+            extraction_results = self._extract_letter_grades_with_reasoning_model(
+                [self._create_grade_extraction_prompt(report["report_content"]) for report in reports]
+            )
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -1482,7 +1447,10 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
                     )
 
                     result = self.extract_neighborhood_grade(
-                        report_id, show_progress=False
+                        report_id,
+                        show_progress=False,
+                        report=report,
+                        extraction_result=extraction_results[i - 1],
                     )
 
                     if result:
@@ -1545,6 +1513,93 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
 
                 progress.remove_task(task)
 
+        return self._display_grade_extraction_results(total_reports, results, total_cost)
+
+    @staticmethod
+    def _is_gradable_report(report: Dict[str, Any]) -> bool:
+        return (
+            (report.get("research_type") or "").endswith("_neighborhood_report")
+            and report.get("status") == "completed"
+            and bool((report.get("report_content") or "").strip())
+        )
+
+    def _extract_grades_with_batch_api(self, reports: List[Dict[str, Any]], batch_client=None):
+        """Grade every report in one Batch API job and write the grades to the neighborhoods table"""
+        requests = [
+            chat_request(
+                report["id"],
+                self.config.instant_model,
+                self._create_grade_extraction_prompt(report["report_content"]),
+                4000,
+                NeighborhoodLetterGrade,
+            )
+            for report in reports
+        ]
+        job = BatchJob(batch_client or self.openai_client, self.console, "neighborhood_grades")
+        batch_results = job.run(requests)
+
+        results = []
+        total_cost = 0.0
+        for report in reports:
+            neighborhood_name = report.get("research_type", "").replace("_neighborhood_report", "")
+            result = batch_results[report["id"]]
+            grade = None
+            saved = False
+            error = result.error
+            if result.success:
+                try:
+                    grade = NeighborhoodLetterGrade(**result.parsed)
+                except Exception:
+                    error = "Failed to parse structured response"
+
+            if grade is not None:
+                total_cost += float(self._calculate_cost(
+                    0, result.input_tokens, result.output_tokens, self.config.instant_model, BATCH_PRICE_MULTIPLIER
+                ))
+                try:
+                    update_result = (
+                        self.supabase.table("neighborhoods")
+                        .update({"letter_grade": grade.letter_grade})
+                        .eq("name", neighborhood_name)
+                        .execute()
+                    )
+                    saved = bool(update_result.data)
+                    if not saved:
+                        error = f"Neighborhood not found in database: {neighborhood_name}"
+                except Exception as e:
+                    error = f"Error updating neighborhoods table: {str(e)}"
+
+            if saved:
+                results.append(
+                    {
+                        "neighborhood": neighborhood_name,
+                        "grade": grade.letter_grade,
+                        "confidence": grade.confidence_score,
+                        "success": True,
+                        "error": None,
+                    }
+                )
+            else:
+                self.console.print(f"[yellow]  ⚠ {neighborhood_name}: {error}[/yellow]")
+                results.append(
+                    {
+                        "neighborhood": neighborhood_name,
+                        "grade": None,
+                        "confidence": None,
+                        "success": False,
+                        "error": error,
+                    }
+                )
+
+        job.complete()
+        return results, total_cost
+
+    def _display_grade_extraction_results(
+        self, total_processed: int, results: List[Dict[str, Any]], total_cost: float
+    ) -> Dict[str, Any]:
+        successes = sum(1 for result in results if result["success"])
+        failures = len(results) - successes
+
         # Display batch summary
         self.console.print("\n[bold green]Batch Processing Summary:[/bold green]")
 
@@ -1584,7 +1639,7 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
 
         # Display statistics
         stats_panel = Panel(
-            f"[green]Total Processed: {len(reports)}[/green]\n"
+            f"[green]Total Processed: {total_processed}[/green]\n"
             f"[green]Successful: {successes}[/green]\n"
             f"[red]Failed: {failures}[/red]\n"
             f"[cyan]Total API Cost: ${total_cost:.4f}[/cyan]",
@@ -1594,7 +1649,7 @@ Provide only the letter grade (A, B, C, D, or F) without any additional text.
         self.console.print(stats_panel)
 
         return {
-            "total_processed": len(reports),
+            "total_processed": total_processed,
             "successful": successes,
             "failed": failures,
             "total_cost": total_cost,
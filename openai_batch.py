@@ -0,0 +1,297 @@
+"""
+OpenAI Batch API support for bulk, non-urgent model calls.
+
+Backfills that extract estimates or grades from hundreds of reports don't need answers
+in seconds. Submitting them as one batch job runs them at half the token price, with no
+per-minute rate limit, at the cost of waiting (usually minutes, at most 24h) for results.
+
+BatchJob writes the requests as JSONL, uploads and submits them, polls until the job
+finishes and parses each response back into {custom_id: BatchResult}. The submitted
+batch id stays journaled until the caller has stored the results and calls complete(),
+so re-running a backfill that was interrupted anywhere before that - while waiting, or
+while writing results - picks the same job back up instead of paying for it twice.
+LocalBatchClient answers batches in-process for tests and dry runs.
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+
+from api_ledger import openai_cost, record
+from batch_runner import RunJournal
+from response_cache import CACHE_DIR
+
+BATCH_DIR = os.path.join(CACHE_DIR, "batches")
+BATCH_PRICE_MULTIPLIER = 0.5  # Batch API tokens cost half the synchronous price
+BATCH_POLL_SECONDS = float(os.getenv("OPENAI_BATCH_POLL_SECONDS", "30"))
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# Backfills default to the Batch API when this is set (interactive ones still ask)
+BATCH_MODE_ENABLED = os.getenv("OPENAI_BATCH_MODE", "").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class BatchResult:
+    """One request's outcome: parsed JSON content (structured outputs) or raw text"""
+
+    custom_id: str
+    success: bool
+    content: Optional[str] = None
+    parsed: Optional[Dict[str, Any]] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    error: Optional[str] = None
+
+
+def response_format_for(model_cls) -> Dict[str, Any]:
+    """Strict json_schema response_format for a Pydantic model (what .parse() sends)"""
+    schema = model_cls.model_json_schema()
+    schema["additionalProperties"] = False
+    schema["required"] = list(schema.get("properties", {}).keys())
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model_cls.__name__, "schema": schema, "strict": True},
+    }
+
+
+def chat_request(
+    custom_id: str,
+    model: str,
+    prompt: str,
+    max_completion_tokens: int,
+    response_format_model=None,
+) -> Dict[str, Any]:
+    """One JSONL line of a /v1/chat/completions batch"""
+    body = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_completion_tokens": max_completion_tokens,
+    }
+    if response_format_model is not None:
+        body["response_format"] = response_format_for(response_format_model)
+    return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+
+
+def parse_output_line(line: Dict[str, Any], structured: bool) -> BatchResult:
+    custom_id = line.get("custom_id", "")
+    if line.get("error"):
+        return BatchResult(custom_id, False, error=str(line["error"].get("message", line["error"])))
+
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code") != 200:
+        message = (body.get("error") or {}).get("message", f"HTTP {response.get('status_code')}")
+        return BatchResult(custom_id, False, error=f"API call failed: {message}")
+
+    usage = body.get("usage") or {}
+    input_tokens = usage.get("prompt_tokens", 0)
+    output_tokens = usage.get("completion_tokens", 0)
+    message = body["choices"][0]["message"]
+
+    if message.get("refusal"):
+        return BatchResult(custom_id, False, input_tokens=input_tokens, output_tokens=output_tokens,
+                           error=f"Model refused: {message['refusal']}")
+
+    content = message.get("content")
+    parsed = None
+    if structured:
+        try:
+            parsed = json.loads(content or "")
+        except json.JSONDecodeError:
+            return BatchResult(custom_id, False, content=content, input_tokens=input_tokens,
+                               output_tokens=output_tokens, error="Failed to parse structured response")
+    return BatchResult(custom_id, True, content=content, parsed=parsed,
+                       input_tokens=input_tokens, output_tokens=output_tokens)
+
+
+class BatchJob:
+    def __init__(self, client, console: Console, name: str, poll_seconds: float = BATCH_POLL_SECONDS):
+        """
+        Args:
+            client: openai.OpenAI (or LocalBatchClient)
+            name: Stable job name, e.g. "neighborhood_grades" - used to resume an interrupted run
+        """
+        self.client = client
+        self.console = console
+        self.name = name
+        self.poll_seconds = poll_seconds
+        self.journal = RunJournal(f"openai_batch_{name}")
+
+    def run(self, requests: List[Dict[str, Any]], structured: bool = True) -> Dict[str, BatchResult]:
+        """
+        Submit (or resume) the batch, wait for it and return results by custom_id.
+        Call complete() once the results are stored.
+        """
+        if not requests:
+            return {}
+
+        requests_hash = hashlib.sha256(
+            json.dumps(sorted(request["custom_id"] for request in requests)).encode("utf-8")
+        ).hexdigest()
+        entry = self.journal.entries.get(self.name)
+        if entry and entry["data"]["requests_hash"] == requests_hash:
+            batch_id = entry["data"]["batch_id"]
+            self.console.print(f"[cyan]↻ Resuming OpenAI batch {batch_id} ({len(requests)} requests)[/cyan]")
+        else:
+            batch_id = self._submit(requests)
+            self.journal.record(self.name, "submitted", {"batch_id": batch_id, "requests_hash": requests_hash})
+
+        started = time.monotonic()
+        batch = self._wait(batch_id)
+        results = self._collect(batch, structured)
+        if batch.status != "completed":
+            # Failed, expired or cancelled - nothing more will come of this job, so a
+            # re-run should submit it again
+            self.complete()
+
+        # A job resumed after its results were already collected was logged back then.
+        # Latency is the batch turnaround, so these never skew the synchronous percentiles
+        already_logged = entry is not None and entry["status"] == "collected" and entry["data"]["batch_id"] == batch_id
+        if not already_logged:
+            models = {request["custom_id"]: request["body"]["model"] for request in requests}
+            for custom_id, result in results.items():
+                model = models.get(custom_id)
+                record(
+                    "openai",
+                    "batch.chat.completions",
+                    latency_seconds=time.monotonic() - started,
+                    cost=openai_cost(model, result.input_tokens, result.output_tokens, BATCH_PRICE_MULTIPLIER),
+                    input_tokens=result.input_tokens,
+                    output_tokens=result.output_tokens,
+                    outcome="ok" if result.success else "error",
+                    model=model,
+                )
+        if batch.status == "completed" and not already_logged:
+            self.journal.record(self.name, "collected", {"batch_id": batch_id, "requests_hash": requests_hash})
+
+        missing = [request["custom_id"] for request in requests if request["custom_id"] not in results]
+        for custom_id in missing:
+            results[custom_id] = BatchResult(custom_id, False, error=f"No result (batch {batch.status})")
+        return results
+
+    def complete(self):
+        """The caller has stored the results - the next run submits fresh work"""
+        self.journal.clear()
+
+    def _submit(self, requests: List[Dict[str, Any]]) -> str:
+        os.makedirs(BATCH_DIR, exist_ok=True)
+        path = os.path.join(BATCH_DIR, f"{self.name}_{int(time.time())}.jsonl")
+        with open(path, "w") as f:
+            for request in requests:
+                f.write(json.dumps(request) + "\n")
+
+        with open(path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"job": self.name},
+        )
+        self.console.print(
+            f"[cyan]📤 Submitted OpenAI batch {batch.id} with {len(requests)} requests ({path})[/cyan]"
+        )
+        return batch.id
+
+    def _wait(self, batch_id: str):
+        started = time.monotonic()
+        with self.console.status(f"[cyan]Waiting for OpenAI batch {batch_id}...[/cyan]") as status:
+            while True:
+                batch = self.client.batches.retrieve(batch_id)
+                if batch.status in BATCH_TERMINAL_STATUSES:
+                    break
+                counts = batch.request_counts
+                done = (counts.completed + counts.failed) if counts else 0
+                total = counts.total if counts else 0
+                status.update(
+                    f"[cyan]OpenAI batch {batch_id}: {batch.status} {done}/{total} "
+                    f"({(time.monotonic() - started) / 60:.0f} min)[/cyan]"
+                )
+                time.sleep(self.poll_seconds)
+
+        style = "green" if batch.status == "completed" else "red"
+        self.console.print(f"[{style}]OpenAI batch {batch_id} {batch.status}[/{style}]")
+        return batch
+
+    def _collect(self, batch, structured: bool) -> Dict[str, BatchResult]:
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for raw_line in self.client.files.content(file_id).text.splitlines():
+                if raw_line.strip():
+                    result = parse_output_line(json.loads(raw_line), structured)
+                    results[result.custom_id] = result
+        return results
+
+
+class LocalBatchClient:
+    """
+    In-process stand-in for the files/batches endpoints of openai.OpenAI.
+
+    respond(body) receives each request body and returns the assistant message content
+    (a JSON string for structured outputs); raising marks that request as failed. Every
+    batch completes on its first retrieve.
+    """
+
+    def __init__(self, respond: Callable[[Dict[str, Any]], str]):
+        self.respond = respond
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, SimpleNamespace] = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file, purpose: str):
+        data = file.read()
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self._files[file_id] = data.decode("utf-8") if isinstance(data, bytes) else data
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def _file_content(self, file_id: str):
+        return SimpleNamespace(text=self._files[file_id])
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str, metadata=None):
+        output, errors = [], []
+        for raw_line in self._files[input_file_id].splitlines():
+            request = json.loads(raw_line)
+            try:
+                content = self.respond(request["body"])
+                prompt_tokens = len(request["body"]["messages"][0]["content"]) // 4
+                output.append({
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": {
+                        "choices": [{"message": {"role": "assistant", "content": content, "refusal": None}}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4},
+                    }},
+                    "error": None,
+                })
+            except Exception as e:
+                errors.append({"custom_id": request["custom_id"], "response": None,
+                               "error": {"message": str(e)}})
+
+        output_file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self._files[output_file_id] = "\n".join(json.dumps(line) for line in output)
+        error_file_id = None
+        if errors:
+            error_file_id = f"file-{uuid.uuid4().hex[:12]}"
+            self._files[error_file_id] = "\n".join(json.dumps(line) for line in errors)
+
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        total = len(output) + len(errors)
+        self._batches[batch_id] = SimpleNamespace(
+            id=batch_id,
+            status="completed",
+            output_file_id=output_file_id,
+            error_file_id=error_file_id,
+            request_counts=SimpleNamespace(total=total, completed=len(output), failed=len(errors)),
+            metadata=metadata,
+        )
+        return self._batches[batch_id]
+
+    def _retrieve_batch(self, batch_id: str):
+        return self._batches[batch_id]
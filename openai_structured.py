@@ -0,0 +1,249 @@
+"""
+Rate-limit-aware client for OpenAI structured outputs.
+
+Estimate and grade extraction used to call beta.chat.completions.parse synchronously
+with no retries, so one 429 or 5xx during a bulk run became a failed property. Every
+structured call now goes through StructuredOutputClient, which:
+
+- keeps requests and tokens inside per-minute budgets, starting from OPENAI_RPM_LIMIT
+  and OPENAI_TPM_LIMIT and then following the x-ratelimit-limit-* headers OpenAI
+  returns for the account
+- retries 429s, 5xx and connection errors with jittered exponential backoff, waiting
+  at least as long as the retry-after header asks
+- runs calls concurrently on one event loop, halving concurrency on a 429 and
+  growing it back by one after a run of successes (up to OPENAI_MAX_CONCURRENCY)
+
+parse() is synchronous and safe to call from any thread, so it drops into the existing
+helpers; parse_many() runs a whole list of extractions concurrently. All callers share
+one client (get_structured_client), so their budgets add up correctly.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from api_ledger import track
+from context_packing import estimate_tokens
+
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+BUDGET_WINDOW_SECONDS = 60.0
+
+
+class RateBudget:
+    """Sliding one-minute window of requests and tokens"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._window = deque()  # (timestamp, tokens)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._window and now - self._window[0][0] >= BUDGET_WINDOW_SECONDS:
+                    self._window.popleft()
+                used_tokens = sum(entry[1] for entry in self._window)
+                # A request larger than the whole budget still goes through, alone
+                if not self._window or (len(self._window) < self.rpm and used_tokens + tokens <= self.tpm):
+                    self._window.append((now, tokens))
+                    return
+                await asyncio.sleep(max(0.05, BUDGET_WINDOW_SECONDS - (now - self._window[0][0])))
+
+    def observe_headers(self, headers):
+        """Adopt the account limits OpenAI reports (the configured ones are only a starting guess)"""
+        for header, attribute in (("x-ratelimit-limit-requests", "rpm"), ("x-ratelimit-limit-tokens", "tpm")):
+            try:
+                limit = int(headers.get(header))
+            except (TypeError, ValueError):
+                continue
+            setattr(self, attribute, limit)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit that halves on a 429 and grows by one after `limit` successes in a row"""
+
+    def __init__(self, maximum: int):
+        self.maximum = max(1, maximum)
+        self.limit = self.maximum
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def rate_limited(self):
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+
+    def succeeded(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    if not headers:
+        return None
+    for header, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        try:
+            return float(headers.get(header)) / scale
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def backoff_seconds(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's retry-after"""
+    delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+class StructuredOutputClient:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        rpm: int = OPENAI_RPM_LIMIT,
+        tpm: int = OPENAI_TPM_LIMIT,
+        max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+        max_retries: int = OPENAI_MAX_RETRIES,
+    ):
+        import openai
+
+        self._openai = openai
+        # Retries are ours (they have to see the budgets), so the SDK's own are off
+        self.client = openai.AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.max_retries = max_retries
+        self._rpm, self._tpm, self._max_concurrency = rpm, tpm, max_concurrency
+
+        # One event loop on a daemon thread serves every caller, whatever thread it is on
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        threading.Thread(target=self._run_loop, name="openai-structured", daemon=True).start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        # Budgets use asyncio primitives, which belong to this loop
+        self.budget = RateBudget(self._rpm, self._tpm)
+        self.concurrency = AdaptiveConcurrency(self._max_concurrency)
+        self._ready.set()
+        self._loop.run_forever()
+
+    def _retryable(self, error: Exception) -> bool:
+        openai = self._openai
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+    async def parse_async(
+        self, model: str, prompt: str, response_format, max_completion_tokens: int = 4000
+    ) -> Dict[str, Any]:
+        """
+        One structured-output call with budgeting and retries.
+
+        Returns:
+            Dict with parsed (response_format instance or None), input_tokens,
+            output_tokens, success, error and attempts
+        """
+        tokens = estimate_tokens(prompt) + max_completion_tokens  # What OpenAI counts against TPM
+        error = None
+        for attempt in range(self.max_retries):
+            await self.budget.acquire(tokens)
+            try:
+                async with self.concurrency:
+                    with track("openai", "chat.completions.parse", model) as call:
+                        raw = await self.client.beta.chat.completions.with_raw_response.parse(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            response_format=response_format,
+                            max_completion_tokens=max_completion_tokens,
+                        )
+                        response = raw.parse()
+                        call["input_tokens"] = response.usage.prompt_tokens
+                        call["output_tokens"] = response.usage.completion_tokens
+            except Exception as e:
+                error = e
+                if not self._retryable(e) or attempt == self.max_retries - 1:
+                    break
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                if isinstance(e, self._openai.RateLimitError):
+                    self.concurrency.rate_limited()
+                    if headers:
+                        self.budget.observe_headers(headers)
+                await asyncio.sleep(backoff_seconds(attempt, _retry_after_seconds(headers)))
+                continue
+
+            self.concurrency.succeeded()
+            self.budget.observe_headers(raw.headers)
+            message = response.choices[0].message
+            result = {
+                "parsed": message.parsed,
+                "input_tokens": response.usage.prompt_tokens,
+                "output_tokens": response.usage.completion_tokens,
+                "success": message.parsed is not None and not message.refusal,
+                "error": None,
+                "attempts": attempt + 1,
+            }
+            if message.refusal:
+                result["error"] = f"Model refused: {message.refusal}"
+            elif message.parsed is None:
+                result["error"] = "Failed to parse structured response"
+            return result
+
+        return {
+            "parsed": None,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "success": False,
+            "error": f"API call failed: {type(error).__name__}: {str(error)}",
+            "attempts": attempt + 1,
+        }
+
+    def parse(self, model: str, prompt: str, response_format, max_completion_tokens: int = 4000) -> Dict[str, Any]:
+        """Blocking parse_async() for synchronous callers"""
+        return asyncio.run_coroutine_threadsafe(
+            self.parse_async(model, prompt, response_format, max_completion_tokens), self._loop
+        ).result()
+
+    def parse_many(
+        self, model: str, prompts: List[str], response_format, max_completion_tokens: int = 4000
+    ) -> List[Dict[str, Any]]:
+        """parse() every prompt concurrently; results are in prompt order"""
+        async def run_all():
+            return await asyncio.gather(*(
+                self.parse_async(model, prompt, response_format, max_completion_tokens) for prompt in prompts
+            ))
+
+        return asyncio.run_coroutine_threadsafe(run_all(), self._loop).result()
+
+
+_client: Optional[StructuredOutputClient] = None
+_client_lock = threading.Lock()
+
+
+def get_structured_client() -> StructuredOutputClient:
+    """The process-wide client (created on first use)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = StructuredOutputClient()
+        return _client
@@ -0,0 +1,211 @@
+"""
+Spatial cache of Google Places results, keyed by geohash cell and POI type.
+
+Every property used to send its own 5-mile searchNearby request per POI type, even
+when the last property added was two streets away. Instead, the map is divided into
+fixed geohash cells and each (cell, POI type) is searched once, with the smallest
+circle that covers the cell. Only the places that fall inside the cell are stored, so
+cells never overlap and no area is paid for twice. A property gathers the cells that
+come within its radius (geo.geohash_cells_within) and computes distances/counts
+locally with vectorized haversine (geo.haversine_miles); only cells nobody has
+searched yet cost a Places call.
+
+searchNearby returns at most 20 places per request, so a cell is what bounds how many
+places of one type can be seen: a property's count is the sum over its cells rather
+than one 20-place search. A cell whose search comes back full is logged, since it may
+hold more places than were returned.
+
+Cells honour PROPDEALS_CACHE_MODE like the other caches (see response_cache.py).
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from api_ledger import record_cache_hit
+from geo import bounds_half_diagonal_miles, geohash_bounds, geohash_cells_within, geohash_center, geohash_encode
+from response_cache import CACHE_DB_PATH, CACHE_MODE, DAY_SECONDS, CacheMissError
+
+# Precision 5 cells are ~3.7km x 4.9km in Des Moines: about 20 fall within 5 miles of a property
+POI_CELL_PRECISION = int(os.getenv("POI_CELL_PRECISION", "5"))
+POI_CELL_TTL_SECONDS = 180 * DAY_SECONDS
+
+
+class PoiCellCache:
+    def __init__(self, db_path: str = CACHE_DB_PATH, mode: str = CACHE_MODE, precision: int = POI_CELL_PRECISION):
+        self.db_path = db_path
+        self.mode = mode
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self.searches = 0  # searchNearby requests made to fill the misses
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            # Tiles searched over their radius-grown bounds overlapped; their places can't be reused as cells
+            conn.execute("DROP TABLE IF EXISTS poi_tiles")
+            conn.execute("DROP TABLE IF EXISTS pois")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS poi_cells (
+                    cell TEXT NOT NULL,
+                    poi_type TEXT NOT NULL,
+                    searched_at REAL NOT NULL,
+                    PRIMARY KEY (cell, poi_type)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS poi_cell_places (
+                    cell TEXT NOT NULL,
+                    poi_type TEXT NOT NULL,
+                    lat REAL NOT NULL,
+                    lon REAL NOT NULL,
+                    user_rating_count INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS poi_cell_places_cell_type ON poi_cell_places (cell, poi_type)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def cell_for(self, lat: float, lon: float) -> str:
+        return geohash_encode(lat, lon, self.precision)
+
+    def cells_within(self, lat: float, lon: float, radius_miles: float):
+        """Cells that come within radius_miles of a point, nearest first"""
+        return [cell for cell, _ in geohash_cells_within(lat, lon, radius_miles, self.precision)]
+
+    def search_circle(self, cell: str):
+        """(center_lat, center_lon, radius_miles) of the smallest circle that covers the cell"""
+        center_lat, center_lon = geohash_center(cell)
+        return center_lat, center_lon, bounds_half_diagonal_miles(*geohash_bounds(cell))
+
+    def _load(self, cell: str, poi_type: str):
+        """(searched_at, lats, lons, user_rating_counts) for a cell, or None if never searched"""
+        key = (cell, poi_type)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                conn = self._connect()
+                try:
+                    coverage = conn.execute(
+                        "SELECT searched_at FROM poi_cells WHERE cell = ? AND poi_type = ?",
+                        key,
+                    ).fetchone()
+                    rows = conn.execute(
+                        "SELECT lat, lon, user_rating_count FROM poi_cell_places WHERE cell = ? AND poi_type = ?",
+                        key,
+                    ).fetchall() if coverage else []
+                finally:
+                    conn.close()
+                if coverage:
+                    data = np.array(rows, dtype=float).reshape(-1, 3)
+                    entry = (coverage[0], data[:, 0], data[:, 1], data[:, 2])
+                    self._memory[key] = entry
+        return entry
+
+    def get_places(self, cell: str, poi_type: str):
+        """
+        Cached POIs for a cell.
+
+        Returns:
+            (lats, lons, user_rating_counts) NumPy arrays, or None if the cell hasn't been
+            searched for this POI type (or its search has expired)
+        """
+        if self.mode == "off":
+            return None
+
+        entry = self._load(cell, poi_type)
+        if entry is not None and (self.mode == "offline" or time.time() - entry[0] <= POI_CELL_TTL_SECONDS):
+            self.hits += 1
+            record_cache_hit("google", "places:searchNearby")
+            return entry[1], entry[2], entry[3]
+
+        self.misses += 1
+        if self.mode in ("offline", "replay"):
+            raise CacheMissError(f"No cached {poi_type} POIs for cell {cell}")
+        return None
+
+    def set_places(self, cell: str, poi_type: str, places):
+        """
+        Store the places returned by a cell's search (Places API (New) format). The search
+        circle reaches into the neighbouring cells; only places inside this cell are kept.
+
+        Returns:
+            (lats, lons, user_rating_counts) NumPy arrays, as get_places would
+        """
+        rows = []
+        for place in places:
+            location = place.get('location', {})
+            lat, lon = location.get('latitude'), location.get('longitude')
+            if lat is None or lon is None or self.cell_for(lat, lon) != cell:
+                continue
+            rows.append((lat, lon, place.get('userRatingCount', 0)))
+
+        searched_at = time.time()
+        data = np.array(rows, dtype=float).reshape(-1, 3)
+        with self._lock:
+            self.searches += 1
+            self._memory[(cell, poi_type)] = (searched_at, data[:, 0], data[:, 1], data[:, 2])
+            if self.mode == "off":
+                return data[:, 0], data[:, 1], data[:, 2]
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM poi_cell_places WHERE cell = ? AND poi_type = ?", (cell, poi_type))
+                conn.executemany(
+                    "INSERT INTO poi_cell_places (cell, poi_type, lat, lon, user_rating_count) VALUES (?, ?, ?, ?, ?)",
+                    [(cell, poi_type, lat, lon, int(count)) for lat, lon, count in rows],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO poi_cells (cell, poi_type, searched_at) VALUES (?, ?, ?)",
+                    (cell, poi_type, searched_at),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        return data[:, 0], data[:, 1], data[:, 2]
+
+    def covered_cells(self, poi_types):
+        """Cells that have been searched for every one of poi_types"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT cell, poi_type FROM poi_cells").fetchall()
+        finally:
+            conn.close()
+
+        types_by_cell = {}
+        for cell, poi_type in rows:
+            types_by_cell.setdefault(cell, set()).add(poi_type)
+        return {cell for cell, types in types_by_cell.items() if set(poi_types) <= types}
+
+    def get_all_places(self, poi_type: str):
+        """
+        Every stored place of a POI type, without counting hits or checking freshness - for
+        batch recomputes over covered_cells(). Cells don't overlap, so no place repeats.
+
+        Returns:
+            (lats, lons, user_rating_counts) NumPy arrays
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT lat, lon, user_rating_count FROM poi_cell_places WHERE poi_type = ?", (poi_type,)
+            ).fetchall()
+        finally:
+            conn.close()
+        data = np.array(rows, dtype=float).reshape(-1, 3)
+        return data[:, 0], data[:, 1], data[:, 2]
+
+
+poi_cache = PoiCellCache()
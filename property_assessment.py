@@ -5,12 +5,12 @@ from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Any, Dict, Optional
 
-import openai
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from supabase import Client
 
+from api_ledger import openai_cost, track
 from editor import edit_multiline_text
 
 
@@ -479,8 +479,6 @@ class RiskAssessmentConfig:
 
     reasoning_model: str = "gpt-5.1"
     max_tokens: int = 120000
-    reasoning_cost_per_input_token: float = 1.25 / 1000000
-    reasoning_cost_per_output_token: float = 10 / 1000000
 
 
 class RiskAssessmentClient:
@@ -495,13 +493,12 @@ class RiskAssessmentClient:
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
+        import openai
         self.openai_client = openai.OpenAI(api_key=openai_api_key)
 
     def _calculate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
-        """Calculate the total cost of LLM reasoning"""
-        input_cost = input_tokens * self.config.reasoning_cost_per_input_token
-        output_cost = output_tokens * self.config.reasoning_cost_per_output_token
-        total_cost = input_cost + output_cost
+        """Calculate the total cost of LLM reasoning (priced like the API ledger records it)"""
+        total_cost = openai_cost(self.config.reasoning_model, input_tokens, output_tokens)
         return Decimal(str(total_cost)).quantize(Decimal("0.0001"))
 
     def _sanitize_content(self, content: str) -> str:
@@ -1154,11 +1151,14 @@ Generate a concise **House Hacking Risk Assessment Report** with these 4 section
             ) as progress:
                 progress.add_task("analyze", total=None)
 
-                response = self.openai_client.chat.completions.create(
-                    model=self.config.reasoning_model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_completion_tokens=self.config.max_tokens,
-                )
+                with track("openai", "chat.completions", self.config.reasoning_model) as call:
+                    response = self.openai_client.chat.completions.create(
+                        model=self.config.reasoning_model,
+                        messages=[{"role": "user", "content": prompt}],
+                        max_completion_tokens=self.config.max_tokens,
+                    )
+                    call["input_tokens"] = response.usage.prompt_tokens
+                    call["output_tokens"] = response.usage.completion_tokens
 
             report_content = response.choices[0].message.content
             input_tokens = response.usage.prompt_tokens
@@ -0,0 +1,45 @@
+import pandas as pd
+
+
+class PropertyStore:
+    """
+    Address-indexed view over the enriched properties dataframe and its rent estimates.
+
+    Single-property lookups (analyze_property, property summary, the API detail route)
+    used to boolean-scan the full dataframe on every call. The store indexes the
+    properties by address1 once per reload and pre-slices rent_estimates per address,
+    so each lookup is a hash probe instead of an O(n) scan.
+    """
+
+    def __init__(self, df: pd.DataFrame, rents: pd.DataFrame = None):
+        indexed = df.set_index("address1", drop=False)
+        # address1 is unique in the database, but a stale join can repeat a row - keep the
+        # first one, as the old boolean scan's .iloc[0] did, so lookups always return a Series
+        duplicated = indexed.index.duplicated(keep="first")
+        self.duplicate_addresses = sorted(set(indexed.index[duplicated]))
+        self.df = indexed[~duplicated]
+        if self.duplicate_addresses:
+            print(f"⚠️ Duplicate address1 rows, keeping the first of each: {', '.join(self.duplicate_addresses)}")
+        self.rents = rents if rents is not None else pd.DataFrame(columns=["address1"])
+        self.rents_by_address = {
+            address1: units for address1, units in self.rents.groupby("address1", sort=False)
+        }
+
+    def __contains__(self, address1) -> bool:
+        return address1 in self.df.index
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def get_row(self, address1):
+        """Return the enriched row for a property as a Series, or None if it isn't loaded"""
+        if address1 not in self.df.index:
+            return None
+        return self.df.loc[address1]
+
+    def get_rents(self, address1) -> pd.DataFrame:
+        """Return the rent_estimates rows for a property (empty frame if none exist)"""
+        units = self.rents_by_address.get(address1)
+        if units is None:
+            return self.rents.iloc[0:0]
+        return units
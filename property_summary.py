@@ -4,13 +4,15 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, Optional
 
-import openai
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from supabase import Client
 
+from api_ledger import openai_cost
 from property_assessment import FIELD_CONFIG
+from reasoning_stream import stream_completion
+from report_memo import find_memoized_report, hash_columns, prompt_hash, reuse_memoized_report
 
 
 @dataclass
@@ -19,8 +21,6 @@ class PropertySummaryConfig:
 
     reasoning_model: str = "gpt-5.1"
     max_tokens: int = 16000  # Much shorter than risk assessment
-    reasoning_cost_per_input_token: float = 1.25 / 1000000
-    reasoning_cost_per_output_token: float = 10 / 1000000
 
 
 class PropertySummaryClient:
@@ -35,13 +35,12 @@ class PropertySummaryClient:
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
+        import openai
         self.openai_client = openai.OpenAI(api_key=openai_api_key)
 
     def _calculate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
-        """Calculate the total cost of LLM reasoning"""
-        input_cost = input_tokens * self.config.reasoning_cost_per_input_token
-        output_cost = output_tokens * self.config.reasoning_cost_per_output_token
-        total_cost = input_cost + output_cost
+        """Calculate the total cost of LLM reasoning (priced like the API ledger records it)"""
+        total_cost = openai_cost(self.config.reasoning_model, input_tokens, output_tokens)
         return Decimal(str(total_cost)).quantize(Decimal("0.0001"))
 
     def _sanitize_content(self, content: str) -> str:
@@ -60,6 +59,17 @@ class PropertySummaryClient:
 
         return sanitized
 
+    def _analyze_with_reasoning_model(self, prompt: str, property_id: str) -> Dict[str, Any]:
+        """Stream the summary from the reasoning model (see reasoning_stream)"""
+        return stream_completion(
+            self.openai_client,
+            self.console,
+            self.config.reasoning_model,
+            prompt,
+            self.config.max_tokens,
+            checkpoint_name=f"summary_{property_id}",
+        )
+
     def _get_neighborhood_summary(self, property_data: Dict[str, Any]) -> str:
         """Fetch neighborhood grade and brief summary"""
         neighborhood = property_data.get("neighborhood")
@@ -422,25 +432,24 @@ Output ONLY the 4-section narrative. No preamble, no "here's the summary" - just
                 self.console.print(Panel(prompt, title="Property Summary Prompt (Review Before Generation)", border_style="cyan", padding=(1, 2)))
             self.console.print("\n")
 
+            # An identical prompt was already answered - offer that summary instead of paying again
+            report_hash = prompt_hash(
+                self._sanitize_content(prompt), self.config.reasoning_model, max_tokens=self.config.max_tokens
+            )
+            existing = find_memoized_report(self.supabase, report_hash, "property_narrative_summary", self.console)
+            if reuse_memoized_report(existing, self.console, interactive=True):
+                return existing["id"]
+
             # Generate summary with LLM
             self.console.print("[cyan]Generating property summary (this may take 15-30 seconds)...[/cyan]")
+            result = self._analyze_with_reasoning_model(prompt, property_id)
+            if not result["success"]:
+                self.console.print(f"[red]Summary generation failed: {result['error']}[/red]")
+                return None
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[cyan]Analyzing property with AI..."),
-                console=self.console,
-            ) as progress:
-                progress.add_task("analyze", total=None)
-
-                response = self.openai_client.chat.completions.create(
-                    model=self.config.reasoning_model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_completion_tokens=self.config.max_tokens,
-                )
-
-            report_content = response.choices[0].message.content
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
+            report_content = result["content"]
+            input_tokens = result["input_tokens"]
+            output_tokens = result["output_tokens"]
 
             # Calculate cost
             cost = self._calculate_cost(input_tokens, output_tokens)
@@ -453,7 +462,7 @@ Output ONLY the 4-section narrative. No preamble, no "here's the summary" - just
             sanitized_content = self._sanitize_content(report_content)
             sanitized_prompt = self._sanitize_content(prompt)
 
-            result = self.supabase.table("research_reports").insert({
+            insert_result = self.supabase.table("research_reports").insert({
                 "property_id": property_id,
                 "report_content": sanitized_content,
                 "prompt_used": sanitized_prompt,
@@ -461,10 +470,11 @@ Output ONLY the 4-section narrative. No preamble, no "here's the summary" - just
                 "api_cost": float(cost),
                 "research_type": "property_narrative_summary",
                 "created_at": datetime.now(timezone.utc).isoformat(),
+                **hash_columns(self.supabase, report_hash),
             }).execute()
 
-            if result.data and len(result.data) > 0:
-                report_id = result.data[0]["id"]
+            if insert_result.data and len(insert_result.data) > 0:
+                report_id = insert_result.data[0]["id"]
                 self.console.print(f"[green]✓ Summary saved successfully (ID: {report_id})[/green]\n")
                 return report_id
             else:
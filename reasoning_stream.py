@@ -0,0 +1,179 @@
+"""
+Streaming reasoning-model completions.
+
+Long reports (up to 120k completion tokens) used to arrive in one blocking call behind
+a spinner, and a failure near the end threw the whole answer away. stream_completion()
+streams the response instead: the tail of the report renders live in the console,
+every chunk is checkpointed to a local file (kept if the stream fails, deleted once it
+completes), and time-to-first-token and tokens/second are measured for each call.
+"""
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.text import Text
+
+from api_ledger import openai_cost, record
+from response_cache import CACHE_DIR
+
+STREAM_CHECKPOINT_DIR = os.path.join(CACHE_DIR, "streams")
+STREAM_PREVIEW_LINES = 18  # Lines of the report shown while it streams
+STREAM_PREVIEW_MAX_CHARS = 4000  # Tail kept for the preview, so long lines can't grow it unbounded
+PREVIEW_REFRESH_PER_SECOND = 4
+CHECKPOINT_INTERVAL_SECONDS = 1.0
+
+
+def _checkpoint_path(name: str) -> str:
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "completion"
+    return os.path.join(STREAM_CHECKPOINT_DIR, f"{safe_name}_{int(time.time())}.md")
+
+
+def _trim_tail(tail: str) -> str:
+    """The last STREAM_PREVIEW_LINES lines of tail, at most STREAM_PREVIEW_MAX_CHARS long"""
+    lines = tail.split("\n")
+    if len(lines) > STREAM_PREVIEW_LINES:
+        tail = "\n".join(lines[-STREAM_PREVIEW_LINES:])
+    return tail[-STREAM_PREVIEW_MAX_CHARS:]
+
+
+def _preview(tail: str, model: str, started: float, first_token_at: Optional[float], chunks: int):
+    elapsed = time.monotonic() - started
+    if first_token_at is None:
+        status = Text(f"⏳ {model} is reasoning... {elapsed:.0f}s", style="cyan")
+        return Panel(status, border_style="cyan")
+
+    status = Text(
+        f"✍️  {model} streaming - {chunks:,} chunks, first token after {first_token_at - started:.1f}s, {elapsed:.0f}s elapsed",
+        style="cyan",
+    )
+    return Panel(Group(status, Markdown(tail)), border_style="cyan")
+
+
+def stream_completion(
+    openai_client,
+    console: Console,
+    model: str,
+    prompt: str,
+    max_completion_tokens: int,
+    checkpoint_name: str = "completion",
+    **create_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Stream a chat completion, rendering and checkpointing it as it arrives.
+
+    Args:
+        checkpoint_name: Prefix of the checkpoint file (e.g. the property address)
+        create_kwargs: Extra chat.completions.create arguments (e.g. reasoning_effort)
+
+    Returns:
+        Same shape as the modules' _analyze_with_reasoning_model (content, input_tokens,
+        output_tokens, success, error) plus ttft_seconds, tokens_per_second,
+        elapsed_seconds and, on failure, partial_content and checkpoint_path
+    """
+    os.makedirs(STREAM_CHECKPOINT_DIR, exist_ok=True)
+    checkpoint_path = _checkpoint_path(checkpoint_name)
+    parts = []
+    tail = ""  # Rolling end of the report for the preview, trimmed on each render
+    chunks = 0
+    usage = None
+    started = time.monotonic()
+    first_token_at = None
+    last_checkpoint = started
+    last_render = started
+
+    try:
+        with open(checkpoint_path, "w") as checkpoint, Live(
+            _preview("", model, started, None, 0), console=console, refresh_per_second=PREVIEW_REFRESH_PER_SECOND, transient=True
+        ) as live:
+            stream = openai_client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_completion_tokens=max_completion_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                **create_kwargs,
+            )
+            for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage  # Sent in the final chunk, which has no choices
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+
+                now = time.monotonic()
+                if first_token_at is None:
+                    first_token_at = now
+                parts.append(delta)
+                tail += delta
+                chunks += 1
+                checkpoint.write(delta)
+                if now - last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS:
+                    checkpoint.flush()
+                    last_checkpoint = now
+                # Rebuild the preview no more often than Live redraws it; the first chunk
+                # renders straight away so the status flips from "reasoning" to "streaming"
+                if chunks == 1 or now - last_render >= 1 / PREVIEW_REFRESH_PER_SECOND:
+                    tail = _trim_tail(tail)
+                    live.update(_preview(tail, model, started, first_token_at, chunks))
+                    last_render = now
+
+    except Exception as e:
+        partial = "".join(parts)
+        record("openai", "chat.completions.stream", latency_seconds=time.monotonic() - started,
+               outcome=type(e).__name__, model=model)
+        return {
+            "content": None,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "success": False,
+            "error": f"{str(e)} (partial output: {len(partial):,} chars saved to {checkpoint_path})",
+            "partial_content": partial,
+            "checkpoint_path": checkpoint_path,
+            "ttft_seconds": (first_token_at - started) if first_token_at else None,
+            "tokens_per_second": None,
+            "elapsed_seconds": time.monotonic() - started,
+        }
+
+    finished_at = time.monotonic()
+    content = "".join(parts)
+    input_tokens = usage.prompt_tokens if usage else 0
+    output_tokens = usage.completion_tokens if usage else 0
+    # Reasoning tokens are billed as output but never streamed, so the rate is measured
+    # over the whole call rather than just the visible part
+    tokens_per_second = output_tokens / (finished_at - started) if finished_at > started else None
+
+    os.remove(checkpoint_path)
+    record(
+        "openai",
+        "chat.completions.stream",
+        latency_seconds=finished_at - started,
+        cost=openai_cost(model, input_tokens, output_tokens),
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        model=model,
+    )
+
+    stats = {
+        "ttft_seconds": (first_token_at - started) if first_token_at else None,
+        "tokens_per_second": tokens_per_second,
+        "elapsed_seconds": finished_at - started,
+    }
+    console.print(
+        f"[dim]⏱  {model}: first token {stats['ttft_seconds'] or 0:.1f}s, "
+        f"{tokens_per_second or 0:.0f} tokens/s, {stats['elapsed_seconds']:.0f}s total[/dim]"
+    )
+
+    return {
+        "content": content,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "success": True,
+        **stats,
+    }
@@ -0,0 +1,130 @@
+"""
+Snapshot refresher process.
+
+Owns the only Supabase connection in a multi-worker API deployment: it rebuilds the
+enriched properties dataframe and publishes it to PROPDEALS_SNAPSHOT_DIR for the API
+workers to memory-map (see snapshot.py). A rebuild happens every
+SNAPSHOT_REFRESH_SECONDS, or sooner when a worker receives POST /cache/invalidate.
+Row changes reported by the change listener are recomputed incrementally and
+published on the next poll.
+
+Usage:
+    PROPDEALS_SNAPSHOT_DIR=/dev/shm/propdeals python refresher.py
+"""
+import os
+import threading
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+from rich.console import Console
+
+from change_listener import create_change_listener
+from snapshot import SNAPSHOT_DIR, consume_refresh_request, write_snapshot
+
+load_dotenv()
+
+console = Console()
+
+REFRESH_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_REFRESH_SECONDS", "300"))
+POLL_INTERVAL_SECONDS = 2
+
+
+# Addresses reported by the change listener since the last publish; None means reload everything
+pending_changes = {"addresses": set(), "reload_all": False, "lock": threading.Lock()}
+tour_list_df = None
+
+
+def queue_property_changes(addresses):
+    with pending_changes["lock"]:
+        if addresses is None:
+            pending_changes["reload_all"] = True
+        else:
+            pending_changes["addresses"].update(addresses)
+
+
+def take_property_changes():
+    with pending_changes["lock"]:
+        if pending_changes["reload_all"]:
+            pending_changes["reload_all"] = False
+            pending_changes["addresses"].clear()
+            return None
+        addresses = set(pending_changes["addresses"])
+        pending_changes["addresses"].clear()
+        return addresses
+
+
+def publish_snapshot(tour_list):
+    import run
+
+    version = write_snapshot(
+        df=run.df,
+        rents=run.rents,
+        tour_list=tour_list,
+        loan=run.LOAN,
+        assumptions=run.ASSUMPTIONS,
+        snapshot_dir=SNAPSHOT_DIR,
+    )
+    console.print(f"[green]✅ Published snapshot {version} ({len(run.df)} properties, {len(tour_list)} on tour list)[/green]")
+
+
+def refresh_snapshot():
+    global tour_list_df
+    import run
+
+    run.reload_dataframe()
+    tour_list_df, _ = run.get_phase1_research_list()
+    publish_snapshot(tour_list_df)
+
+
+def refresh_changed_properties(addresses):
+    """Recompute only the changed addresses and patch the tour list before publishing"""
+    global tour_list_df
+    import run
+
+    run.reload_properties(addresses)
+    changed_df = run.df[run.df["address1"].isin(addresses)]
+    changed_tour_list, _ = run.get_phase1_research_list(properties_df=changed_df)
+    # Re-sort so the patched list matches what a full get_phase1_research_list() would publish
+    tour_list_df = run.sort_tour_list(pd.concat(
+        [tour_list_df[~tour_list_df["address1"].isin(addresses)], changed_tour_list],
+        ignore_index=True,
+    ))
+    publish_snapshot(tour_list_df)
+
+
+def main():
+    if not SNAPSHOT_DIR:
+        console.print("[red]PROPDEALS_SNAPSHOT_DIR is not set - nothing to refresh[/red]")
+        return
+
+    console.print(f"[cyan]🔄 Snapshot refresher writing to {SNAPSHOT_DIR} every {REFRESH_INTERVAL_SECONDS}s[/cyan]")
+    import run
+
+    change_listener = create_change_listener(run.supabase, queue_property_changes)
+    if change_listener is not None:
+        change_listener.start()
+
+    last_refresh = 0
+    while True:
+        refresh_requested = consume_refresh_request(SNAPSHOT_DIR)
+        changed_addresses = take_property_changes()
+        full_refresh = (
+            changed_addresses is None
+            or refresh_requested
+            or time.time() - last_refresh >= REFRESH_INTERVAL_SECONDS
+        )
+        try:
+            if full_refresh:
+                refresh_snapshot()
+            elif changed_addresses and tour_list_df is not None:
+                refresh_changed_properties(changed_addresses)
+        except Exception as e:
+            console.print(f"[red]⚠️ Snapshot refresh failed: {str(e)}[/red]")
+        if full_refresh:
+            last_refresh = time.time()
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
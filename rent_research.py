@@ -5,13 +5,14 @@ This module provides comprehensive rental market analysis for properties using
 Tavily API for web search and o1-mini for intelligent reasoning and analysis.
 """
 
+import copy
 import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import openai
 from pydantic import BaseModel, create_model
 from rich.console import Console
 from rich.markdown import Markdown
@@ -19,7 +20,30 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 from supabase import Client
-from tavily import TavilyClient
+
+from api_ledger import call_cost, openai_cost
+from context_packing import RENT_KEYWORDS, add_prompt_token_stats, describe_packing, pack_search_results
+from openai_batch import BATCH_PRICE_MULTIPLIER, BatchJob, chat_request
+from openai_structured import get_structured_client
+from reasoning_stream import stream_completion
+from report_memo import find_memoized_report, hash_columns, prompt_hash, reuse_memoized_report
+from web_search import perform_searches
+
+
+# Comp markdown tables by (address1, is_single_family) -> (built_at, table), shared by every prompt
+# built in this process. Writes from this process invalidate an address right away; the TTL bounds
+# how long comps saved by another process (or straight to Supabase) can go unseen.
+COMP_TABLE_CACHE_TTL_SECONDS = float(os.getenv("COMP_TABLE_CACHE_TTL_SECONDS", "300"))
+_comp_table_cache: Dict[Any, Tuple[float, str]] = {}
+
+
+def invalidate_comp_table_cache(address1: Optional[str] = None):
+    """Drop cached comp tables for one address (or all of them) after its comps change"""
+    if address1 is None:
+        _comp_table_cache.clear()
+        return
+    for key in [key for key in _comp_table_cache if key[0] == address1]:
+        del _comp_table_cache[key]
 
 
 @dataclass
@@ -28,9 +52,8 @@ class ResearchConfig:
 
     reasoning_model: str = "gpt-5.1"
     max_tokens: int = 120000
-    search_cost_per_query: float = 0.008  # Tavily cost
-    reasoning_cost_per_input_token: float = 1.25 / 1000000
-    reasoning_cost_per_output_token: float = 10 / 1000000
+    search_cost_per_query: float = call_cost("tavily", "search")
+    context_token_budget: int = 6000  # Web research tokens per reasoning prompt (the old 25 x 1000-char block was ~6-7k)
     searches_per_property: int = 12
 
 
@@ -63,29 +86,45 @@ class RentResearcher:
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
+        import openai
         self.openai_client = openai.OpenAI(api_key=openai_api_key)
 
         # Initialize Tavily client for search
         tavily_api_key = os.getenv("TAVILY_API_KEY")
         if not tavily_api_key:
             raise ValueError("TAVILY_API_KEY environment variable not set")
+        from tavily import TavilyClient
         self.tavily_client = TavilyClient(api_key=tavily_api_key)
 
+    def with_console(self, console: Console) -> "RentResearcher":
+        """
+        A researcher that logs to another console but shares this one's Supabase, OpenAI
+        and Tavily clients. Per-run state (last search/context stats) is kept separately.
+        """
+        researcher = copy.copy(self)
+        researcher.console = console
+        return researcher
+
     def _is_single_family(self, property_data: Dict[str, Any]) -> bool:
         """Check if property is single family (units == 0)"""
         return property_data.get("units", 1) == 0
 
     def _calculate_cost(
-        self, num_searches: int, input_tokens: int, output_tokens: int
+        self,
+        num_searches: int,
+        input_tokens: int,
+        output_tokens: int,
+        model: Optional[str] = None,
+        multiplier: float = 1.0,
     ) -> Decimal:
-        """Calculate the total cost of searches + reasoning"""
+        """
+        Calculate the total cost of searches + reasoning. Tokens are priced for the model
+        that was actually called (default: reasoning_model) with api_ledger's price table,
+        so stored api_cost values agree with the ledger.
+        """
         search_cost = num_searches * self.config.search_cost_per_query
-        reasoning_input_cost = input_tokens * self.config.reasoning_cost_per_input_token
-        reasoning_output_cost = (
-            output_tokens * self.config.reasoning_cost_per_output_token
-        )
-        total_cost = search_cost + reasoning_input_cost + reasoning_output_cost
-        return Decimal(str(total_cost)).quantize(Decimal("0.0001"))
+        reasoning_cost = openai_cost(model or self.config.reasoning_model, input_tokens, output_tokens, multiplier)
+        return Decimal(str(search_cost + reasoning_cost)).quantize(Decimal("0.0001"))
 
     def _generate_search_queries(self, property_data: Dict[str, Any]) -> List[str]:
         """Generate targeted search queries for comprehensive rental analysis"""
@@ -191,193 +230,135 @@ class RentResearcher:
         return queries
 
     def _perform_searches(self, queries: List[str]) -> List[Dict[str, Any]]:
-        """Perform Tavily searches for all queries"""
-
-        search_results = []
-        total_queries = len(queries)
-        successful_searches = 0
+        """Perform Tavily searches for all queries (concurrently, logged in query order, cached)"""
+        search_results, self.last_search_stats = perform_searches(self.tavily_client, queries, self.console)
+        return search_results
 
-        self.console.print(
-            f"\n[bold cyan]🔍 Starting Tavily search for {total_queries} queries...[/bold cyan]\n"
+    def _pack_search_data(self, search_results: List[Dict[str, Any]]) -> str:
+        """Dedupe and compress search results to the prompt's token budget"""
+        search_data, self.last_context_stats = pack_search_results(
+            search_results, RENT_KEYWORDS, self.config.context_token_budget
         )
+        return search_data
 
-        for i, query in enumerate(queries, 1):
-            # Pre-search logging
-            self.console.print(
-                f'[cyan]🔍 [{i}/{total_queries}] Searching:[/cyan] [white]"{query}"[/white]'
-            )
-
-            try:
-                response = self.tavily_client.search(
-                    query=query,
-                    search_depth="advanced",
-                    max_results=5,
-                    include_raw_content="markdown",
-                )
-
-                if response and "results" in response:
-                    results_count = len(response["results"])
-                    sources_count = len(
-                        set(result.get("url", "") for result in response["results"])
-                    )
-
-                    for result in response["results"]:
-                        search_results.append(
-                            {
-                                "query": query,
-                                "title": result.get("title", ""),
-                                "url": result.get("url", ""),
-                                "content": result.get("content", ""),
-                                "raw_content": result.get("raw_content", ""),
-                                "score": result.get("score", 0),
-                            }
-                        )
-
-                    # Post-search success logging
-                    self.console.print(
-                        f"[green]   ✅ Found {results_count} results from {sources_count} sources[/green]\n"
-                    )
-                    successful_searches += 1
-                else:
-                    # Post-search no results logging
-                    self.console.print("[yellow]   ❌ No results found[/yellow]\n")
+    def _log_prompt_tokens(self, prompt: str):
+        """Record and log the whole prompt's size against the unpacked baseline"""
+        add_prompt_token_stats(self.last_context_stats, prompt)
+        self.console.print(f"[cyan]{describe_packing(self.last_context_stats)}[/cyan]")
 
-            except Exception as e:
-                # Enhanced error logging
-                self.console.print(f"[red]   ❌ Search failed: {str(e)}[/red]\n")
-                continue
-
-        # Overall search statistics summary
-        total_results = len(search_results)
-        failed_searches = total_queries - successful_searches
-
-        self.console.print("[bold green]📊 Search Summary:[/bold green]")
-        self.console.print(
-            f"[green]   • Successful searches: {successful_searches}/{total_queries}[/green]"
-        )
-        if failed_searches > 0:
-            self.console.print(
-                f"[yellow]   • Failed searches: {failed_searches}[/yellow]"
-            )
-        self.console.print(
-            f"[cyan]   • Total results collected: {total_results} data points[/cyan]\n"
-        )
-
-        return search_results
-    
     def _create_rent_comp_md_table(self, address1, is_single_family=False):
-        table = ""
+        """
+        Markdown tables of the property's strong comparables (correlation >= 0.7, within 2 miles).
+        Cached per address for COMP_TABLE_CACHE_TTL_SECONDS or until comps are saved for it
+        again (see invalidate_comp_table_cache), since every prompt variant for a property
+        embeds the same table.
+        """
+        cache_key = (address1, is_single_family)
+        cached = _comp_table_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < COMP_TABLE_CACHE_TTL_SECONDS:
+            return cached[1]
 
         if is_single_family:
-            # For single family, query property-level comparables
-            table += "Property Comparables (Single Family)\n"
-
-            query = (
-                self.supabase.table("comparable_rents")
-                .select("*, rent_comp_to_property!inner(*)")
-                .eq("rent_comp_to_property.address1", address1)
-                .gte("rent_comp_to_property.correlation", 0.7)
-                .lte("rent_comp_to_property.distance", 2.0)
-                .limit(15)
-            )
-            response = query.execute()
-
-            if not hasattr(response, "data") or not response.data:
-                return "No comparable rents found for this property.\n"
-
-            # Create markdown table header
-            table += "| Address | Config | Sq Ft | Rent | Dist | Corr |\n"
-            table += "|---------|--------|-------|------|------|------|\n"
-
-            for comp in response.data:
-                full_address = comp.get('address', 'NA')
-                if full_address != 'NA' and ',' in full_address:
-                    address = full_address.split(',')[0].strip()
-                else:
-                    address = full_address
-
-                beds = comp.get('beds', 'NA')
-                baths = comp.get('baths', 'NA')
-                config = f"{beds}/{baths}" if beds != 'NA' and baths != 'NA' else 'NA'
+            table = self._create_property_comp_md_table(address1)
+        else:
+            table = self._create_unit_comp_md_table(address1)
 
-                square_feet = comp.get('square_feet', 'NA')
-                rent_price = comp.get('rent_price', 'NA')
+        _comp_table_cache[cache_key] = (time.monotonic(), table)
+        return table
 
-                relationship_data = comp.get('rent_comp_to_property', [])
-                if relationship_data and len(relationship_data) > 0:
-                    distance = relationship_data[0].get('distance', 'NA')
-                    correlation = relationship_data[0].get('correlation', 'NA')
-                else:
-                    distance = 'NA'
-                    correlation = 'NA'
+    def _format_comp_rows(self, comps_with_relationships) -> List[str]:
+        """Markdown table (header + one row per comp) from (comp, relationship) pairs"""
+        lines = [
+            "| Address | Config | Sq Ft | Rent | Dist | Corr |",
+            "|---------|--------|-------|------|------|------|",
+        ]
+        for comp, relationship in comps_with_relationships:
+            # Extract street name only from address (remove city/state)
+            full_address = comp.get('address', 'NA')
+            if full_address != 'NA' and ',' in full_address:
+                address = full_address.split(',')[0].strip()
+            else:
+                address = full_address
+
+            # Combine beds/baths into config format (e.g., "2/1")
+            beds = comp.get('beds', 'NA')
+            baths = comp.get('baths', 'NA')
+            config = f"{beds}/{baths}" if beds != 'NA' and baths != 'NA' else 'NA'
+
+            square_feet = comp.get('square_feet', 'NA')
+            rent_price = comp.get('rent_price', 'NA')
+
+            # Distance and correlation come from the many-to-many relationship
+            distance = relationship.get('distance', 'NA') if relationship else 'NA'
+            correlation = relationship.get('correlation', 'NA') if relationship else 'NA'
+
+            lines.append(f"| {address} | {config} | {square_feet} | {rent_price} | {distance} | {correlation} |")
+        return lines
+
+    def _create_property_comp_md_table(self, address1):
+        # For single family, query property-level comparables
+        query = (
+            self.supabase.table("comparable_rents")
+            .select("*, rent_comp_to_property!inner(*)")
+            .eq("rent_comp_to_property.address1", address1)
+            .gte("rent_comp_to_property.correlation", 0.7)
+            .lte("rent_comp_to_property.distance", 2.0)
+            .limit(15)
+        )
+        response = query.execute()
 
-                table += f"| {address} | {config} | {square_feet} | {rent_price} | {distance} | {correlation} |\n"
+        if not hasattr(response, "data") or not response.data:
+            return "No comparable rents found for this property.\n"
 
-            table += "\n"
-        else:
-            # Multi-family: get rent_estimates based on address1
-            response = self.supabase.table('rent_estimates').select('*').eq('address1', address1).execute()
-
-            if not hasattr(response, "data") or not response.data:
-                return "No rent estimates found for this property.\n"
-
-            for rent_estimate in response.data:
-                # Create section header for this unit
-                unit_config = f"{rent_estimate.get('beds', 'NA')}-bed {rent_estimate.get('baths', 'NA')}-bath"
-                unit_num = rent_estimate.get('unit_num', 'NA')
-                table += f"Unit {unit_num} - {unit_config}\n"
-
-                # Query for comparables with smart filtering and ordering
-                query2 = (
-                    self.supabase.table("comparable_rents")
-                    .select("*, rent_comp_to_rent_estimate!inner(*)")
-                    .eq("rent_comp_to_rent_estimate.estimate_id", rent_estimate['id'])
-                    .gte("rent_comp_to_rent_estimate.correlation", 0.7)  # Filter by correlation > 0.7
-                    .lte("rent_comp_to_rent_estimate.distance", 2.0)    # Filter by distance < 2 miles
-                    .limit(15)  # Limit to top 15 comparables
-                )
-                response2 = query2.execute()
+        pairs = [
+            (comp, (comp.get('rent_comp_to_property') or [None])[0])
+            for comp in response.data
+        ]
+        lines = ["Property Comparables (Single Family)"] + self._format_comp_rows(pairs)
+        return "\n".join(lines) + "\n\n"
+
+    def _create_unit_comp_md_table(self, address1):
+        # Multi-family: get rent_estimates based on address1
+        response = self.supabase.table('rent_estimates').select('*').eq('address1', address1).execute()
+
+        if not hasattr(response, "data") or not response.data:
+            return "No rent estimates found for this property.\n"
+
+        # One query for every unit's comparables, grouped by estimate in memory
+        estimate_ids = [rent_estimate['id'] for rent_estimate in response.data]
+        comps_response = (
+            self.supabase.table("comparable_rents")
+            .select("*, rent_comp_to_rent_estimate!inner(*)")
+            .in_("rent_comp_to_rent_estimate.estimate_id", estimate_ids)
+            .gte("rent_comp_to_rent_estimate.correlation", 0.7)  # Filter by correlation > 0.7
+            .lte("rent_comp_to_rent_estimate.distance", 2.0)    # Filter by distance < 2 miles
+            .execute()
+        )
 
-                if not hasattr(response2, "data") or not response2.data:
-                    table += "No comparable rents found for this unit.\n\n"
-                    continue
+        comps_by_estimate = {estimate_id: [] for estimate_id in estimate_ids}
+        for comp in comps_response.data or []:
+            # A comp shared by several units carries one relationship per unit
+            for relationship in comp.get('rent_comp_to_rent_estimate') or []:
+                unit_comps = comps_by_estimate.get(relationship.get('estimate_id'))
+                if unit_comps is not None and len(unit_comps) < 15:  # Top 15 comparables per unit
+                    unit_comps.append((comp, relationship))
+
+        lines = []
+        for rent_estimate in response.data:
+            # Section header for this unit
+            unit_config = f"{rent_estimate.get('beds', 'NA')}-bed {rent_estimate.get('baths', 'NA')}-bath"
+            unit_num = rent_estimate.get('unit_num', 'NA')
+            lines.append(f"Unit {unit_num} - {unit_config}")
+
+            unit_comps = comps_by_estimate[rent_estimate['id']]
+            if not unit_comps:
+                lines.append("No comparable rents found for this unit.\n")
+                continue
 
-                # Create markdown table header (optimized with 6 columns)
-                table += "| Address | Config | Sq Ft | Rent | Dist | Corr |\n"
-                table += "|---------|--------|-------|------|------|------|\n"
-
-                # Add each comparable as a table row
-                for comp in response2.data:
-                    # Extract street name only from address (remove city/state)
-                    full_address = comp.get('address', 'NA')
-                    if full_address != 'NA' and ',' in full_address:
-                        address = full_address.split(',')[0].strip()
-                    else:
-                        address = full_address
-
-                    # Combine beds/baths into config format (e.g., "2/1")
-                    beds = comp.get('beds', 'NA')
-                    baths = comp.get('baths', 'NA')
-                    config = f"{beds}/{baths}" if beds != 'NA' and baths != 'NA' else 'NA'
-
-                    square_feet = comp.get('square_feet', 'NA')
-                    rent_price = comp.get('rent_price', 'NA')
-
-                    # Get distance and correlation from the many-to-many relationship
-                    relationship_data = comp.get('rent_comp_to_rent_estimate', [])
-                    if relationship_data and len(relationship_data) > 0:
-                        distance = relationship_data[0].get('distance', 'NA')
-                        correlation = relationship_data[0].get('correlation', 'NA')
-                    else:
-                        distance = 'NA'
-                        correlation = 'NA'
-
-                    # Format the table row with optimized columns
-                    table += f"| {address} | {config} | {square_feet} | {rent_price} | {distance} | {correlation} |\n"
-
-                table += "\n"
+            lines.extend(self._format_comp_rows(unit_comps))
+            lines.append("")
 
-        return table
+        return "\n".join(lines) + "\n"
 
     def _create_analysis_prompt_singlefamily(
         self,
@@ -398,12 +379,7 @@ class RentResearcher:
         rent_comp_md_table = self._create_rent_comp_md_table(address1=address, is_single_family=True)
 
         # Compile search data
-        search_data = "\n\n".join(
-            [
-                f"**Query**: {result['query']}\n**Source**: {result['title']} ({result['url']})\n**Content**: {result['content'][:1000]}..."
-                for result in search_results[:25]
-            ]
-        )
+        search_data = self._pack_search_data(search_results)
 
         # Create room configuration details if available
         room_details = ""
@@ -502,12 +478,7 @@ Generate a data-driven analysis with specific, actionable per-room rental pricin
         rent_comp_md_table = self._create_rent_comp_md_table(address1=address)
 
         # Compile search data
-        search_data = "\n\n".join(
-            [
-                f"**Query**: {result['query']}\n**Source**: {result['title']} ({result['url']})\n**Content**: {result['content'][:1000]}..."
-                for result in search_results[:25]  # More data for o1-mini's reasoning
-            ]
-        )
+        search_data = self._pack_search_data(search_results)
 
         # Create unit configuration details if available
         unit_details = ""
@@ -614,12 +585,7 @@ Generate a data-driven analysis with specific, actionable rental pricing recomme
         rent_comp_md_table = self._create_rent_comp_md_table(address1=address, is_single_family=True)
 
         # Compile search data
-        search_data = "\n\n".join(
-            [
-                f"**Query**: {result['query']}\n**Source**: {result['title']} ({result['url']})\n**Content**: {result['content'][:1000]}..."
-                for result in search_results[:25]
-            ]
-        )
+        search_data = self._pack_search_data(search_results)
 
         prompt = f"""
 Analyze this single family home for WHOLE-PROPERTY rental (traditional rental strategy where you rent the entire house to one tenant/family, NOT room-by-room roommate rental).
@@ -803,87 +769,62 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
 """
         return prompt.strip()
 
-    def _analyze_with_reasoning_model(self, prompt: str) -> Dict[str, Any]:
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config.reasoning_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_completion_tokens=self.config.max_tokens,
-            )
-
-            content = response.choices[0].message.content
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
+    def _create_property_wide_extraction_prompt(self, report_content: str) -> str:
+        return f"""Analyze the following property-wide rental market research report and extract the recommended whole-property rent estimates.
 
-            return {
-                "content": content,
-                "input_tokens": input_tokens,
-                "output_tokens": output_tokens,
-                "success": True,
-            }
+# Research Report to Analyze:
+{report_content}
 
-        except Exception as e:
-            return {
-                "content": None,
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "success": False,
-                "error": str(e),
-            }
+# Extraction Instructions:
+Extract the PRIMARY recommended monthly rent estimate for renting the ENTIRE property to a single tenant/family (not room-by-room).
 
-    def _generate_rent_estimates_with_reasoning_model(
-        self, prompt: str, response_format_model
-    ) -> Dict[str, Any]:
-        """Generate rent estimates using structured outputs with Pydantic"""
-        try:
-            response = self.openai_client.beta.chat.completions.parse(
-                model=self.config.reasoning_model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format=response_format_model,
-                max_completion_tokens=4000,
-            )
+You must provide:
+1. **rent_estimate**: The primary/mid-range recommended monthly rent for the entire property
+2. **rent_estimate_high**: The upper bound/optimistic rent estimate for the entire property
+3. **rent_estimate_low**: The lower bound/conservative rent estimate for the entire property
+4. **confidence_score**: Your confidence in these estimates (0.0 to 1.0), where 1.0 is highest confidence
 
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
+# Analysis Requirements:
+- Provide only numeric values for monthly rental amounts (no dollar signs or commas)
+- Extract WHOLE-PROPERTY estimates (traditional rental), NOT per-room estimates
+- Focus on the report's "Whole-Property Rent Recommendations" or similar section
+- If the report provides a range (e.g., "$2,400-$2,800"), use the middle as rent_estimate, upper as rent_estimate_high, lower as rent_estimate_low
+- If only one estimate is provided, create a reasonable range (±10% for high/low estimates)
+- Base your confidence_score on:
+  * Quality and quantity of comparable data mentioned
+  * Consistency across different market indicators
+  * Strength of the neighborhood analysis
+  * Recency and reliability of data sources
 
-            # Check for refusal
-            if response.choices[0].message.refusal:
-                return {
-                    "estimates": None,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "success": False,
-                    "error": f"Model refused to generate estimates: {response.choices[0].message.refusal}",
-                }
+# Context:
+- Focus on the "Traditional Rental" or "Strategy A" recommendations (whole-house rental)
+- Prioritize estimates supported by comparable whole-property rental analysis
+- Consider market conditions, property features, and location factors mentioned in the report"""
 
-            # Get the parsed result
-            estimates = response.choices[0].message.parsed
-            if estimates:
-                # Convert the dynamic model to a dictionary
-                estimates_dict = estimates.model_dump()
-                return {
-                    "estimates": estimates_dict,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "success": True,
-                }
-            else:
-                return {
-                    "estimates": None,
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "success": False,
-                    "error": "Failed to parse structured response",
-                }
+    def _analyze_with_reasoning_model(self, prompt: str, checkpoint_name: str = "rent_research") -> Dict[str, Any]:
+        """Stream the report from the reasoning model (see reasoning_stream)"""
+        return stream_completion(
+            self.openai_client,
+            self.console,
+            self.config.reasoning_model,
+            prompt,
+            self.config.max_tokens,
+            checkpoint_name=checkpoint_name,
+        )
 
-        except Exception as e:
-            return {
-                "estimates": None,
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "success": False,
-                "error": f"API call failed: {str(e)}",
-            }
+    def _generate_rent_estimates_with_reasoning_model(
+        self, prompt: str, response_format_model
+    ) -> Dict[str, Any]:
+        """Generate rent estimates using structured outputs with Pydantic (rate limited, with retries)"""
+        result = get_structured_client().parse(self.config.reasoning_model, prompt, response_format_model)
+        return {
+            # Convert the dynamic model to a dictionary
+            "estimates": result["parsed"].model_dump() if result["success"] else None,
+            "input_tokens": result["input_tokens"],
+            "output_tokens": result["output_tokens"],
+            "success": result["success"],
+            "error": result["error"],
+        }
 
     def _sanitize_content(self, content: str) -> str:
         """Sanitize content to remove problematic characters for PostgreSQL storage"""
@@ -915,6 +856,8 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
         prompt_used: str,
         cost: Decimal,
         status: str = "completed",
+        research_type: str = "rental_comparison",
+        report_hash: Optional[str] = None,
     ) -> Optional[str]:
         """Store the research report in the database"""
 
@@ -936,8 +879,9 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
                         "prompt_used": sanitized_prompt,
                         "status": status,
                         "api_cost": float(cost),
-                        "research_type": "rental_comparison",
+                        "research_type": research_type,
                         "created_at": datetime.now(timezone.utc).isoformat(),
+                        **hash_columns(self.supabase, report_hash),
                     }
                 )
                 .execute()
@@ -958,7 +902,19 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
             self.console.print(f"[red]Error storing report: {error_details}[/red]")
             return None
 
-    def generate_rent_research(self, property_id: str) -> Optional[str]:
+    def gather_research_inputs(self, property_id: str, property_wide: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Search stage of rent research: load the property, build its queries and run them.
+
+        Args:
+            property_id: Property address (address1)
+            property_wide: Whole-house queries for a single family home instead of per-unit/per-room
+
+        Returns:
+            Dict with property_data, queries, search_results, search_stats and (per-unit only)
+            unit_configs, or None if the property can't be used or no market data was found
+            (a failed report is stored in that case)
+        """
         try:
             property_response = (
                 self.supabase.table("properties")
@@ -971,127 +927,182 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
                 self.console.print(f"[red]Property not found: {property_id}[/red]")
                 return None
             property_data = property_response.data
+
+            # Verify it's a single family home
+            if property_wide and property_data.get("units", 1) != 0:
+                self.console.print(f"[red]Property-wide research is only for single family homes (units must be 0)[/red]")
+                return None
+
         except Exception as e:
             self.console.print(f"[red]Error fetching property data: {str(e)}[/red]")
             return None
 
-        # Create progress display
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=True,
-        ) as progress:
-            task = progress.add_task(
-                "[cyan]Initializing rental research...", total=None
-            )
-
-            # Generate search queries
-            progress.update(task, description="[cyan]Generating search queries...")
+        # Property-wide queries are different from per-room queries
+        if property_wide:
+            queries = self._generate_property_wide_search_queries(property_data)
+        else:
             queries = self._generate_search_queries(property_data)
+        search_results = self._perform_searches(queries)
 
-            # Perform web searches
-            progress.update(
-                task,
-                description=f"[cyan]Searching market data ({len(queries)} queries)...",
-            )
-            search_results = self._perform_searches(queries)
-
-            if not search_results:
-                progress.update(task, description="[red]No search results found!")
-                self.console.print("[red]No market data found for analysis.[/red]")
-                self._store_report(
-                    property_id,
-                    "No market data found for analysis",
-                    "NA",
-                    Decimal("0.0000"),
-                    "failed",
-                )
-                return None
-
-            progress.update(
-                task,
-                description=f"[cyan]Deep reasoning analysis with {self.config.reasoning_model} ({len(search_results)} data points)...",
+        if not search_results:
+            scope = "property-wide analysis" if property_wide else "analysis"
+            self.console.print(f"[red]No market data found for {scope}.[/red]")
+            self._store_report(
+                property_id,
+                f"No market data found for {scope}",
+                "NA",
+                Decimal("0.0000"),
+                "failed",
             )
+            return None
 
+        return {
+            "property_data": property_data,
+            "queries": queries,
+            "search_results": search_results,
+            "search_stats": self.last_search_stats,
             # Get unit configurations for more detailed analysis
-            unit_configs = self._get_unit_configurations(property_id)
+            "unit_configs": None if property_wide else self._get_unit_configurations(property_id),
+        }
 
-            analysis_prompt = self._create_analysis_prompt(
-                property_data, search_results, unit_configs
-            )
-            result = self._analyze_with_reasoning_model(analysis_prompt)
-
-            if not result["success"]:
-                progress.update(task, description="[red]Analysis failed!")
-                error_msg = result.get("error", "Unknown error")
-                self.console.print(f"[red]Analysis failed: {error_msg}[/red]")
-                self._store_report(
-                    property_id,
-                    f"Analysis failed: {error_msg}",
-                    analysis_prompt,
-                    Decimal("0.0000"),
-                    "failed",
-                )
-                return None
+    def _create_research_prompt(self, inputs: Dict[str, Any], property_wide: bool = False) -> str:
+        """Analysis prompt for inputs from gather_research_inputs"""
+        property_data = inputs["property_data"]
+        search_results = inputs["search_results"]
 
-            # Calculate total cost
-            num_searches = len(queries)
-            cost = self._calculate_cost(
-                num_searches, result["input_tokens"], result["output_tokens"]
+        if property_wide:
+            # Get RentCast property-level estimates if available
+            property_rent = {
+                "rent_estimate": property_data.get("rent_estimate"),
+                "rent_estimate_low": property_data.get("rent_estimate_low"),
+                "rent_estimate_high": property_data.get("rent_estimate_high"),
+            } if property_data.get("rent_estimate") else None
+            prompt = self._create_property_wide_analysis_prompt(
+                property_data, search_results, property_rent
             )
+        else:
+            prompt = self._create_analysis_prompt(
+                property_data, search_results, inputs["unit_configs"]
+            )
+        self._log_prompt_tokens(prompt)
+        return prompt
 
-            progress.update(task, description="[green]Storing research report...")
-
-            # Store successful report
-            report_id = self._store_report(property_id, result["content"], analysis_prompt, cost)
+    def _report_hash(self, prompt: str) -> str:
+        """Memoization key for a research prompt (see report_memo)"""
+        return prompt_hash(
+            self._sanitize_content(prompt), self.config.reasoning_model, max_tokens=self.config.max_tokens
+        )
 
-            progress.update(task, description="[green]Research completed successfully!")
+    def analyze_research_inputs(
+        self, property_id: str, inputs: Dict[str, Any], property_wide: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reasoning stage of rent research: prompt the reasoning model with the gathered
+        inputs and store the resulting report.
+
+        Returns:
+            Dict with report_id, cost, input_tokens, output_tokens, context_stats and the
+            stream's ttft_seconds/tokens_per_second, or None if the analysis or storing the
+            report failed
+        """
+        analysis_prompt = self._create_research_prompt(inputs, property_wide)
+        context_stats = self.last_context_stats
+        research_type = "property_wide_rental" if property_wide else "rental_comparison"
+        search_cost = inputs["search_stats"]["paid_searches"] * self.config.search_cost_per_query
+
+        # An identical prompt was already answered - reuse that report instead of paying again
+        report_hash = self._report_hash(analysis_prompt)
+        existing = find_memoized_report(self.supabase, report_hash, research_type, self.console)
+        if reuse_memoized_report(existing, self.console):
+            return {
+                "report_id": existing["id"],
+                "cost": Decimal(str(search_cost)).quantize(Decimal("0.0001")),
+                "search_cost": search_cost,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "context_stats": context_stats,
+                "reused": True,
+                "ttft_seconds": None,
+                "tokens_per_second": None,
+            }
 
-            # Display cost information
-            search_cost = num_searches * self.config.search_cost_per_query
-            reasoning_cost = cost - Decimal(str(search_cost))
+        result = self._analyze_with_reasoning_model(analysis_prompt, f"{research_type}_{property_id}")
 
-            self.console.print(
-                Panel(
-                    f"[green]Research completed successfully![/green]\n\n"
-                    f"**Market Data Sources**: {len(search_results)} data points from {num_searches} searches\n"
-                    f"**Reasoning Tokens**: {result['input_tokens']:,} input, {result['output_tokens']:,} output\n"
-                    f"**Search Cost**: ${search_cost:.4f} ({num_searches} × $0.008)\n"
-                    f"**{self.config.reasoning_model} Reasoning Cost**: ${reasoning_cost:.4f}\n"
-                    f"**Total API Cost**: ${cost:.4f}\n"
-                    f"**Report ID**: {report_id}",
-                    title="Research Summary",
-                    border_style="green",
-                )
+        if not result["success"]:
+            error_msg = result.get("error", "Unknown error")
+            self.console.print(f"[red]Analysis failed: {error_msg}[/red]")
+            self._store_report(
+                property_id,
+                f"Analysis failed: {error_msg}",
+                analysis_prompt,
+                Decimal("0.0000"),
+                "failed",
             )
+            return None
 
-            return report_id
+        # Calculate total cost
+        num_searches = inputs["search_stats"]["paid_searches"]  # Cache hits are free
+        cost = self._calculate_cost(
+            num_searches, result["input_tokens"], result["output_tokens"]
+        )
 
-    def generate_property_wide_research(self, property_id: str) -> Optional[str]:
-        """Generate property-wide rental research for single family homes (whole-house rental, not per-room)"""
-        try:
-            property_response = (
-                self.supabase.table("properties")
-                .select("*")
-                .eq("address1", property_id)
-                .single()
-                .execute()
-            )
-            if not property_response.data:
-                self.console.print(f"[red]Property not found: {property_id}[/red]")
-                return None
-            property_data = property_response.data
+        report_id = self._store_report(
+            property_id,
+            result["content"],
+            analysis_prompt,
+            cost,
+            research_type=research_type,
+            report_hash=report_hash,
+        )
+        if not report_id:
+            return None
 
-            # Verify it's a single family home
-            if property_data.get("units", 1) != 0:
-                self.console.print(f"[red]Property-wide research is only for single family homes (units must be 0)[/red]")
-                return None
+        return {
+            "report_id": report_id,
+            "cost": cost,
+            "search_cost": search_cost,
+            "input_tokens": result["input_tokens"],
+            "output_tokens": result["output_tokens"],
+            "context_stats": context_stats,
+            "reused": False,
+            "ttft_seconds": result["ttft_seconds"],
+            "tokens_per_second": result["tokens_per_second"],
+        }
 
-        except Exception as e:
-            self.console.print(f"[red]Error fetching property data: {str(e)}[/red]")
-            return None
+    def _display_research_summary(self, inputs: Dict[str, Any], analysis: Dict[str, Any], property_wide: bool = False):
+        search_stats = inputs["search_stats"]
+        context_stats = analysis["context_stats"]
+        num_searches = search_stats["paid_searches"]
+        search_cost = analysis["search_cost"]
+        reasoning_cost = analysis["cost"] - Decimal(str(search_cost))
+        queries = inputs["queries"]
+
+        self.console.print(
+            Panel(
+                f"[green]{'Property-wide research' if property_wide else 'Research'} completed successfully![/green]\n\n"
+                + ("**Research Type**: Whole-property rental analysis\n" if property_wide else "")
+                + f"**Market Data Sources**: {len(inputs['search_results'])} data points from {len(queries)} searches\n"
+                f"**Reasoning Tokens**: {analysis['input_tokens']:,} input, {analysis['output_tokens']:,} output\n"
+                f"**Search Cost**: ${search_cost:.4f} ({num_searches} × ${self.config.search_cost_per_query})\n"
+                f"**Search Cache**: {search_stats['cache_hits']}/{len(queries)} hits "
+                f"({search_stats['hit_rate']:.0%}), ${search_stats['saved_cost']:.4f} saved\n"
+                f"**Prompt Size**: ~{context_stats['baseline_prompt_tokens']:,} → ~{context_stats['prompt_tokens']:,} tokens "
+                f"(search context ~{context_stats['baseline_tokens']:,} → ~{context_stats['packed_tokens']:,}, {context_stats['sources']} sources)\n"
+                f"**{self.config.reasoning_model} Reasoning Cost**: ${reasoning_cost:.4f}"
+                + (" (reused identical report)" if analysis["reused"] else "") + "\n"
+                + (
+                    f"**Streaming**: first token after {analysis['ttft_seconds'] or 0:.1f}s, "
+                    f"{analysis['tokens_per_second'] or 0:.0f} tokens/s\n"
+                    if not analysis["reused"] else ""
+                ) +
+                f"**Total API Cost**: ${analysis['cost']:.4f}\n"
+                f"**Report ID**: {analysis['report_id']}",
+                title="Property-Wide Research Summary" if property_wide else "Research Summary",
+                border_style="green",
+            )
+        )
 
+    def generate_rent_research(self, property_id: str) -> Optional[str]:
         # Create progress display
         with Progress(
             SpinnerColumn(),
@@ -1100,123 +1111,51 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
             transient=True,
         ) as progress:
             task = progress.add_task(
-                "[cyan]Initializing property-wide rental research...", total=None
-            )
-
-            # Generate property-wide search queries (different from per-room queries)
-            progress.update(task, description="[cyan]Generating whole-property search queries...")
-            queries = self._generate_property_wide_search_queries(property_data)
-
-            # Perform web searches
-            progress.update(
-                task,
-                description=f"[cyan]Searching whole-property rental market ({len(queries)} queries)...",
+                "[cyan]Searching market data...", total=None
             )
-            search_results = self._perform_searches(queries)
-
-            if not search_results:
+            inputs = self.gather_research_inputs(property_id)
+            if not inputs:
                 progress.update(task, description="[red]No search results found!")
-                self.console.print("[red]No market data found for property-wide analysis.[/red]")
-                self._store_report(
-                    property_id,
-                    "No market data found for property-wide analysis",
-                    "NA",
-                    Decimal("0.0000"),
-                    "failed",
-                )
                 return None
 
-            progress.update(
-                task,
-                description=f"[cyan]Deep reasoning analysis with {self.config.reasoning_model} ({len(search_results)} data points)...",
-            )
-
-            # Get RentCast property-level estimates if available
-            property_rent = {
-                "rent_estimate": property_data.get("rent_estimate"),
-                "rent_estimate_low": property_data.get("rent_estimate_low"),
-                "rent_estimate_high": property_data.get("rent_estimate_high"),
-            } if property_data.get("rent_estimate") else None
+        # The reasoning call renders its own live stream, which can't share the console with a spinner
+        self.console.print(
+            f"[cyan]Deep reasoning analysis with {self.config.reasoning_model} ({len(inputs['search_results'])} data points)...[/cyan]"
+        )
+        analysis = self.analyze_research_inputs(property_id, inputs)
+        if not analysis:
+            return None
 
-            analysis_prompt = self._create_property_wide_analysis_prompt(
-                property_data, search_results, property_rent
-            )
-            result = self._analyze_with_reasoning_model(analysis_prompt)
-
-            if not result["success"]:
-                progress.update(task, description="[red]Analysis failed!")
-                error_msg = result.get("error", "Unknown error")
-                self.console.print(f"[red]Analysis failed: {error_msg}[/red]")
-                self._store_report(
-                    property_id,
-                    f"Analysis failed: {error_msg}",
-                    analysis_prompt,
-                    Decimal("0.0000"),
-                    "failed",
-                )
-                return None
+        self._display_research_summary(inputs, analysis)
+        return analysis["report_id"]
 
-            # Calculate total cost
-            num_searches = len(queries)
-            cost = self._calculate_cost(
-                num_searches, result["input_tokens"], result["output_tokens"]
+    def generate_property_wide_research(self, property_id: str) -> Optional[str]:
+        """Generate property-wide rental research for single family homes (whole-house rental, not per-room)"""
+        # Create progress display
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=self.console,
+            transient=True,
+        ) as progress:
+            task = progress.add_task(
+                "[cyan]Searching whole-property rental market...", total=None
             )
-
-            progress.update(task, description="[green]Storing property-wide research report...")
-
-            # Store successful report with research_type = 'property_wide_rental'
-            try:
-                sanitized_content = self._sanitize_content(result["content"])
-                sanitized_prompt = self._sanitize_content(analysis_prompt)
-
-                report_result = (
-                    self.supabase.table("research_reports")
-                    .insert(
-                        {
-                            "property_id": property_id,
-                            "report_content": sanitized_content,
-                            "prompt_used": sanitized_prompt,
-                            "status": "completed",
-                            "api_cost": float(cost),
-                            "research_type": "property_wide_rental",  # Different from per-room research
-                            "created_at": datetime.now(timezone.utc).isoformat(),
-                        }
-                    )
-                    .execute()
-                )
-
-                if report_result.data:
-                    report_id = report_result.data[0]["id"]
-                else:
-                    self.console.print("[red]Failed to store report[/red]")
-                    return None
-
-            except Exception as e:
-                self.console.print(f"[red]Error storing report: {str(e)}[/red]")
+            inputs = self.gather_research_inputs(property_id, property_wide=True)
+            if not inputs:
+                progress.update(task, description="[red]No search results found!")
                 return None
 
-            progress.update(task, description="[green]Property-wide research completed successfully!")
-
-            # Display cost information
-            search_cost = num_searches * self.config.search_cost_per_query
-            reasoning_cost = cost - Decimal(str(search_cost))
-
-            self.console.print(
-                Panel(
-                    f"[green]Property-wide research completed successfully![/green]\n\n"
-                    f"**Research Type**: Whole-property rental analysis\n"
-                    f"**Market Data Sources**: {len(search_results)} data points from {num_searches} searches\n"
-                    f"**Reasoning Tokens**: {result['input_tokens']:,} input, {result['output_tokens']:,} output\n"
-                    f"**Search Cost**: ${search_cost:.4f} ({num_searches} × $0.008)\n"
-                    f"**{self.config.reasoning_model} Reasoning Cost**: ${reasoning_cost:.4f}\n"
-                    f"**Total API Cost**: ${cost:.4f}\n"
-                    f"**Report ID**: {report_id}",
-                    title="Property-Wide Research Summary",
-                    border_style="green",
-                )
-            )
+        # The reasoning call renders its own live stream, which can't share the console with a spinner
+        self.console.print(
+            f"[cyan]Deep reasoning analysis with {self.config.reasoning_model} ({len(inputs['search_results'])} data points)...[/cyan]"
+        )
+        analysis = self.analyze_research_inputs(property_id, inputs, property_wide=True)
+        if not analysis:
+            return None
 
-            return report_id
+        self._display_research_summary(inputs, analysis, property_wide=True)
+        return analysis["report_id"]
 
     def extract_property_wide_estimates(self, report_id: str) -> Optional[Dict[str, Any]]:
         """Extract property-wide rent estimates from a research report and update properties table"""
@@ -1258,36 +1197,7 @@ You must provide rent estimates for EACH individual unit listed above. Each unit
             )
 
             # Create extraction prompt
-            extraction_prompt = f"""Analyze the following property-wide rental market research report and extract the recommended whole-property rent estimates.
-
-# Research Report to Analyze:
-{report_content}
-
-# Extraction Instructions:
-Extract the PRIMARY recommended monthly rent estimate for renting the ENTIRE property to a single tenant/family (not room-by-room).
-
-You must provide:
-1. **rent_estimate**: The primary/mid-range recommended monthly rent for the entire property
-2. **rent_estimate_high**: The upper bound/optimistic rent estimate for the entire property
-3. **rent_estimate_low**: The lower bound/conservative rent estimate for the entire property
-4. **confidence_score**: Your confidence in these estimates (0.0 to 1.0), where 1.0 is highest confidence
-
-# Analysis Requirements:
-- Provide only numeric values for monthly rental amounts (no dollar signs or commas)
-- Extract WHOLE-PROPERTY estimates (traditional rental), NOT per-room estimates
-- Focus on the report's "Whole-Property Rent Recommendations" or similar section
-- If the report provides a range (e.g., "$2,400-$2,800"), use the middle as rent_estimate, upper as rent_estimate_high, lower as rent_estimate_low
-- If only one estimate is provided, create a reasonable range (±10% for high/low estimates)
-- Base your confidence_score on:
-  * Quality and quantity of comparable data mentioned
-  * Consistency across different market indicators
-  * Strength of the neighborhood analysis
-  * Recency and reliability of data sources
-
-# Context:
-- Focus on the "Traditional Rental" or "Strategy A" recommendations (whole-house rental)
-- Prioritize estimates supported by comparable whole-property rental analysis
-- Consider market conditions, property features, and location factors mentioned in the report"""
+            extraction_prompt = self._create_property_wide_extraction_prompt(report_content)
 
             # Call GPT-5 with structured outputs
             progress.update(task, description="[cyan]Analyzing report with GPT-5...")
@@ -1557,6 +1467,184 @@ You must provide:
             "cost": 0,
         }
 
+    def _batch_cost(self, num_searches: int, input_tokens: int, output_tokens: int) -> Decimal:
+        """Cost of a Batch API call: searches at full price, tokens at the batch discount"""
+        return self._calculate_cost(num_searches, input_tokens, output_tokens, multiplier=BATCH_PRICE_MULTIPLIER)
+
+    def _fetch_rows_in(self, table: str, columns: str, key: str, values: List[Any], chunk_size: int = 200) -> List[Dict[str, Any]]:
+        rows = []
+        for i in range(0, len(values), chunk_size):
+            response = self.supabase.table(table).select(columns).in_(key, values[i:i + chunk_size]).execute()
+            rows.extend(response.data or [])
+        return rows
+
+    def generate_rent_research_batch(
+        self, property_ids: List[str], include_property_wide: bool = True, batch_client=None
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Write research reports for many properties through the OpenAI Batch API.
+
+        Searches run as usual; every reasoning call is submitted in one batch job and the
+        finished reports are stored in research_reports with their discounted cost. Prompts
+        identical to a stored report reuse it and are left out of the batch.
+
+        Args:
+            property_ids: Properties (address1) to research
+            include_property_wide: Also write property-wide reports for single family homes
+            batch_client: Client for the files/batches endpoints (defaults to OpenAI)
+
+        Returns:
+            {property_id: {research_type: report_id or None}} - properties whose searches
+            found nothing map to an empty dict
+        """
+        requests = []
+        pending = {}  # custom_id -> (property_id, research_type, inputs, prompt, prompt hash)
+        reused = {property_id: {} for property_id in property_ids}
+        for property_id in property_ids:
+            inputs = self.gather_research_inputs(property_id)
+            if not inputs:
+                continue
+            jobs = [("rental_comparison", inputs)]
+            if include_property_wide and self._is_single_family(inputs["property_data"]):
+                property_wide_inputs = self.gather_research_inputs(property_id, property_wide=True)
+                if property_wide_inputs:
+                    jobs.append(("property_wide_rental", property_wide_inputs))
+
+            for research_type, job_inputs in jobs:
+                prompt = self._create_research_prompt(job_inputs, research_type == "property_wide_rental")
+                report_hash = self._report_hash(prompt)
+                existing = find_memoized_report(self.supabase, report_hash, research_type, self.console)
+                if reuse_memoized_report(existing, self.console):
+                    reused[property_id][research_type] = existing["id"]
+                    continue
+                custom_id = f"{research_type}:{property_id}"
+                pending[custom_id] = (property_id, research_type, job_inputs, prompt, report_hash)
+                requests.append(chat_request(custom_id, self.config.reasoning_model, prompt, self.config.max_tokens))
+
+        job = BatchJob(batch_client or self.openai_client, self.console, "rent_research_reports")
+        results = job.run(requests, structured=False)
+
+        report_ids = reused
+        for custom_id, (property_id, research_type, job_inputs, prompt, report_hash) in pending.items():
+            result = results[custom_id]
+            if not result.success:
+                self.console.print(f"[red]Analysis failed for {property_id}: {result.error}[/red]")
+                self._store_report(property_id, f"Analysis failed: {result.error}", prompt, Decimal("0.0000"), "failed")
+                report_ids[property_id][research_type] = None
+                continue
+
+            cost = self._batch_cost(
+                job_inputs["search_stats"]["paid_searches"], result.input_tokens, result.output_tokens
+            )
+            report_ids[property_id][research_type] = self._store_report(
+                property_id, result.content, prompt, cost, research_type=research_type, report_hash=report_hash
+            )
+
+        job.complete()
+        return report_ids
+
+    def _rent_estimates_batch_job(self, batch_client=None) -> BatchJob:
+        return BatchJob(batch_client or self.openai_client, self.console, "rent_estimates")
+
+    def complete_rent_estimates_batch(self):
+        """Mark the last generate_rent_estimates_batch results as stored"""
+        self._rent_estimates_batch_job().complete()
+
+    def generate_rent_estimates_batch(self, report_ids: List[str], batch_client=None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract rent estimates from many reports in one OpenAI Batch API job.
+
+        Per-unit reports use the same dynamic per-unit model and prompt as
+        generate_rent_estimates_from_report; property_wide_rental reports use
+        PropertyWideRentEstimates. Nothing is written to the database: apply per-unit
+        results with _update_rent_estimates_in_db and property-wide results to the
+        properties table, as the synchronous flows do, then call
+        complete_rent_estimates_batch() - until then a re-run resumes this batch rather
+        than paying for it again.
+
+        Returns:
+            {report_id: result shaped like generate_rent_estimates_from_report's, plus
+            property_id and research_type}
+        """
+        reports = self._fetch_rows_in(
+            "research_reports", "id, property_id, report_content, research_type", "id", list(report_ids)
+        )
+        property_ids = list({report["property_id"] for report in reports})
+        units_by_property = {
+            row["address1"]: row.get("units", 1)
+            for row in self._fetch_rows_in("properties", "address1, units", "address1", property_ids)
+        }
+
+        results = {
+            report_id: {"success": False, "error": f"Report not found: {report_id}", "estimates": None, "cost": 0}
+            for report_id in report_ids
+        }
+        requests = []
+        pending = {}  # report_id -> (report, response model, unit_configs)
+        for report in reports:
+            report_id = report["id"]
+            property_id = report["property_id"]
+            base = {"property_id": property_id, "research_type": report.get("research_type")}
+            if not report.get("report_content"):
+                results[report_id] = {**base, "success": False, "error": "Report has no content", "estimates": None, "cost": 0}
+                continue
+
+            if report.get("research_type") == "property_wide_rental":
+                unit_configs = None
+                response_model = PropertyWideRentEstimates
+                prompt = self._create_property_wide_extraction_prompt(report["report_content"])
+            else:
+                unit_configs = self._get_unit_configurations(property_id)
+                if not unit_configs:
+                    results[report_id] = {
+                        **base,
+                        "success": False,
+                        "error": f"No unit configurations found for property {property_id}",
+                        "estimates": None,
+                        "cost": 0,
+                    }
+                    continue
+                response_model = self._create_dynamic_rent_model(unit_configs)
+                prompt = self._create_estimate_extraction_prompt(
+                    report["report_content"], unit_configs, units_by_property.get(property_id) == 0
+                )
+
+            pending[report_id] = (report, response_model, unit_configs)
+            requests.append(chat_request(report_id, self.config.reasoning_model, prompt, 4000, response_model))
+
+        batch_results = self._rent_estimates_batch_job(batch_client).run(requests)
+
+        for report_id, (report, response_model, unit_configs) in pending.items():
+            result = batch_results[report_id]
+            base = {"property_id": report["property_id"], "research_type": report.get("research_type")}
+            estimates = None
+            if result.success:
+                try:
+                    estimates = response_model(**result.parsed).model_dump()
+                except Exception:
+                    result.error = "Failed to parse structured response"
+            if estimates is None:
+                results[report_id] = {**base, "success": False, "error": result.error, "estimates": None, "cost": 0}
+                continue
+
+            cost = self._batch_cost(0, result.input_tokens, result.output_tokens)
+            results[report_id] = {
+                **base,
+                "success": True,
+                "estimates": estimates,
+                "existing_estimates": (
+                    self._get_existing_estimates(report["property_id"], unit_configs) if unit_configs else {}
+                ),
+                "unit_configs": unit_configs or [],
+                "cost": float(cost),
+                "tokens_used": {
+                    "input": result.input_tokens,
+                    "output": result.output_tokens,
+                },
+            }
+
+        return results
+
     def display_report(self, report_content: str):
         # Create markdown object
         markdown = Markdown(report_content)
@@ -1631,7 +1719,16 @@ You must provide:
                     }
 
                 config_map[config_key]["units"].append(
-                    {"unit_num": int(unit.get("unit_num", 1)), "id": unit.get("id")}
+                    {
+                        "unit_num": int(unit.get("unit_num", 1)),
+                        "id": unit.get("id"),
+                        # Stored values, sent back unchanged by the batched rent_estimates upsert
+                        "record": {
+                            key: unit.get(key)
+                            for key in ("beds", "baths", "estimated_sqrft")
+                            if key in unit
+                        },
+                    }
                 )
 
             # Convert to list format
@@ -1692,19 +1789,26 @@ You must provide:
         property_id: str,
         unit_configs: List[Dict[str, Any]],
         estimates_dict: Dict[str, float],
-    ) -> bool:
-        """Update the rent_estimates table with per-unit results"""
+    ) -> Dict[str, Any]:
+        """
+        Update the rent_estimates table with per-unit results.
+
+        Every unit with complete estimates is written in a single upsert on id. If the
+        batch call fails, the units are retried one update at a time so one bad row
+        can't sink the rest.
+
+        Returns:
+            Dict with success (all units updated), units ({unit_num: {success, error}}) and error
+        """
         self.console.print("\n[bold cyan]🔄 Starting database updates...[/bold cyan]")
 
         try:
-            success_count = 0
-            total_updates = 0
-            failed_units = []
+            unit_results = {}
+            rows = []
 
             for config in unit_configs:
                 for unit in config["units"]:
                     unit_num = unit["unit_num"]
-                    unit_id = unit["id"]
                     config_key = config["config_key"]
                     base_name = f"unit_{unit_num}_{config_key}"
 
@@ -1723,68 +1827,10 @@ You must provide:
                     )
 
                     if (
-                        rent_estimate is not None
-                        and rent_estimate_high is not None
-                        and rent_estimate_low is not None
+                        rent_estimate is None
+                        or rent_estimate_high is None
+                        or rent_estimate_low is None
                     ):
-                        try:
-                            # Convert to integers to fix database type error
-                            # Round to nearest dollar since rent estimates are typically whole numbers
-                            rent_estimate_int = int(round(float(rent_estimate)))
-                            rent_estimate_high_int = int(
-                                round(float(rent_estimate_high))
-                            )
-                            rent_estimate_low_int = int(round(float(rent_estimate_low)))
-
-                            self.console.print(
-                                f"   [blue]Updating: ${rent_estimate_int} (${rent_estimate_low_int}-${rent_estimate_high_int})[/blue]"
-                            )
-
-                            # Update the database record
-                            result = (
-                                self.supabase.table("rent_estimates")
-                                .update(
-                                    {
-                                        "rent_estimate": rent_estimate_int,
-                                        "rent_estimate_high": rent_estimate_high_int,
-                                        "rent_estimate_low": rent_estimate_low_int,
-                                    }
-                                )
-                                .eq("id", unit_id)
-                                .execute()
-                            )
-
-                            if result.data:
-                                success_count += 1
-                                self.console.print(
-                                    f"   [green]✅ Unit {unit_num} updated successfully[/green]"
-                                )
-                            else:
-                                failed_units.append(
-                                    f"Unit {unit_num} (no data returned)"
-                                )
-                                self.console.print(
-                                    f"   [red]❌ Unit {unit_num} update failed (no data returned)[/red]"
-                                )
-                            total_updates += 1
-
-                        except ValueError as ve:
-                            failed_units.append(
-                                f"Unit {unit_num} (value error: {str(ve)})"
-                            )
-                            self.console.print(
-                                f"   [red]❌ Unit {unit_num} value conversion error: {str(ve)}[/red]"
-                            )
-                            total_updates += 1
-                        except Exception as ue:
-                            failed_units.append(
-                                f"Unit {unit_num} (update error: {str(ue)})"
-                            )
-                            self.console.print(
-                                f"   [red]❌ Unit {unit_num} database error: {str(ue)}[/red]"
-                            )
-                            total_updates += 1
-                    else:
                         missing_fields = []
                         if rent_estimate is None:
                             missing_fields.append("rent_estimate")
@@ -1793,13 +1839,53 @@ You must provide:
                         if rent_estimate_low is None:
                             missing_fields.append("rent_estimate_low")
 
-                        failed_units.append(
-                            f"Unit {unit_num} (missing: {', '.join(missing_fields)})"
-                        )
+                        unit_results[unit_num] = {
+                            "success": False,
+                            "error": f"missing: {', '.join(missing_fields)}",
+                        }
                         self.console.print(
                             f"   [yellow]⚠️  Unit {unit_num} skipped - missing: {', '.join(missing_fields)}[/yellow]"
                         )
-                        total_updates += 1
+                        continue
+
+                    try:
+                        # Convert to integers to fix database type error
+                        # Round to nearest dollar since rent estimates are typically whole numbers
+                        rent_estimate_int = int(round(float(rent_estimate)))
+                        rent_estimate_high_int = int(round(float(rent_estimate_high)))
+                        rent_estimate_low_int = int(round(float(rent_estimate_low)))
+                    except ValueError as ve:
+                        unit_results[unit_num] = {"success": False, "error": f"value error: {str(ve)}"}
+                        self.console.print(
+                            f"   [red]❌ Unit {unit_num} value conversion error: {str(ve)}[/red]"
+                        )
+                        continue
+
+                    self.console.print(
+                        f"   [blue]Updating: ${rent_estimate_int} (${rent_estimate_low_int}-${rent_estimate_high_int})[/blue]"
+                    )
+                    # The upsert's insert half must satisfy the table's NOT NULL columns, so the
+                    # unit's existing identifying values are sent back unchanged
+                    rows.append({
+                        **unit.get("record", {}),
+                        "id": unit["id"],
+                        "address1": property_id,
+                        "unit_num": unit_num,
+                        "rent_estimate": rent_estimate_int,
+                        "rent_estimate_high": rent_estimate_high_int,
+                        "rent_estimate_low": rent_estimate_low_int,
+                    })
+
+            if rows:
+                unit_results.update(self._write_rent_estimate_rows(rows))
+
+            failed_units = [
+                f"Unit {unit_num} ({result['error']})"
+                for unit_num, result in unit_results.items()
+                if not result["success"]
+            ]
+            success_count = len(unit_results) - len(failed_units)
+            total_updates = len(unit_results)
 
             # Final summary
             self.console.print("\n[bold cyan]📊 Database Update Summary:[/bold cyan]")
@@ -1807,7 +1893,7 @@ You must provide:
                 self.console.print(
                     f"[green]✅ All {success_count}/{total_updates} units updated successfully[/green]"
                 )
-                return True
+                return {"success": True, "units": unit_results, "error": None}
             else:
                 self.console.print(
                     f"[yellow]⚠️  {success_count}/{total_updates} units updated successfully[/yellow]"
@@ -1816,13 +1902,78 @@ You must provide:
                     self.console.print("[red]Failed units:[/red]")
                     for failed_unit in failed_units:
                         self.console.print(f"   [red]• {failed_unit}[/red]")
-                return False
+                return {
+                    "success": False,
+                    "units": unit_results,
+                    "error": f"{len(failed_units)} of {total_updates} units failed",
+                }
 
         except Exception as e:
             self.console.print(
                 f"[red]💥 Critical error updating rent estimates in database: {str(e)}[/red]"
             )
-            return False
+            return {"success": False, "units": {}, "error": str(e)}
+
+    def _write_rent_estimate_rows(self, rows: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Write rent_estimates rows in one round-trip, falling back to per-unit updates.
+
+        Returns:
+            {unit_num: {"success": bool, "error": Optional[str]}}
+        """
+        try:
+            result = (
+                self.supabase.table("rent_estimates")
+                .upsert(rows, on_conflict="id")
+                .execute()
+            )
+            updated_ids = {row.get("id") for row in (result.data or [])}
+            unit_results = {}
+            for row in rows:
+                if row["id"] in updated_ids:
+                    unit_results[row["unit_num"]] = {"success": True, "error": None}
+                    self.console.print(
+                        f"   [green]✅ Unit {row['unit_num']} updated successfully[/green]"
+                    )
+                else:
+                    unit_results[row["unit_num"]] = {"success": False, "error": "no data returned"}
+                    self.console.print(
+                        f"   [red]❌ Unit {row['unit_num']} update failed (no data returned)[/red]"
+                    )
+            return unit_results
+        except Exception as e:
+            self.console.print(
+                f"[yellow]⚠️  Batch update failed ({str(e)}), retrying units one at a time...[/yellow]"
+            )
+
+        unit_results = {}
+        for row in rows:
+            unit_num = row["unit_num"]
+            try:
+                result = (
+                    self.supabase.table("rent_estimates")
+                    .update(
+                        {
+                            "rent_estimate": row["rent_estimate"],
+                            "rent_estimate_high": row["rent_estimate_high"],
+                            "rent_estimate_low": row["rent_estimate_low"],
+                        }
+                    )
+                    .eq("id", row["id"])
+                    .execute()
+                )
+                if result.data:
+                    unit_results[unit_num] = {"success": True, "error": None}
+                    self.console.print(f"   [green]✅ Unit {unit_num} updated successfully[/green]")
+                else:
+                    unit_results[unit_num] = {"success": False, "error": "no data returned"}
+                    self.console.print(
+                        f"   [red]❌ Unit {unit_num} update failed (no data returned)[/red]"
+                    )
+            except Exception as ue:
+                unit_results[unit_num] = {"success": False, "error": f"update error: {str(ue)}"}
+                self.console.print(f"   [red]❌ Unit {unit_num} database error: {str(ue)}[/red]")
+        return unit_results
 
     def _create_dynamic_rent_model(self, unit_configs: List[Dict[str, Any]]):
         """Create a dynamic Pydantic model based on unit configurations"""
@@ -0,0 +1,111 @@
+"""
+Prompt-hash memoization for research_reports.
+
+A report is a pure function of its prompt and model settings, so before paying for a
+reasoning call we hash the (sanitized) prompt together with the model config and look
+for a completed report with the same hash. With Tavily results cached (web_search),
+re-running a backfill over properties that haven't changed rebuilds identical prompts
+and costs nothing.
+
+The hash lives in research_reports.prompt_hash, which needs this one-time migration:
+
+    alter table research_reports add column if not exists prompt_hash text;
+    create index if not exists research_reports_prompt_hash_idx
+        on research_reports (prompt_hash);
+
+Whether the column exists is probed once per process (whatever REPORT_MEMO_MODE is);
+until the migration has been applied, lookups find nothing and reports are stored
+without a hash.
+
+REPORT_MEMO_MODE controls reuse: "reuse" (default) reuses silently, "ask" asks first in
+interactive flows (scripts always reuse), "off" always calls the model.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+import questionary
+from rich.console import Console
+
+REPORT_MEMO_MODE = os.getenv("REPORT_MEMO_MODE", "reuse").lower()
+
+# None until the first probe; then whether research_reports.prompt_hash exists
+_prompt_hash_column_available: Optional[bool] = None
+
+
+def prompt_hash(prompt: str, model: str, **model_config: Any) -> str:
+    """sha256 over the prompt and every setting that changes the model's answer"""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model, "config": model_config}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _column_missing(error: Exception) -> bool:
+    return "prompt_hash" in str(error)
+
+
+def prompt_hash_column_available(supabase, console: Optional[Console] = None) -> bool:
+    """Whether research_reports.prompt_hash exists (probed with one tiny query, then remembered)"""
+    global _prompt_hash_column_available
+    if _prompt_hash_column_available is None:
+        try:
+            supabase.table("research_reports").select("prompt_hash").limit(1).execute()
+            _prompt_hash_column_available = True
+        except Exception as e:
+            if not _column_missing(e):
+                return False  # Couldn't tell (e.g. network) - leave the hash out and probe again next time
+            _prompt_hash_column_available = False
+            if console is not None:
+                console.print(
+                    "[yellow]research_reports.prompt_hash is missing - report memoization is off "
+                    "until the migration in report_memo.py is applied[/yellow]"
+                )
+    return _prompt_hash_column_available
+
+
+def hash_columns(supabase, report_hash: Optional[str]) -> Dict[str, str]:
+    """Extra insert columns for research_reports ({} until the migration has run)"""
+    if report_hash and prompt_hash_column_available(supabase):
+        return {"prompt_hash": report_hash}
+    return {}
+
+
+def find_memoized_report(supabase, report_hash: str, research_type: str, console: Console) -> Optional[Dict[str, Any]]:
+    """Most recent completed report of research_type with this prompt hash, or None"""
+    if not prompt_hash_column_available(supabase, console) or REPORT_MEMO_MODE == "off":
+        return None
+
+    try:
+        response = (
+            supabase.table("research_reports")
+            .select("id, report_content, api_cost, created_at")
+            .eq("prompt_hash", report_hash)
+            .eq("research_type", research_type)
+            .eq("status", "completed")
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        console.print(f"[yellow]Warning: Could not check for an identical report: {str(e)}[/yellow]")
+        return None
+
+    return response.data[0] if response.data else None
+
+
+def reuse_memoized_report(existing: Optional[Dict[str, Any]], console: Console, interactive: bool = False) -> bool:
+    """Whether to reuse an identical stored report instead of calling the model"""
+    if not existing:
+        return False
+    if interactive and REPORT_MEMO_MODE == "ask":
+        return bool(questionary.confirm(
+            f"An identical report (ID: {existing['id']}, {existing.get('created_at', '')[:10]}) already exists. Reuse it?",
+            default=True,
+        ).ask())
+    console.print(
+        f"[green]♻️  Reusing identical report {existing['id']} "
+        f"(saved ${float(existing.get('api_cost') or 0):.4f} of reasoning)[/green]"
+    )
+    return True
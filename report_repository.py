@@ -0,0 +1,120 @@
+"""
+Read access to research_reports.
+
+Report bodies (report_content) run to tens of kilobytes and prompt_used is larger
+still, so listings select only the summary columns and bodies are fetched when a report
+is actually shown or analyzed - several at a time with .in_() rather than one
+.single() query each. Completed reports are never edited, so bodies are kept in a small
+LRU shared by every ReportRepository and re-opening a report from a menu is free.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+REPORT_SUMMARY_COLUMNS = "id, property_id, research_type, status, api_cost, created_at"
+REPORT_BODY_CACHE_SIZE = int(os.getenv("REPORT_BODY_CACHE_SIZE", "32"))
+REPORT_FETCH_CHUNK_SIZE = 200  # Ids per .in_() query, keeps the request URL short
+
+_body_cache: "OrderedDict[str, str]" = OrderedDict()
+_body_cache_lock = threading.Lock()
+
+
+def _cached_body(report_id: str) -> Optional[str]:
+    with _body_cache_lock:
+        body = _body_cache.get(report_id)
+        if body is not None:
+            _body_cache.move_to_end(report_id)
+        return body
+
+
+def _cache_body(report_id: str, body: Optional[str]):
+    if body is None or REPORT_BODY_CACHE_SIZE <= 0:
+        return
+    with _body_cache_lock:
+        _body_cache[report_id] = body
+        _body_cache.move_to_end(report_id)
+        while len(_body_cache) > REPORT_BODY_CACHE_SIZE:
+            _body_cache.popitem(last=False)
+
+
+class ReportRepository:
+    def __init__(self, supabase_client):
+        self.supabase = supabase_client
+
+    def list_for_property(self, property_id: str, research_type: str) -> List[Dict[str, Any]]:
+        """Summaries of a property's reports of research_type, newest first"""
+        response = (
+            self.supabase.table("research_reports")
+            .select(REPORT_SUMMARY_COLUMNS)
+            .eq("property_id", property_id)
+            .eq("research_type", research_type)
+            .order("created_at", desc=True)
+            .execute()
+        )
+        return response.data or []
+
+    def list_neighborhood_reports(self, status: str = "completed") -> List[Dict[str, Any]]:
+        """Summaries of every neighborhood report, filtered on research_type by the database"""
+        response = (
+            self.supabase.table("research_reports")
+            .select(REPORT_SUMMARY_COLUMNS)
+            .like("research_type", "%_neighborhood_report")
+            .eq("status", status)
+            .execute()
+        )
+        return response.data or []
+
+    def get_summaries(self, report_ids: List[str]) -> List[Dict[str, Any]]:
+        """Summaries of report_ids in the given order (ids that don't exist are left out)"""
+        by_id = {}
+        for i in range(0, len(report_ids), REPORT_FETCH_CHUNK_SIZE):
+            response = (
+                self.supabase.table("research_reports")
+                .select(REPORT_SUMMARY_COLUMNS)
+                .in_("id", report_ids[i:i + REPORT_FETCH_CHUNK_SIZE])
+                .execute()
+            )
+            by_id.update({row["id"]: row for row in response.data or []})
+        return [by_id[report_id] for report_id in report_ids if report_id in by_id]
+
+    def get_bodies(self, report_ids: List[str]) -> Dict[str, str]:
+        """report_content by id, fetching only the bodies that aren't cached"""
+        bodies = {}
+        missing = []
+        for report_id in dict.fromkeys(report_ids):
+            body = _cached_body(report_id)
+            if body is None:
+                missing.append(report_id)
+            else:
+                bodies[report_id] = body
+
+        for i in range(0, len(missing), REPORT_FETCH_CHUNK_SIZE):
+            response = (
+                self.supabase.table("research_reports")
+                .select("id, report_content")
+                .in_("id", missing[i:i + REPORT_FETCH_CHUNK_SIZE])
+                .execute()
+            )
+            for row in response.data or []:
+                bodies[row["id"]] = row["report_content"]
+                _cache_body(row["id"], row["report_content"])
+        return bodies
+
+    def get_body(self, report_id: str) -> Optional[str]:
+        return self.get_bodies([report_id]).get(report_id)
+
+    def get_report(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Summary columns plus report_content (prompt_used is never loaded)"""
+        body = _cached_body(report_id)
+        columns = REPORT_SUMMARY_COLUMNS if body is not None else f"{REPORT_SUMMARY_COLUMNS}, report_content"
+        response = self.supabase.table("research_reports").select(columns).eq("id", report_id).execute()
+        if not response.data:
+            return None
+
+        report = response.data[0]
+        if body is None:
+            _cache_body(report_id, report["report_content"])
+        else:
+            report["report_content"] = body
+        return report
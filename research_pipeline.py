@@ -0,0 +1,315 @@
+"""
+Pipelined market research for many properties at once.
+
+Each property goes through three stages, each with its own bounded thread pool:
+
+    search  (Tavily)   - queries for per-unit and, for single family homes, whole-house research
+    reason  (OpenAI)   - research reports plus structured estimate extraction
+    save    (Supabase) - per-unit estimate upsert and has_market_research flag
+
+A property moves to the next stage as soon as its current stage finishes, so searches
+for later properties overlap the slow reasoning calls of earlier ones. Spend is
+reserved before a property enters the reasoning stage and no new work is admitted
+once the ceiling would be crossed. Progress is journaled after reasoning and after
+saving, so a re-run never pays for a report twice.
+"""
+import io
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+from add_property import mark_property_as_researched
+from batch_runner import RunJournal, ThroughputColumn
+from rent_research import RentResearcher
+
+RESEARCH_SEARCH_WORKERS = int(os.getenv("RESEARCH_SEARCH_WORKERS", "4"))
+RESEARCH_REASONING_WORKERS = int(os.getenv("RESEARCH_REASONING_WORKERS", "4"))
+RESEARCH_DB_WORKERS = int(os.getenv("RESEARCH_DB_WORKERS", "2"))
+RESEARCH_SPEND_CEILING = float(os.getenv("RESEARCH_SPEND_CEILING", "25"))
+RESEARCH_COST_ESTIMATE = 0.40  # Per property, until real costs are known
+
+
+class SpendTracker:
+    """
+    Thread-safe running total of API spend with reservations against a ceiling.
+
+    A reservation uses the average cost of the properties finished so far (or
+    RESEARCH_COST_ESTIMATE before any have), so the ceiling is respected even with
+    several reasoning calls in flight.
+    """
+
+    def __init__(self, ceiling: float):
+        self.ceiling = ceiling
+        self.spent = 0.0
+        self.reserved = 0.0
+        self.settled = 0
+        self._lock = threading.Lock()
+
+    def _estimate(self) -> float:
+        return self.spent / self.settled if self.settled else RESEARCH_COST_ESTIMATE
+
+    def reserve(self) -> Optional[float]:
+        """Reserve spend for one property; None if that would cross the ceiling"""
+        with self._lock:
+            estimate = self._estimate()
+            if self.spent + self.reserved + estimate > self.ceiling:
+                return None
+            self.reserved += estimate
+            return estimate
+
+    def add(self, amount: float, reservation: float = 0.0, settled: bool = False):
+        with self._lock:
+            self.spent += amount
+            self.reserved = max(0.0, self.reserved - reservation)
+            if settled:
+                self.settled += 1
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return self.spent + self.reserved + self._estimate() > self.ceiling
+
+
+def _last_logged_line(log: io.StringIO) -> str:
+    lines = [line.strip() for line in log.getvalue().splitlines() if line.strip()]
+    return lines[-1] if lines else "Unknown error"
+
+
+class ResearchPipeline:
+    def __init__(
+        self,
+        supabase_client,
+        console: Console,
+        search_workers: int = RESEARCH_SEARCH_WORKERS,
+        reasoning_workers: int = RESEARCH_REASONING_WORKERS,
+        db_workers: int = RESEARCH_DB_WORKERS,
+        spend_ceiling: float = RESEARCH_SPEND_CEILING,
+        journal: Optional[RunJournal] = None,
+    ):
+        self.supabase = supabase_client
+        self.console = console
+        self.workers = {"search": search_workers, "reason": reasoning_workers, "save": db_workers}
+        self.spend = SpendTracker(spend_ceiling)
+        self.journal = journal or RunJournal("market_research")
+        # One set of OpenAI/Tavily clients (and their connection pools) for every job
+        self.researcher = RentResearcher(supabase_client, console)
+
+    def _new_job(self, address1: str, is_single_family: bool) -> Dict[str, Any]:
+        # Each property gets its own researcher view (it keeps per-run state such as the
+        # last search stats) and a private console, so concurrent jobs don't interleave their
+        # detailed logs or fight over Rich's single live display
+        log = io.StringIO()
+        return {
+            "address1": address1,
+            "is_single_family": is_single_family,
+            "log": log,
+            "researcher": self.researcher.with_console(Console(file=log, width=120)),
+            "cost": 0.0,
+            "reservation": 0.0,
+        }
+
+    def _search(self, job: Dict[str, Any]) -> bool:
+        researcher = job["researcher"]
+        job["inputs"] = researcher.gather_research_inputs(job["address1"])
+        if not job["inputs"]:
+            return False
+        job["cost"] += job["inputs"]["search_stats"]["paid_searches"] * researcher.config.search_cost_per_query
+
+        if job["is_single_family"]:
+            job["property_wide_inputs"] = researcher.gather_research_inputs(job["address1"], property_wide=True)
+            if job["property_wide_inputs"]:
+                job["cost"] += job["property_wide_inputs"]["search_stats"]["paid_searches"] * researcher.config.search_cost_per_query
+        return True
+
+    def _reason(self, job: Dict[str, Any]) -> bool:
+        researcher = job["researcher"]
+        address1 = job["address1"]
+
+        estimates_result = None
+        analysis = researcher.analyze_research_inputs(address1, job["inputs"])
+        if not analysis:
+            job["error"] = _last_logged_line(job["log"])
+        else:
+            job["cost"] += float(analysis["cost"]) - analysis["search_cost"]
+            estimates_result = researcher.generate_rent_estimates_from_report(analysis["report_id"])
+            job["cost"] += estimates_result.get("cost", 0)
+            if not estimates_result["success"]:
+                job["error"] = estimates_result["error"]
+
+        # As in the one-at-a-time flow, single family homes get their property-wide report
+        # even when the per-room report or its estimates failed
+        property_wide_report_id = None
+        if job.get("property_wide_inputs"):
+            property_wide = researcher.analyze_research_inputs(address1, job["property_wide_inputs"], property_wide=True)
+            if property_wide:
+                property_wide_report_id = property_wide["report_id"]
+                job["cost"] += float(property_wide["cost"]) - property_wide["search_cost"]
+                # Extraction writes the property-wide estimates to the properties table itself
+                extracted = researcher.extract_property_wide_estimates(property_wide_report_id)
+                job["cost"] += (extracted or {}).get("cost", 0)
+
+        if not estimates_result or not estimates_result["success"]:
+            return False
+
+        job["estimates"] = estimates_result["estimates"]
+        self.journal.record(address1, "analyzed", {
+            "report_id": analysis["report_id"],
+            "property_wide_report_id": property_wide_report_id,
+            "estimates": job["estimates"],
+            "cost": job["cost"],
+        })
+        return True
+
+    def _save(self, job: Dict[str, Any]) -> bool:
+        researcher = job["researcher"]
+        address1 = job["address1"]
+
+        unit_configs = researcher._get_unit_configurations(address1)
+        update_result = researcher._update_rent_estimates_in_db(address1, unit_configs, job["estimates"])
+        if not update_result["success"]:
+            job["error"] = update_result.get("error") or "Some unit estimates failed to save"
+            return False
+
+        # Research is stored either way; a failed flag only means it may be researched again
+        job["marked"] = mark_property_as_researched(supabase=self.supabase, address1=address1) != False
+        self.journal.record(address1, "done", {"cost": job["cost"], "marked": job["marked"]})
+        return True
+
+    def run(self, properties: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Research every property in properties ({address1, is_single_family}).
+
+        Returns:
+            Dict with researched, resumed, failed ({address1: error}), deferred (addresses
+            not started because of the spend ceiling) and spent
+        """
+        summary = {"researched": [], "resumed": 0, "failed": {}, "deferred": [], "spent": 0.0}
+        waiting = []  # Jobs not yet started, in order
+        ready_to_save = []
+        for prop in properties:
+            entry = self.journal.entries.get(prop["address1"])
+            status = entry["status"] if entry else None
+            if status == "done":
+                summary["resumed"] += 1
+                continue
+            job = self._new_job(prop["address1"], prop["is_single_family"])
+            if status == "analyzed":
+                # Report and estimates were paid for in an earlier run - only the save is left
+                job["estimates"] = entry["data"]["estimates"]
+                job["cost"] = entry["data"]["cost"]
+                ready_to_save.append(job)
+            else:
+                waiting.append(job)
+
+        if summary["resumed"] or ready_to_save:
+            self.console.print(
+                f"[cyan]↻ Resuming: {summary['resumed']} already completed, "
+                f"{len(ready_to_save)} analyzed but not saved ({self.journal.path})[/cyan]"
+            )
+
+        total = len(waiting) + len(ready_to_save)
+        pools = {stage: ThreadPoolExecutor(max_workers=max(1, n)) for stage, n in self.workers.items()}
+        stage_fns = {"search": self._search, "reason": self._reason, "save": self._save}
+        in_flight = {}  # future -> (stage, job)
+        # Searches run ahead of reasoning, but only by so much: results wait in memory and
+        # would be wasted if the spend ceiling stops the run
+        lookahead = self.workers["search"] + self.workers["reason"]
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            ThroughputColumn(),
+            TimeElapsedColumn(),
+            console=self.console,
+        ) as progress:
+            tasks = {
+                "search": progress.add_task("Searching ", total=len(waiting)),
+                "reason": progress.add_task("Reasoning ", total=len(waiting)),
+                "save": progress.add_task("Saving    ", total=total),
+            }
+
+            def submit(stage, job):
+                in_flight[pools[stage].submit(stage_fns[stage], job)] = (stage, job)
+
+            def fail(job, stage):
+                error = job.get("error") or _last_logged_line(job["log"])
+                summary["failed"][job["address1"]] = f"{stage}: {error}"
+                if stage != "save":
+                    # A failed save keeps its "analyzed" entry so the retry skips straight to saving
+                    self.journal.record(job["address1"], "failed", {"stage": stage, "error": error})
+                progress.console.print(f"  [red]✗ {job['address1']}: {stage} failed - {error}[/red]")
+
+            def admit():
+                searching = sum(1 for stage, _ in in_flight.values() if stage in ("search", "reason"))
+                while waiting and searching < lookahead and not self.spend.exhausted:
+                    submit("search", waiting.pop(0))
+                    searching += 1
+
+            for job in ready_to_save:
+                submit("save", job)
+            admit()
+
+            try:
+                while in_flight:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, job = in_flight.pop(future)
+                        try:
+                            ok = future.result()
+                        except Exception as e:
+                            ok = False
+                            job["error"] = f"{type(e).__name__}: {str(e)}"
+                        progress.advance(tasks[stage])
+
+                        if stage == "search":
+                            job["search_cost"] = job["cost"]
+                            self.spend.add(job["cost"])
+                            if not ok:
+                                fail(job, stage)
+                                continue
+                            reservation = self.spend.reserve()
+                            if reservation is None:
+                                summary["deferred"].append(job["address1"])
+                                progress.console.print(
+                                    f"  [yellow]⏸ {job['address1']}: spend ceiling reached, not reasoning[/yellow]"
+                                )
+                                continue
+                            job["reservation"] = reservation
+                            submit("reason", job)
+
+                        elif stage == "reason":
+                            self.spend.add(job["cost"] - job["search_cost"], job["reservation"], settled=ok)
+                            if not ok:
+                                fail(job, stage)
+                                continue
+                            submit("save", job)
+
+                        else:
+                            if not ok:
+                                fail(job, stage)
+                                continue
+                            summary["researched"].append(job["address1"])
+                            progress.console.print(
+                                f"  [green]✓ {job['address1']}: research saved (${job['cost']:.2f})[/green]"
+                            )
+
+                    admit()
+            except KeyboardInterrupt:
+                # Finished stages are journaled; let in-flight calls land but start nothing new
+                for pool in pools.values():
+                    pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+        # Jobs never admitted because the ceiling was reached
+        summary["deferred"].extend(job["address1"] for job in waiting)
+        summary["spent"] = self.spend.spent
+        return summary
@@ -0,0 +1,221 @@
+"""
+Persistent on-disk cache for paid external API responses.
+
+Entries live in a SQLite database under PROPDEALS_CACHE_DIR (default .cache/ in the
+repo), keyed by namespace + endpoint + normalized request parameters, so identical
+requests made by the importer, backfills and re-adds are only paid for once per TTL.
+
+PROPDEALS_CACHE_MODE controls how the cache is used:
+    online  (default) - serve fresh cache hits, call the API on a miss and store the result
+    offline           - serve from cache only (stale entries included); a miss raises CacheMissError
+    replay            - serve only from the JSON fixture file in PROPDEALS_REPLAY_FIXTURES,
+                        for running the pipeline with no network; a miss raises CacheMissError
+    off               - always call the API, never read or write the cache
+
+Fixture files are produced from a warm cache with export_fixtures().
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_DIR = os.getenv("PROPDEALS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "responses.sqlite")
+CACHE_MODE = os.getenv("PROPDEALS_CACHE_MODE", "online").lower()
+REPLAY_FIXTURES = os.getenv("PROPDEALS_REPLAY_FIXTURES")
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+class CacheMissError(Exception):
+    """Raised in offline/replay mode when a request isn't in the cache"""
+    pass
+
+
+@dataclass
+class CachedResponse:
+    """Minimal stand-in for requests.Response so call sites keep using .status_code / .json()"""
+    status_code: int
+    data: Any
+    from_cache: bool = False
+
+    def json(self):
+        return self.data
+
+
+def normalize_params(params: dict) -> dict:
+    """Canonicalize request parameters so equivalent requests share a cache key"""
+    normalized = {}
+    for key, value in sorted((params or {}).items()):
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.strip().lower().split())
+        elif isinstance(value, float):
+            value = int(value) if value.is_integer() else round(value, 2)
+        normalized[key] = value
+    return normalized
+
+
+def make_cache_key(namespace: str, endpoint: str, params: dict) -> str:
+    payload = json.dumps([namespace, endpoint, normalize_params(params)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, namespace: str, db_path: str = CACHE_DB_PATH, mode: str = CACHE_MODE, fixtures_path: Optional[str] = REPLAY_FIXTURES):
+        self.namespace = namespace
+        self.db_path = db_path
+        self.mode = mode
+        self.fixtures_path = fixtures_path
+        self.hits = 0
+        self.misses = 0
+        self._fixtures = None
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    body TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _load_fixtures(self):
+        if self._fixtures is None:
+            if not self.fixtures_path:
+                raise CacheMissError("Replay mode requires PROPDEALS_REPLAY_FIXTURES to point at a fixture file")
+            with open(self.fixtures_path) as f:
+                entries = json.load(f)
+            self._fixtures = {
+                entry["cache_key"]: entry for entry in entries if entry["namespace"] == self.namespace
+            }
+        return self._fixtures
+
+    def get(self, endpoint: str, params: dict, ttl_seconds: Optional[float] = None):
+        """Return (status_code, data) for a cached entry, or None if missing/expired"""
+        cache_key = make_cache_key(self.namespace, endpoint, params)
+
+        if self.mode == "replay":
+            entry = self._load_fixtures().get(cache_key)
+            return (entry["status_code"], entry["body"]) if entry else None
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT status_code, body, created_at FROM responses WHERE namespace = ? AND cache_key = ?",
+                    (self.namespace, cache_key),
+                ).fetchone()
+            finally:
+                conn.close()
+
+        if row is None:
+            return None
+        status_code, body, created_at = row
+        if ttl_seconds is not None and self.mode != "offline" and time.time() - created_at > ttl_seconds:
+            return None
+        return status_code, json.loads(body)
+
+    def set(self, endpoint: str, params: dict, status_code: int, data: Any):
+        cache_key = make_cache_key(self.namespace, endpoint, params)
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (namespace, cache_key, endpoint, params, status_code, body, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.namespace,
+                        cache_key,
+                        endpoint,
+                        json.dumps(normalize_params(params), default=str),
+                        status_code,
+                        json.dumps(data),
+                        time.time(),
+                    ),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def fetch(self, endpoint: str, params: dict, ttl_seconds: Optional[float], fetch_fn: Callable[[], Tuple[int, Any]], cacheable: Callable[[int, Any], bool] = None) -> CachedResponse:
+        """
+        Serve a request from cache according to the cache mode, calling fetch_fn on a miss.
+
+        Args:
+            endpoint: Logical endpoint name, part of the cache key
+            params: Request parameters, normalized into the cache key
+            ttl_seconds: How long an entry stays fresh in online mode (None = forever)
+            fetch_fn: Makes the real request, returns (status_code, parsed JSON)
+            cacheable: Decides whether a live response should be stored (default: HTTP 200 only)
+        """
+        if self.mode != "off":
+            cached = self.get(endpoint, params, ttl_seconds)
+            if cached is not None:
+                self.hits += 1
+                from api_ledger import record_cache_hit  # api_ledger imports this module
+                record_cache_hit(self.namespace, endpoint)
+                return CachedResponse(status_code=cached[0], data=cached[1], from_cache=True)
+
+            if self.mode in ("offline", "replay"):
+                self.misses += 1
+                raise CacheMissError(f"No cached {self.namespace} response for {endpoint} {normalize_params(params)}")
+
+        self.misses += 1
+        status_code, data = fetch_fn()
+        should_store = cacheable(status_code, data) if cacheable else status_code == 200
+        if self.mode != "off" and should_store:
+            self.set(endpoint, params, status_code, data)
+        return CachedResponse(status_code=status_code, data=data, from_cache=False)
+
+
+def export_fixtures(output_path: str, namespaces=None, db_path: str = CACHE_DB_PATH) -> int:
+    """Dump cached responses to a JSON fixture file for replay mode. Returns the entry count."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT namespace, cache_key, endpoint, params, status_code, body FROM responses ORDER BY namespace, endpoint"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    entries = [
+        {
+            "namespace": namespace,
+            "cache_key": cache_key,
+            "endpoint": endpoint,
+            "params": json.loads(params),
+            "status_code": status_code,
+            "body": json.loads(body),
+        }
+        for namespace, cache_key, endpoint, params, status_code, body in rows
+        if namespaces is None or namespace in namespaces
+    ]
+    with open(output_path, "w") as f:
+        json.dump(entries, f, indent=2)
+    return len(entries)
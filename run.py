@@ -27,7 +27,6 @@ from display import (
     display_start_screen_summary,
     display_y2_calculations, display_closing_costs_table,
 )
-from exporter import export_property_analysis
 from handlers import (
     handle_changing_loan,
     handle_extract_neighborhood_grade,
@@ -55,19 +54,15 @@ from dataframe_helpers import (
 )
 from inspections import InspectionsClient
 from loans import LoansProvider
+from property_store import PropertyStore
 from neighborhood_assessment import edit_neighborhood_assessment
-from neighborhood_scraper import NeighborhoodScraper
-from neighborhoods import NeighborhoodsClient
 from property_assessment import edit_property_assessment
-from scripts import ScriptsProvider
 
 load_dotenv()
 
 console = Console()
 supabase: Client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
 inspections = InspectionsClient(supabase_client=supabase)
-neighborhoods = NeighborhoodsClient(supabase_client=supabase, console=console)
-scraper = NeighborhoodScraper(supabase_client=supabase, console=console)
 assumptions_provider = AssumptionsProvider(supabase_client=supabase, console=console)
 loan_provider = LoansProvider(supabase_client=supabase, console=console)
 
@@ -83,6 +78,33 @@ PHASE1_CRITERIA = (
 # PHASE1_TOUR_CRITERIA = "status == 'active' & neighborhood_letter_grade in ['A', 'B', 'C']"
 PHASE1_TOUR_CRITERIA = "status == 'active'"
 
+# Session state - populated by load_session(), never at import time, so importing
+# this module (API, refresher, importers) doesn't block on Supabase
+ASSUMPTIONS = None
+LOAN = None
+df = None
+rents = None
+store = None
+neighborhoods = None
+scraper = None
+
+
+def get_neighborhoods_client():
+    """NeighborhoodsClient requires OpenAI/Tavily keys, so only create it when first needed"""
+    global neighborhoods
+    if neighborhoods is None:
+        from neighborhoods import NeighborhoodsClient
+        neighborhoods = NeighborhoodsClient(supabase_client=supabase, console=console)
+    return neighborhoods
+
+
+def get_scraper():
+    global scraper
+    if scraper is None:
+        from neighborhood_scraper import NeighborhoodScraper
+        scraper = NeighborhoodScraper(supabase_client=supabase, console=console)
+    return scraper
+
 def load_assumptions():
     global ASSUMPTIONS
     console.print("[yellow]Reloading assumptions...[/yellow]")
@@ -148,18 +170,15 @@ def load_loan(loan_id):
 
 
 
-def reload_dataframe():
-    global df, rents
-    console.print("[yellow]Reloading property data...[/yellow]")
-    properties_get_response = (
-        supabase.table("properties").select("*").limit(10000).execute()
-    )
-    df = pd.DataFrame(properties_get_response.data)
-    rents_get_response = (
-        supabase.table("rent_estimates").select("*").limit(10000).execute()
-    )
-    rents = pd.DataFrame(rents_get_response.data)
-    rents = rents.drop(["id"], axis=1)
+def build_property_dataframe(properties_data, rents_data, neighborhoods_df):
+    """
+    Build the enriched properties dataframe from raw Supabase rows.
+    Every calculation is row-wise, so this works the same for the full table or a handful of addresses.
+    """
+    df = pd.DataFrame(properties_data)
+    rents = pd.DataFrame(rents_data).drop(columns=["id"], errors="ignore")
+    if rents.empty:
+        rents = pd.DataFrame(columns=["address1", "unit_num", "beds", "rent_estimate", "estimated_sqrft"])
     rent_summary = (
         rents.groupby("address1")["rent_estimate"].agg(["sum", "min"]).reset_index()
     )
@@ -195,18 +214,78 @@ def reload_dataframe():
         axis=1,
     )
 
-    neighborhoods_df = neighborhoods.get_neighborhoods_dataframe(supabase)
     df = df.merge(neighborhoods_df, on="address1", how="left")
     df = apply_calculations_on_dataframe(df=df, loan=LOAN, assumptions=ASSUMPTIONS)
     df = apply_investment_calculations(df=df, loan=LOAN, assumptions=ASSUMPTIONS)
+    return df, rents
+
+
+def load_session(loan_id=LAST_USED_LOAN):
+    """Load assumptions, the session loan and the properties dataframe"""
+    load_assumptions()
+    load_loan(loan_id)
+    reload_dataframe()
+
+
+def reload_dataframe():
+    global df, rents, store
+    if ASSUMPTIONS is None:
+        load_assumptions()
+    if LOAN is None:
+        load_loan(LAST_USED_LOAN)
+    console.print("[yellow]Reloading property data...[/yellow]")
+    properties_get_response = (
+        supabase.table("properties").select("*").limit(10000).execute()
+    )
+    rents_get_response = (
+        supabase.table("rent_estimates").select("*").limit(10000).execute()
+    )
+    neighborhoods_df = get_neighborhoods_client().get_neighborhoods_dataframe(supabase)
+    df, rents = build_property_dataframe(
+        properties_get_response.data, rents_get_response.data, neighborhoods_df
+    )
+    store = PropertyStore(df, rents)
     console.print("[green]Property data reloaded successfully![/green]")
 
 
-load_assumptions()
-load_loan(LAST_USED_LOAN)
-reload_dataframe()
+def reload_properties(addresses):
+    """
+    Recompute only the given addresses and splice them into df/rents.
+    Addresses that no longer exist in Supabase are dropped from the dataframe.
+    """
+    global df, rents, store
+    addresses = list(set(addresses))
+    if not addresses:
+        return
+    if df is None:
+        reload_dataframe()
+        return
+
+    properties_get_response = (
+        supabase.table("properties").select("*").in_("address1", addresses).execute()
+    )
+    rents_get_response = (
+        supabase.table("rent_estimates").select("*").in_("address1", addresses).execute()
+    )
+    kept_df = df[~df["address1"].isin(addresses)]
+    kept_rents = rents[~rents["address1"].isin(addresses)]
+
+    if properties_get_response.data:
+        neighborhoods_df = get_neighborhoods_client().get_neighborhoods_dataframe(supabase, addresses=addresses)
+        updated_df, updated_rents = build_property_dataframe(
+            properties_get_response.data, rents_get_response.data, neighborhoods_df
+        )
+        df = pd.concat([kept_df, updated_df], ignore_index=True)
+        rents = pd.concat([kept_rents, updated_rents], ignore_index=True)
+    else:
+        df = kept_df.reset_index(drop=True)
+        rents = kept_rents.reset_index(drop=True)
+
+    store = PropertyStore(df, rents)
+    console.print(f"[green]Recomputed {len(addresses)} changed properties[/green]")
+
 
-def get_all_phase0_qualifying_properties():
+def get_all_phase0_qualifying_properties(properties_df=None):
     """
     This method filters all properties based on our criteria for financial viability using quick rent estimates:
       - status = 'active'
@@ -214,7 +293,8 @@ def get_all_phase0_qualifying_properties():
       - SFH/MF: Monthly total cashflow is above -200
       - Square Feet must be greater than or equal to 1000
     """
-    return df.copy().query(PHASE0_CRITERIA).copy()
+    source_df = df if properties_df is None else properties_df
+    return source_df.copy().query(PHASE0_CRITERIA).copy()
 
 
 def get_phase0_qualifiers_lacking_research():
@@ -225,7 +305,7 @@ def get_phase0_qualifiers_lacking_research():
     return phase0_df.query("has_market_research == False")
 
 
-def get_all_phase1_qualifying_properties():
+def get_all_phase1_qualifying_properties(properties_df=None):
     """
     This method filters all properties based on our criteria for financial viability using market rent estimates
       - 1% rule (monthly gross rent must be 1% or more of purchase price)
@@ -236,42 +316,70 @@ def get_all_phase1_qualifying_properties():
       - SFH: Market Rent Monthly Cashflow Y2 must be above -50
       - MF: Market Rent Monthly Cashflow Y2 must be above 400
     """
-    base_df = get_all_phase0_qualifying_properties()
+    base_df = get_all_phase0_qualifying_properties(properties_df)
     filtered_df = base_df.query(PHASE1_CRITERIA).copy()
     filtered_df["qualification_type"] = "current"
     qualifier_address1s = filtered_df["address1"].tolist()
-    reduced_df = get_reduced_pp_df(0.10)
+    reduced_df = get_reduced_pp_df(0.10, properties_df)
     reduced_df = reduced_df.query(PHASE0_CRITERIA).query(PHASE1_CRITERIA).copy()
     reduced_df["qualification_type"] = "contingent"
     reduced_df = reduced_df[~reduced_df["address1"].isin(qualifier_address1s)].copy()
-    creative_df = get_additional_room_rental_df()
+    creative_df = get_additional_room_rental_df(properties_df)
     creative_df = creative_df.query(PHASE0_CRITERIA).query(PHASE1_CRITERIA).copy()
     creative_df["qualification_type"] = "creative"
     return filtered_df, reduced_df, creative_df
 
 
-def get_combined_phase1_qualifiers():
-    current_df, reduced_df, creative_df = get_all_phase1_qualifying_properties()
+# Order of the combined qualifier list (and so of the tour list); within a type, rows keep df order
+PHASE1_QUALIFICATION_ORDER = ("current", "contingent", "creative")
+
+def tour_list_sort_key(address_order=None):
+    """
+    Key (qualification_type, address1) -> sortable tuple that puts tour list rows in the
+    order get_phase1_research_list returns them: by qualification type, then by position
+    in the dataframe (or in address_order). Used when a tour list is patched rather than
+    recomputed, so both match.
+    """
+    type_rank = {qualification_type: i for i, qualification_type in enumerate(PHASE1_QUALIFICATION_ORDER)}
+    position = {address1: i for i, address1 in enumerate(df["address1"] if address_order is None else address_order)}
+    return lambda qualification_type, address1: (
+        type_rank.get(qualification_type, len(type_rank)),
+        position.get(address1, len(position)),
+    )
+
+def sort_tour_list(tour_list_df):
+    """A patched tour list dataframe re-sorted with tour_list_sort_key"""
+    sort_key = tour_list_sort_key()
+    keys = [
+        sort_key(qualification_type, address1)
+        for qualification_type, address1 in zip(tour_list_df["qualification_type"], tour_list_df["address1"])
+    ]
+    return tour_list_df.iloc[sorted(range(len(keys)), key=keys.__getitem__)].reset_index(drop=True)
+
+def get_combined_phase1_qualifiers(properties_df=None):
+    current_df, reduced_df, creative_df = get_all_phase1_qualifying_properties(properties_df)
     combined = pd.concat(
         [current_df, reduced_df, creative_df], ignore_index=True
     ).drop_duplicates(subset=["address1"], keep="first")
     return combined
 
-def get_phase1_research_list():
+def get_phase1_research_list(properties_df=None):
     """
     Criteria for the research list:
     - Neighborhood letter grade must be C or higher
     - The qualification type must be CURRENT or the property is For Sale Buy Owner
     - Cashflow Year 2 must be above -$50
+
+    Pass properties_df to evaluate a subset (e.g. only recently changed addresses)
     """
-    combined = get_combined_phase1_qualifiers()
+    combined = get_combined_phase1_qualifiers(properties_df)
     qualified_df = combined.query(PHASE1_TOUR_CRITERIA).copy()
     qualified_addresses = qualified_df["address1"].tolist()
     unqualified_df = combined[~combined["address1"].isin(qualified_addresses)].copy()
     return qualified_df, unqualified_df
 
-def get_additional_room_rental_df():
-    dataframe = df.copy()
+def get_additional_room_rental_df(properties_df=None):
+    dataframe = (df if properties_df is None else properties_df).copy()
     df2 = dataframe.query("min_rent_unit_beds > 1").copy()
     df2["additional_room_rent"] = df2.apply(calculate_additional_room_rent, axis=1)
     df2["total_rent"] = df2["total_rent"] + df2["additional_room_rent"]
@@ -285,8 +393,8 @@ def get_additional_room_rental_df():
     df2["mr_GRM_y1"] = df2["purchase_price"] / df2["mr_annual_rent_y1"]
     return df2
 
-def get_reduced_pp_df(reduction_factor):
-    dataframe = df.copy()
+def get_reduced_pp_df(reduction_factor, properties_df=None):
+    dataframe = (df if properties_df is None else properties_df).copy()
     dataframe["original_price"] = dataframe["purchase_price"]
     dataframe["purchase_price"] = dataframe["purchase_price"] * (
         1 - reduction_factor
@@ -297,8 +405,11 @@ def get_reduced_pp_df(reduction_factor):
 
 def analyze_property(property_id):
     """Display detailed analysis for a single property"""
-    row = df[df["address1"] == property_id].iloc[0]
-    property_rents = rents[rents["address1"] == property_id]
+    row = store.get_row(property_id)
+    if row is None:
+        console.print(f"[red]Property not found: {property_id}[/red]")
+        return
+    property_rents = store.get_rents(property_id)
     is_single_family = int(row["units"]) == 0
 
     if property_rents.empty:
@@ -350,7 +461,7 @@ def analyze_property(property_id):
         elif research_choice == "View risk assessment report":
             handle_risk_assessment(property_id, supabase, console)
         elif research_choice == "View property summary":
-            handle_property_summary(property_id, supabase, console, df)
+            handle_property_summary(property_id, supabase, console, store)
         elif research_choice == "View closing costs breakdown":
             display_closing_costs_table(console, row, LOAN)
         elif research_choice == "Edit neighborhood assessment":
@@ -372,14 +483,14 @@ def analyze_property(property_id):
             )
         elif research_choice == "Scrape neighborhood from FindNeighborhoods.dsm.city":
             handle_scrape_neighborhood_from_findneighborhoods(
-                property_id, supabase, console, scraper, ask_user=True
+                property_id, supabase, console, get_scraper(), ask_user=True
             )
             reload_dataframe()
         elif research_choice == "Run neighborhood analysis":
-            handle_neighborhood_analysis(property_id, console, neighborhoods)
+            handle_neighborhood_analysis(property_id, console, get_neighborhoods_client())
             reload_dataframe()
         elif research_choice == "Extract neighborhood letter grade":
-            handle_extract_neighborhood_grade(property_id, supabase, console, neighborhoods)
+            handle_extract_neighborhood_grade(property_id, supabase, console, get_neighborhoods_client())
             reload_dataframe()
         elif research_choice == "Record price change":
             handle_price_change(property_id, row["purchase_price"], supabase)
@@ -401,7 +512,7 @@ def analyze_property(property_id):
             downloads_folder = os.getenv("DOWNLOADS_FOLDER", ".")
             safe_address = property_id.replace(" ", "_").replace(",", "").replace(".", "")
             output_path = os.path.join(downloads_folder, f"{safe_address}_analysis.pdf")
-            row = df[df["address1"] == property_id].iloc[0]
+            row = store.get_row(property_id)
 
             loan_info = {
                 "interest_rate": LOAN["interest_rate"],
@@ -424,6 +535,8 @@ def analyze_property(property_id):
                 "discount_rate": ASSUMPTIONS["discount_rate"],
             }
 
+            from exporter import export_property_analysis
+
             result_path = export_property_analysis(
                 row,
                 rents,
@@ -570,7 +683,10 @@ def run_all_properties_options():
 def run_scripts_options():
     using_scripts = True
     choices = ["Go back", "Add property valuations to all Phase 1.5 qualifiers", "Automate market research for Phase 0 properties", "Add missing neighborhoods"]
-    scripts = ScriptsProvider(supabase_client=supabase, console=console, neighborhood_scraper=scraper, neighborhood_client=neighborhoods)
+    from api_ledger import ledger_script
+    from scripts import ScriptsProvider
+
+    scripts = ScriptsProvider(supabase_client=supabase, console=console, neighborhood_scraper=get_scraper(), neighborhood_client=get_neighborhoods_client())
 
     while using_scripts:
         option = questionary.select("Select a script", choices=choices).ask()
@@ -578,10 +694,12 @@ def run_scripts_options():
             using_scripts = False
         elif option == "Add property valuations to all Phase 1.5 qualifiers":
             qualified_df, _ = get_phase1_research_list()
-            scripts.run_add_property_values_script(properties_df=qualified_df)
+            with ledger_script("property_values"):
+                scripts.run_add_property_values_script(properties_df=qualified_df)
             reload_dataframe()
         elif option == "Add missing neighborhoods":
-            scripts.run_add_missing_neighborhoods(properties_df=df)
+            with ledger_script("missing_neighborhoods"):
+                scripts.run_add_missing_neighborhoods(properties_df=df)
             reload_dataframe()
         elif option == "Automate market research for Phase 0 properties":
             phase0_lacking_df = get_phase0_qualifiers_lacking_research()
@@ -595,9 +713,10 @@ def run_scripts_options():
                 ).ask()
 
                 if confirm:
-                    scripts.run_market_research_automation_script(
-                        properties_df=phase0_lacking_df
-                    )
+                    with ledger_script("market_research"):
+                        scripts.run_market_research_automation_script(
+                            properties_df=phase0_lacking_df
+                        )
                     reload_dataframe()
 
 
@@ -651,6 +770,7 @@ def run_loans_options():
             reload_dataframe()
 
 if __name__ == "__main__":
+    load_session()
     summary = get_start_screen_summary(df)
     display_start_screen_summary(console, summary)
     while using_application:
@@ -728,7 +848,7 @@ if __name__ == "__main__":
                     property_details["address1"],
                     supabase,
                     console,
-                    scraper,
+                    get_scraper(),
                     ask_user=False,
                 )
 
@@ -1,20 +1,19 @@
 import os
-import requests
 import pandas as pd
 from supabase import Client
 from rich.console import Console
 from rich.panel import Panel
 from display import display_property_value_comparison
-from handlers import handle_rent_research_after_add
-from add_property import mark_property_as_researched
+from batch_runner import RunJournal, TokenBucket, run_batch
+from http_client import display_latency_stats
+from add_property import rentcast_cache, rentcast_get, save_comps_batch
 from neighborhood_scraper import NeighborhoodScraper
 from neighborhoods import NeighborhoodsClient
+from research_pipeline import RESEARCH_SPEND_CEILING, ResearchPipeline
 
-# RentCast API headers
-RENTCAST_HEADERS = {
-    "accept": "application/json",
-    "X-Api-Key": os.getenv("RENTCAST_KEY"),
-}
+# Concurrent valuation: worker threads and the RentCast plan's request rate limit
+RENTCAST_MAX_WORKERS = int(os.getenv("RENTCAST_MAX_WORKERS", "4"))
+RENTCAST_RATE_LIMIT_PER_SECOND = float(os.getenv("RENTCAST_RATE_LIMIT_PER_SECOND", "20"))
 
 class ScriptsProvider:
     def __init__(self, supabase_client: Client, console: Console, neighborhood_scraper: NeighborhoodScraper, neighborhood_client: NeighborhoodsClient):
@@ -26,7 +25,7 @@ class ScriptsProvider:
     def save_sale_comps_to_db(self, comps, address1):
         """
         Save sales comparables to database.
-        Mirrors the pattern from save_property_comps_to_db() in add_property.py.
+        Uses the same batched persistence as save_property_comps_to_db() in add_property.py.
 
         Args:
             comps: List of comparable properties from RentCast API
@@ -35,101 +34,113 @@ class ScriptsProvider:
         Returns:
             Number of comparables saved
         """
-        comps_saved = 0
+        try:
+            result = save_comps_batch(comps, "sale_comp_to_property", "address1", address1, self.supabase)
+        except Exception as e:
+            self.console.print(f"[yellow]Error saving comparables for {address1}: {str(e)}[/yellow]")
+            return 0
+
+        return result["new_links"] + result["updated_links"]
+
+    def _value_property(self, row, progress):
+        """
+        Value one property with RentCast, save the estimate and its sale comps.
+        Runs on a batch runner worker thread; output goes through progress.console.
+
+        Returns:
+            Dict with status (updated/error), comps_saved and summary (for the comparison table)
+        """
+        console = progress.console
+        address1 = row.get('address1', 'Unknown')
+        square_ft = row.get('square_ft')
+        beds = row.get('beds')
+        baths = row.get('baths')
+        units = row.get('units', 0)
+
+        # Determine property type
+        property_type = "Single Family" if units == 0 else "Multi-Family"
+
+        # Make RentCast API call
+        try:
+            response = rentcast_get(
+                "avm/value",
+                {
+                    "address": row.get('full_address'),
+                    "propertyType": property_type,
+                    "squareFootage": int(square_ft),
+                    "bedrooms": int(beds),
+                    "bathrooms": int(baths),
+                    "maxRadius": 5,
+                    "daysOld": 270,
+                    "compCount": 20
+                },
+                limiter=self.rentcast_limiter,
+            )
 
-        for comp in comps:
-            comp_row = {
-                "id": comp.get("id"),
-                "address": comp.get("formattedAddress"),
-                "county": comp.get("county"),
-                "latitude": comp.get("latitude"),
-                "longitude": comp.get("longitude"),
-                "property_type": comp.get("propertyType"),
-                "beds": comp.get("bedrooms"),
-                "baths": comp.get("bathrooms"),
-                "square_feet": comp.get("squareFootage"),
-                "lot_size": comp.get("lotSize"),
-                "built_in": comp.get("yearBuilt"),
-                "rent_price": comp.get("price"),
-                "status": comp.get("status"),
-                "days_old": comp.get("daysOld"),
+            # Check if request was successful - not journaled, so a resumed run retries it
+            if response.status_code != 200:
+                console.print(f"  [red]✗ {address1}: HTTP {response.status_code}[/red]")
+                return {"status": "error", "comps_saved": 0}
+
+            data = response.json()
+
+            # Check for API error responses
+            if 'error' in data:
+                console.print(f"  [red]✗ {address1}: API Error: {data.get('error')}[/red]")
+                self.values_journal.record(address1, "api_error", data.get('error'))
+                return {"status": "error", "comps_saved": 0}
+
+            # Extract valuation data - FIXED FIELD NAMES
+            est_price = data.get('price')  # Changed from 'value'
+            est_price_low = data.get('priceRangeLow')  # Changed from 'valueLow'
+            est_price_high = data.get('priceRangeHigh')  # Changed from 'valueHigh'
+            comparables = data.get('comparables', [])
+
+            if not est_price:
+                console.print(f"  [red]✗ {address1}: No price in response. Keys: {list(data.keys())}[/red]")
+                self.values_journal.record(address1, "no_price")
+                return {"status": "error", "comps_saved": 0}
+
+            # Update properties table
+            update_data = {
+                "est_price": est_price,
+                "est_price_low": est_price_low,
+                "est_price_high": est_price_high,
             }
 
-            try:
-                # Check if this comparable already exists (by id alone)
-                existing = (
-                    self.supabase.table("comparable_rents")
-                    .select("id")
-                    .eq("id", comp_row["id"])
-                    .execute()
-                )
-
-                if not existing.data:
-                    # Insert new comparable
-                    query = self.supabase.table("comparable_rents").insert(comp_row)
-                    response = query.execute()
-
-                    if not hasattr(response, "data"):
-                        self.console.print(f"[yellow]Warning: Could not save comparable {comp_row['id']}[/yellow]")
-
-                # Check if relationship already exists (by comp_id AND address1)
-                existing_join = (
-                    self.supabase.table("sale_comp_to_property")
-                    .select("id, distance, correlation")
-                    .eq("address1", address1)
-                    .eq("comp_id", comp.get("id"))
-                    .execute()
-                )
-
-                if existing_join.data:
-                    # Check if distance/correlation are missing and update if needed
-                    existing_record = existing_join.data[0]
-                    needs_update = (
-                        existing_record.get("distance") is None or
-                        existing_record.get("correlation") is None
-                    )
-
-                    if needs_update:
-                        update_data = {
-                            "distance": comp.get("distance"),
-                            "correlation": comp.get("correlation")
-                        }
-
-                        update_query = (
-                            self.supabase.table("sale_comp_to_property")
-                            .update(update_data)
-                            .eq("id", existing_record["id"])
-                        )
-                        update_response = update_query.execute()
-
-                        if hasattr(update_response, "data"):
-                            comps_saved += 1
-                    continue
-
-                # Create new relationship
-                join_row = {
-                    "comp_id": comp.get("id"),
-                    "address1": address1,
-                    "distance": comp.get("distance"),
-                    "correlation": comp.get("correlation")
-                }
-
-                query2 = self.supabase.table("sale_comp_to_property").insert(join_row)
-                response2 = query2.execute()
-
-                if hasattr(response2, "data"):
-                    comps_saved += 1
+            query = self.supabase.table("properties").update(update_data).eq("address1", address1)
+            result = query.execute()
 
-            except Exception as e:
-                self.console.print(f"[yellow]Error saving comparable {comp_row.get('id', 'unknown')}: {str(e)}[/yellow]")
-                continue
+            if not (hasattr(result, "data") and result.data):
+                console.print(f"  [red]✗ {address1}: Database update failed[/red]")
+                return {"status": "error", "comps_saved": 0}
+
+            # Save comparables to database
+            saved_count = self.save_sale_comps_to_db(comparables, address1) if comparables else 0
+            console.print(f"  [green]✓ {address1}: ${est_price:,}[/green] [dim]({saved_count} comparables)[/dim]")
 
-        return comps_saved
+            summary = {
+                'address1': address1,
+                'purchase_price': row.get('purchase_price', 0),
+                'est_price': est_price,
+                'est_price_low': est_price_low,
+                'est_price_high': est_price_high,
+            }
+            self.values_journal.record(address1, "updated", summary)
+            return {"status": "updated", "comps_saved": saved_count, "summary": summary}
 
-    def run_add_property_values_script(self, properties_df):
+        except Exception as e:
+            console.print(f"  [red]✗ {address1}: Exception: {type(e).__name__}: {str(e)}[/red]")
+            return {"status": "error", "comps_saved": 0}
+
+    def run_add_property_values_script(self, properties_df, max_workers=RENTCAST_MAX_WORKERS):
         """
         Add property valuations to all properties by calling RentCast API.
         Skips properties that already have est_price values.
+
+        Properties are valued concurrently (max_workers threads) under a token bucket
+        matching the RentCast plan's rate limit. Every finished address is checkpointed
+        to a local journal, so re-running after an interruption picks up where it left off.
         """
         # Initialize tracking variables
         total = len(properties_df)
@@ -143,112 +154,50 @@ class ScriptsProvider:
 
         self.console.print(f"\n[bold cyan]Starting property valuation for {total} properties...[/bold cyan]\n")
 
-        # Iterate through each property
-        for i, (_, row) in enumerate(properties_df.iterrows(), 1):
+        to_value = []
+        for _, row in properties_df.iterrows():
             address1 = row.get('address1', 'Unknown')
 
-            # Print progress every property
-            self.console.print(f"[cyan]{i}/{total}[/cyan] Processing: {address1}")
-
             # Skip if property already has est_price
             if pd.notna(row.get('est_price')) and row.get('est_price', 0) > 0:
-                self.console.print(f"  [yellow]→ Skipped (already has valuation)[/yellow]")
                 skipped += 1
                 continue
 
             # Validate required fields
-            full_address = row.get('full_address')
-            square_ft = row.get('square_ft')
-            beds = row.get('beds')
-            baths = row.get('baths')
-            units = row.get('units', 0)
-
-            if not full_address or pd.isna(square_ft) or pd.isna(beds) or pd.isna(baths):
-                self.console.print(f"  [red]✗ Error: Missing required fields[/red]")
+            if not row.get('full_address') or pd.isna(row.get('square_ft')) or pd.isna(row.get('beds')) or pd.isna(row.get('baths')):
+                self.console.print(f"  [red]✗ {address1}: Missing required fields[/red]")
                 errors += 1
                 continue
 
-            # Determine property type
-            property_type = "Single Family" if units == 0 else "Multi-Family"
-
-            # Make RentCast API call
-            try:
-                response = requests.get(
-                    "https://api.rentcast.io/v1/avm/value",
-                    headers=RENTCAST_HEADERS,
-                    params={
-                        "address": full_address,
-                        "propertyType": property_type,
-                        "squareFootage": int(square_ft),
-                        "bedrooms": int(beds),
-                        "bathrooms": int(baths),
-                        "maxRadius": 5,
-                        "daysOld": 270,
-                        "compCount": 20
-                    },
-                )
-
-                # Check if request was successful
-                if response.status_code != 200:
-                    self.console.print(f"  [red]✗ HTTP {response.status_code}[/red]")
-                    errors += 1
-                    continue
-
-                data = response.json()
-
-                # Check for API error responses
-                if 'error' in data:
-                    self.console.print(f"  [red]✗ API Error: {data.get('error')}[/red]")
-                    errors += 1
-                    continue
-
-                # Extract valuation data - FIXED FIELD NAMES
-                est_price = data.get('price')  # Changed from 'value'
-                est_price_low = data.get('priceRangeLow')  # Changed from 'valueLow'
-                est_price_high = data.get('priceRangeHigh')  # Changed from 'valueHigh'
-                comparables = data.get('comparables', [])
-
-                if not est_price:
-                    self.console.print(f"  [red]✗ No price in response. Keys: {list(data.keys())}[/red]")
-                    errors += 1
-                    continue
-
-                # Update properties table
-                update_data = {
-                    "est_price": est_price,
-                    "est_price_low": est_price_low,
-                    "est_price_high": est_price_high,
-                }
-
-                query = self.supabase.table("properties").update(update_data).eq("address1", address1)
-                result = query.execute()
-
-                if hasattr(result, "data") and result.data:
-                    updated += 1
-                    self.console.print(f"  [green]✓ Saved: ${est_price:,}[/green]")
-
-                    # Save comparables to database
-                    if comparables:
-                        saved_count = self.save_sale_comps_to_db(comparables, address1)
-                        comps_saved += saved_count
-                        self.console.print(f"    [dim]→ Saved {saved_count} comparables[/dim]")
-
-                    # Collect data for summary table
-                    summary_data.append({
-                        'address1': address1,
-                        'purchase_price': row.get('purchase_price', 0),
-                        'est_price': est_price,
-                        'est_price_low': est_price_low,
-                        'est_price_high': est_price_high,
-                    })
-                else:
-                    self.console.print(f"  [red]✗ Database update failed[/red]")
-                    errors += 1
-
-            except Exception as e:
-                self.console.print(f"  [red]✗ Exception: {type(e).__name__}: {str(e)}[/red]")
+            to_value.append(row)
+
+        if skipped:
+            self.console.print(f"[yellow]→ Skipped {skipped} properties that already have a valuation[/yellow]")
+
+        self.values_journal = RunJournal("property_values")
+        self.rentcast_limiter = TokenBucket(RENTCAST_RATE_LIMIT_PER_SECOND)
+        results = run_batch(
+            to_value,
+            self._value_property,
+            self.console,
+            "Valuing properties",
+            max_workers=max_workers,
+            key_fn=lambda row: row.get('address1', 'Unknown'),
+            journal=self.values_journal,
+        )
+        resumed = len(to_value) - len(results)
+
+        for result in results:
+            if isinstance(result, dict) and result["status"] == "updated":
+                updated += 1
+                comps_saved += result["comps_saved"]
+                summary_data.append(result["summary"])
+            else:
                 errors += 1
-                continue
+
+        if errors == 0:
+            # Finished cleanly - nothing left to resume
+            self.values_journal.clear()
 
         # Display summary panel
         self.console.print("\n")
@@ -259,9 +208,11 @@ class ScriptsProvider:
 Total Properties: {total}
 Successfully Updated: [green]{updated}[/green]
 Skipped (already has values): [yellow]{skipped}[/yellow]
+Resumed (completed in an earlier run): [cyan]{resumed}[/cyan]
 Errors: [red]{errors}[/red]
 Success Rate: {success_rate:.1f}%
 Comparables Saved: [green]{comps_saved}[/green]
+RentCast Cache Hits: [green]{rentcast_cache.hits}[/green] / Misses: {rentcast_cache.misses}
 """,
             title="Summary",
             border_style="cyan"
@@ -273,7 +224,9 @@ Comparables Saved: [green]{comps_saved}[/green]
         else:
             self.console.print("[dim]No properties were updated, so no comparison table to display[/dim]")
 
-    def run_market_research_automation_script(self, properties_df):
+        display_latency_stats(self.console)
+
+    def run_market_research_automation_script(self, properties_df, spend_ceiling=RESEARCH_SPEND_CEILING):
         """
         Automate market research generation for Phase 0 properties lacking research.
 
@@ -283,61 +236,42 @@ Comparables Saved: [green]{comps_saved}[/green]
         - Updates database with estimates
         - Marks property as researched
 
+        Properties flow through a pipeline (see research_pipeline) with separate worker
+        pools for Tavily searches, OpenAI reasoning and Supabase writes, so one property's
+        searches run while another's report is being written. No new property is started
+        once spend_ceiling dollars would be exceeded, and an interrupted run resumes from
+        its journal without paying for finished reports again.
+
         Args:
             properties_df: DataFrame of Phase 0 properties to process
+            spend_ceiling: Maximum Tavily + OpenAI spend in dollars for this run
         """
         # Filter to properties lacking market research
         lacking_research_df = properties_df[properties_df['has_market_research'] == False].copy()
 
         # Initialize tracking variables
         total = len(lacking_research_df)
-        successfully_researched = 0
-        skipped = 0
-        errors = 0
 
         self.console.print(f"\n[bold cyan]Starting market research automation for {total} properties...[/bold cyan]\n")
 
-        # Process each property
-        for i, (_, row) in enumerate(lacking_research_df.iterrows(), 1):
-            address1 = row.get('address1', 'Unknown')
-
-            # Print progress
-            self.console.print(f"[cyan]{i}/{total}[/cyan] Processing: {address1}")
+        properties = [
+            {
+                "address1": row.get('address1', 'Unknown'),
+                "is_single_family": row.get('units') == 0,
+            }
+            for _, row in lacking_research_df.iterrows()
+        ]
 
-            # Skip check - verify still needs research (defensive programming)
-            if pd.notna(row.get('has_market_research')) and row.get('has_market_research') == True:
-                self.console.print(f"  [yellow]→ Skipped (already has research)[/yellow]")
-                skipped += 1
-                continue
+        pipeline = ResearchPipeline(self.supabase, self.console, spend_ceiling=spend_ceiling)
+        summary = pipeline.run(properties)
 
-            try:
-                # Generate rent research (per-unit/per-room + property-wide for SFH)
-                # This handles everything: research generation, estimate extraction, DB updates
-                handle_rent_research_after_add(
-                    property_id=address1,
-                    supabase=self.supabase,
-                    console=self.console,
-                    ask_user=False  # Non-interactive mode
-                )
-
-                # Mark property as researched
-                mark_result = mark_property_as_researched(
-                    supabase=self.supabase,
-                    address1=address1
-                )
-
-                # Check if marking succeeded
-                if mark_result == False:
-                    self.console.print(f"  [yellow]⚠ Research completed but failed to mark property as researched[/yellow]")
-                    # Still count as success since research was generated
-
-                successfully_researched += 1
-                self.console.print(f"  [green]✓ Research completed and saved[/green]")
+        successfully_researched = len(summary["researched"])
+        errors = len(summary["failed"])
+        deferred = len(summary["deferred"])
 
-            except Exception as e:
-                self.console.print(f"  [red]✗ Error: {type(e).__name__}: {str(e)}[/red]")
-                errors += 1
-                continue
+        if errors == 0 and deferred == 0:
+            # Finished cleanly - nothing left to resume
+            pipeline.journal.clear()
 
         # Display summary panel
         self.console.print("\n")
@@ -347,14 +281,19 @@ Comparables Saved: [green]{comps_saved}[/green]
 
 Total Properties: {total}
 Successfully Researched: [green]{successfully_researched}[/green]
-Skipped (already researched): [yellow]{skipped}[/yellow]
+Resumed (completed in an earlier run): [cyan]{summary['resumed']}[/cyan]
+Deferred (spend ceiling of ${spend_ceiling:.2f} reached): [yellow]{deferred}[/yellow]
 Errors: [red]{errors}[/red]
 Success Rate: {success_rate:.1f}%
+API Spend: ${summary['spent']:.2f}
 """,
             title="Summary",
             border_style="cyan"
         ))
 
+        for address1, error in summary["failed"].items():
+            self.console.print(f"  [red]✗ {address1}: {error}[/red]")
+
     def run_add_missing_neighborhoods(self, properties_df):
         lacking_neighborhoods_df = properties_df[properties_df["neighborhood"].isna()].copy()
 
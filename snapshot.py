@@ -0,0 +1,232 @@
+"""
+Shared, read-only property snapshot for multi-worker API deployments.
+
+A single refresher process (refresher.py) loads properties and rent estimates from
+Supabase, runs the dataframe calculations once, and writes the results as Arrow IPC
+files plus a small JSON manifest into PROPDEALS_SNAPSHOT_DIR. API workers memory-map
+those files read-only, so the operating system shares one copy of the pages across
+every worker: memory stays flat as workers are added and only the refresher talks to
+Supabase.
+
+Writes are atomic: each snapshot gets versioned file names and the manifest is swapped
+in with os.replace, so a worker never sees a half-written snapshot. Workers that still
+have an older version mapped keep reading it until they pick up the new manifest.
+
+Point PROPDEALS_SNAPSHOT_DIR at /dev/shm (or any tmpfs) to keep the snapshot in RAM.
+"""
+import json
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SNAPSHOT_DIR = os.getenv("PROPDEALS_SNAPSHOT_DIR")
+MANIFEST_FILE = "manifest.json"
+REFRESH_REQUEST_FILE = "refresh.request"
+SNAPSHOT_TABLES = ("properties", "rents", "tour_list")
+MANIFEST_CHECK_INTERVAL_SECONDS = float(os.getenv("PROPDEALS_SNAPSHOT_CHECK_SECONDS", "5"))
+
+
+def _to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """Convert a dataframe to an Arrow table, stringifying object columns Arrow can't type"""
+    columns = {}
+    for col in df.columns:
+        try:
+            columns[str(col)] = pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            # Mixed-type object columns (e.g. numbers and strings in one column)
+            columns[str(col)] = pa.array(
+                df[col].map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+            )
+    return pa.table(columns)
+
+
+def _write_table(path: str, table: pa.Table):
+    # Uncompressed IPC so readers can map the buffers without copying
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _map_table(path: str) -> pa.Table:
+    source = pa.memory_map(path, "r")
+    return ipc.open_file(source).read_all()
+
+
+def _prune_old_versions(snapshot_dir: str, keep_versions):
+    for filename in os.listdir(snapshot_dir):
+        if not filename.endswith(".arrow"):
+            continue
+        version = filename.rsplit(".", 2)[-2]
+        if version not in keep_versions:
+            try:
+                os.remove(os.path.join(snapshot_dir, filename))
+            except FileNotFoundError:
+                pass
+
+
+def read_manifest(snapshot_dir: str = SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_snapshot(df, rents, tour_list, loan, assumptions, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """
+    Write a new snapshot version and atomically publish it.
+
+    Args:
+        df: Enriched properties dataframe (output of run.reload_dataframe)
+        rents: rent_estimates dataframe
+        tour_list: Phase 1 tour list dataframe, precomputed so workers don't recalculate it
+        loan: Loan dict the calculations were run with
+        assumptions: Assumptions dict the calculations were run with
+
+    Returns:
+        The published snapshot version
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    previous = read_manifest(snapshot_dir)
+    version = str(time.time_ns())
+
+    frames = {"properties": df, "rents": rents, "tour_list": tour_list}
+    files = {}
+    counts = {}
+    for name in SNAPSHOT_TABLES:
+        frame = frames[name] if frames[name] is not None else pd.DataFrame()
+        filename = f"{name}.{version}.arrow"
+        _write_table(os.path.join(snapshot_dir, filename), _to_arrow_table(frame))
+        files[name] = filename
+        counts[name] = len(frame)
+
+    manifest = {
+        "version": version,
+        "created_at": time.time(),
+        "files": files,
+        "counts": counts,
+        "loan": loan,
+        "assumptions": assumptions,
+    }
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    tmp_manifest_path = f"{manifest_path}.tmp"
+    with open(tmp_manifest_path, "w") as f:
+        json.dump(manifest, f, default=str)
+    os.replace(tmp_manifest_path, manifest_path)
+
+    # Keep the previous version around for workers that read the old manifest mid-swap
+    keep_versions = {version}
+    if previous:
+        keep_versions.add(previous["version"])
+    _prune_old_versions(snapshot_dir, keep_versions)
+    return version
+
+
+def request_refresh(snapshot_dir: str = SNAPSHOT_DIR):
+    """Ask the refresher process to rebuild the snapshot on its next poll"""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, REFRESH_REQUEST_FILE), "a"):
+        pass
+
+
+def consume_refresh_request(snapshot_dir: str = SNAPSHOT_DIR) -> bool:
+    try:
+        os.remove(os.path.join(snapshot_dir, REFRESH_REQUEST_FILE))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+class SnapshotStore:
+    """
+    Read-only, memory-mapped view of the latest snapshot.
+
+    Exposes the same lookup interface as PropertyStore (get_row / get_rents), so the
+    API routes don't care whether data came from Supabase or a shared snapshot.
+    """
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self.version = None
+        self.loan = None
+        self.assumptions = None
+        self.properties = None
+        self.rents = None
+        self.tour_list = None
+        self.row_index = {}
+        self.rent_rows = {}
+        self._last_checked = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    def refresh(self) -> bool:
+        """Map the latest published snapshot. Returns True if a new version was loaded."""
+        manifest = read_manifest(self.snapshot_dir)
+        if manifest is None or manifest["version"] == self.version:
+            return False
+
+        try:
+            tables = {
+                name: _map_table(os.path.join(self.snapshot_dir, filename))
+                for name, filename in manifest["files"].items()
+            }
+        except FileNotFoundError:
+            # Manifest was swapped and pruned underneath us; pick it up next time
+            return False
+
+        properties = tables["properties"]
+        rents = tables["rents"]
+        row_index = {}
+        if "address1" in properties.column_names:
+            row_index = {address1: i for i, address1 in enumerate(properties.column("address1").to_pylist())}
+        rent_rows = {}
+        if "address1" in rents.column_names:
+            for i, address1 in enumerate(rents.column("address1").to_pylist()):
+                rent_rows.setdefault(address1, []).append(i)
+
+        self.properties = properties
+        self.rents = rents
+        self.tour_list = tables["tour_list"]
+        self.row_index = row_index
+        self.rent_rows = rent_rows
+        self.loan = manifest.get("loan")
+        self.assumptions = manifest.get("assumptions")
+        self.version = manifest["version"]
+        return True
+
+    def refresh_if_due(self, interval: float = MANIFEST_CHECK_INTERVAL_SECONDS) -> bool:
+        """refresh(), but read the manifest at most once per interval - cheap enough for every request"""
+        now = time.monotonic()
+        if self.loaded and now - self._last_checked < interval:
+            return False
+        self._last_checked = now
+        return self.refresh()
+
+    def __contains__(self, address1) -> bool:
+        return address1 in self.row_index
+
+    def __len__(self) -> int:
+        return len(self.row_index)
+
+    def get_row(self, address1):
+        i = self.row_index.get(address1)
+        if i is None:
+            return None
+        return pd.Series(self.properties.slice(i, 1).to_pylist()[0])
+
+    def get_rents(self, address1) -> pd.DataFrame:
+        indices = pa.array(self.rent_rows.get(address1, []), type=pa.int64())
+        return self.rents.take(indices).to_pandas()
+
+    def get_tour_list(self):
+        return self.tour_list.to_pylist() if self.tour_list is not None else []
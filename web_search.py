@@ -0,0 +1,272 @@
+"""
+Tavily search fan-out shared by rent research and neighborhood analysis.
+
+Research runs issue 6-12 advanced searches that each take several seconds, so they
+are sent concurrently on a bounded thread pool. Console output is still printed per
+query, in query order, and results come back in the same order the sequential loop
+produced them.
+
+Responses are cached on disk (SearchCache) keyed by the normalized query and search
+parameters, so adjacent properties asking "Des Moines 3 bedroom rent 50315" again
+within TAVILY_CACHE_TTL_DAYS cost nothing. Raw page content is stored once per URL
+hash and shared by every query that returned that page.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+from api_ledger import call_cost, record_cache_hit, track
+from response_cache import CACHE_DB_PATH, CACHE_MODE, DAY_SECONDS, CacheMissError, make_cache_key
+
+TAVILY_MAX_CONCURRENT_SEARCHES = int(os.getenv("TAVILY_MAX_CONCURRENT_SEARCHES", "6"))
+TAVILY_SEARCH_TIMEOUT_SECONDS = float(os.getenv("TAVILY_SEARCH_TIMEOUT_SECONDS", "60"))
+TAVILY_CACHE_TTL_SECONDS = float(os.getenv("TAVILY_CACHE_TTL_DAYS", "7")) * DAY_SECONDS
+TAVILY_COST_PER_SEARCH = call_cost("tavily", "search")  # Advanced search
+
+SEARCH_PARAMS = {
+    "search_depth": "advanced",
+    "max_results": 5,
+    "include_raw_content": "markdown",
+}
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256((url or "").encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    def __init__(self, db_path: str = CACHE_DB_PATH, mode: str = CACHE_MODE, ttl_seconds: float = TAVILY_CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    cache_key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS page_contents (
+                    url_hash TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    raw_content TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, query: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached Tavily response ({"results": [...]}) with raw content re-attached, or None"""
+        if self.mode == "off":
+            return None
+
+        cache_key = make_cache_key("tavily", "search", {"query": query, **params})
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT results, created_at FROM search_results WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                fresh = row is not None and (self.mode == "offline" or time.time() - row[1] <= self.ttl_seconds)
+                if not fresh:
+                    return None
+
+                results = json.loads(row[0])
+                hashes = [result.pop("raw_content_hash", None) for result in results]
+                wanted = [h for h in hashes if h]
+                contents = {}
+                if wanted:
+                    placeholders = ",".join("?" * len(wanted))
+                    contents = dict(conn.execute(
+                        f"SELECT url_hash, raw_content FROM page_contents WHERE url_hash IN ({placeholders})",
+                        wanted,
+                    ).fetchall())
+            finally:
+                conn.close()
+
+        for result, content_hash in zip(results, hashes):
+            result["raw_content"] = contents.get(content_hash, "") if content_hash else ""
+        return {"results": results}
+
+    def set(self, query: str, params: Dict[str, Any], response: Dict[str, Any]):
+        if self.mode == "off":
+            return
+
+        cache_key = make_cache_key("tavily", "search", {"query": query, **params})
+        now = time.time()
+        stored_results = []
+        pages = []
+        for result in response.get("results", []):
+            result = dict(result)
+            raw_content = result.pop("raw_content", None)
+            if raw_content:
+                content_hash = url_hash(result.get("url", ""))
+                result["raw_content_hash"] = content_hash
+                pages.append((content_hash, result.get("url", ""), raw_content, now))
+            stored_results.append(result)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                # One copy of each page, however many queries returned it
+                conn.executemany(
+                    "INSERT OR REPLACE INTO page_contents (url_hash, url, raw_content, updated_at) VALUES (?, ?, ?, ?)",
+                    pages,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_results (cache_key, query, params, results, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (cache_key, query, json.dumps(params, sort_keys=True), json.dumps(stored_results), now),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+
+search_cache = SearchCache()
+
+
+def _search(tavily_client, query: str) -> Tuple[Dict[str, Any], bool]:
+    """Run one search through the cache. Returns (response, served_from_cache)."""
+    cached = search_cache.get(query, SEARCH_PARAMS)
+    if cached is not None:
+        record_cache_hit("tavily", "search")
+        return cached, True
+    if search_cache.mode in ("offline", "replay"):
+        raise CacheMissError(f"No cached Tavily results for: {query}")
+
+    with track("tavily", "search"):
+        response = tavily_client.search(query=query, **SEARCH_PARAMS)
+    if response and response.get("results"):
+        search_cache.set(query, SEARCH_PARAMS, response)
+    return response, False
+
+
+def perform_searches(
+    tavily_client,
+    queries: List[str],
+    console: Console,
+    max_workers: int = TAVILY_MAX_CONCURRENT_SEARCHES,
+    timeout_seconds: float = TAVILY_SEARCH_TIMEOUT_SECONDS,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Perform Tavily searches for all queries concurrently, serving repeats from the cache.
+
+    A query that hasn't answered timeout_seconds after its turn comes up in the
+    (ordered) log is reported as failed; the rest of the batch is unaffected.
+
+    Returns:
+        Tuple of (flat list of {query, title, url, content, raw_content, score} grouped by
+        query in query order, stats dict with queries, cache_hits, paid_searches, hit_rate
+        and saved_cost)
+    """
+    search_results = []
+    total_queries = len(queries)
+    successful_searches = 0
+    cache_hits = 0
+
+    console.print(
+        f"\n[bold cyan]🔍 Starting Tavily search for {total_queries} queries...[/bold cyan]\n"
+    )
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, total_queries or 1)))
+    futures = [executor.submit(_search, tavily_client, query) for query in queries]
+
+    for i, (query, future) in enumerate(zip(queries, futures), 1):
+        # Pre-search logging
+        console.print(
+            f'[cyan]🔍 [{i}/{total_queries}] Searching:[/cyan] [white]"{query}"[/white]'
+        )
+
+        try:
+            response, from_cache = future.result(timeout=timeout_seconds)
+            cache_hits += 1 if from_cache else 0
+
+            if response and "results" in response:
+                results_count = len(response["results"])
+                sources_count = len(
+                    set(result.get("url", "") for result in response["results"])
+                )
+
+                for result in response["results"]:
+                    search_results.append(
+                        {
+                            "query": query,
+                            "title": result.get("title", ""),
+                            "url": result.get("url", ""),
+                            "content": result.get("content", ""),
+                            "raw_content": result.get("raw_content", ""),
+                            "score": result.get("score", 0),
+                        }
+                    )
+
+                # Post-search success logging
+                console.print(
+                    f"[green]   ✅ Found {results_count} results from {sources_count} sources"
+                    f"{' (cached)' if from_cache else ''}[/green]\n"
+                )
+                successful_searches += 1
+            else:
+                # Post-search no results logging
+                console.print("[yellow]   ❌ No results found[/yellow]\n")
+
+        except FutureTimeoutError:
+            console.print(f"[red]   ❌ Search failed: timed out after {timeout_seconds:.0f}s[/red]\n")
+        except Exception as e:
+            # Enhanced error logging
+            console.print(f"[red]   ❌ Search failed: {str(e)}[/red]\n")
+
+    # Don't wait on a search that timed out
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    # Overall search statistics summary
+    total_results = len(search_results)
+    failed_searches = total_queries - successful_searches
+
+    console.print("[bold green]📊 Search Summary:[/bold green]")
+    console.print(
+        f"[green]   • Successful searches: {successful_searches}/{total_queries}[/green]"
+    )
+    if failed_searches > 0:
+        console.print(
+            f"[yellow]   • Failed searches: {failed_searches}[/yellow]"
+        )
+    stats = {
+        "queries": total_queries,
+        "cache_hits": cache_hits,
+        "paid_searches": total_queries - cache_hits,
+        "hit_rate": (cache_hits / total_queries) if total_queries else 0.0,
+        "saved_cost": cache_hits * TAVILY_COST_PER_SEARCH,
+    }
+    if cache_hits:
+        console.print(
+            f"[cyan]   • Cache hits: {cache_hits}/{total_queries} ({stats['hit_rate']:.0%}), ${stats['saved_cost']:.3f} saved[/cyan]"
+        )
+    console.print(
+        f"[cyan]   • Total results collected: {total_results} data points[/cyan]\n"
+    )
+
+    return search_results, stats